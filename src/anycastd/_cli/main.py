@@ -14,7 +14,7 @@ from pydantic import ValidationError
 from anycastd import __version__
 from anycastd._cli.output import print_error
 from anycastd._configuration import ConfigurationError, MainConfiguration
-from anycastd.core import ExitCode, run_from_configuration
+from anycastd.core import ExitCode, expire_held_state, run_from_configuration
 
 CONFIG_PATH = Path("/etc/anycastd/config.toml")
 IS_TTY = sys.stdout.isatty()
@@ -155,6 +155,51 @@ def run(
     )
 
 
+@app.command()
+def watchdog(
+    config: Annotated[
+        Path,
+        typer.Option(
+            "--config",
+            "-c",
+            help="Location of the configuration file.",
+            envvar="CONFIG",
+            readable=False,
+            resolve_path=True,
+        ),
+    ] = CONFIG_PATH,
+    log_level: Annotated[
+        LogLevel,
+        typer.Option(
+            "--log-level",
+            help="Log level.",
+            envvar="LOG_LEVEL",
+            case_sensitive=False,
+        ),
+    ] = LogLevel.Info,
+    log_format: Annotated[
+        LogFormat,
+        typer.Option(
+            "--log-format",
+            help="Log format.",
+            envvar="LOG_FORMAT",
+            case_sensitive=False,
+        ),
+    ] = LogFormat.Human if IS_TTY else LogFormat.Json,
+    no_color: Annotated[
+        bool,
+        typer.Option("--no-color", help="Disable color output.", envvar="NO_COLOR"),
+    ] = False,
+) -> None:
+    """Denounce held prefixes if no new process takes them over in time."""
+    configure_logging(log_level, log_format, no_color)
+    main_configuration = _get_main_configuration(config)
+    asyncio.run(
+        expire_held_state(main_configuration),
+        debug=True if log_level == LogLevel.Debug else False,
+    )
+
+
 def _get_main_configuration(config: Path) -> MainConfiguration:
     """Get the main configuration object from a path to a TOML file.
 
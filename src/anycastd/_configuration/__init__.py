@@ -1,3 +1,12 @@
-from anycastd._configuration.conversion import config_to_service
+from anycastd._configuration.conversion import (
+    apply_cabourotte_configuration,
+    apply_scheduling_configuration,
+    config_to_cabourotte_receiver,
+    config_to_service,
+    configs_to_services,
+)
 from anycastd._configuration.exceptions import ConfigurationError
 from anycastd._configuration.main import MainConfiguration
+from anycastd._configuration.restart import HoldOnRestartConfiguration
+from anycastd._configuration.scheduling import SchedulingConfiguration
+from anycastd._configuration.shutdown import ShutdownConfiguration
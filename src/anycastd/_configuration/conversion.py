@@ -1,34 +1,162 @@
+from collections.abc import Iterable, MutableMapping
 from typing import Any, overload
 
+import httpx
+
 from anycastd._configuration.healthcheck import (
+    CabourotteConfiguration,
     CabourotteHealthcheckConfiguration,
     HealthcheckConfiguration,
 )
 from anycastd._configuration.prefix import FRRPrefixConfiguration, PrefixConfiguration
+from anycastd._configuration.scheduling import SchedulingConfiguration
 from anycastd._configuration.service import ServiceConfiguration
 from anycastd._executor import LocalExecutor
 from anycastd.core._service import Service
-from anycastd.healthcheck import CabourotteHealthcheck, Healthcheck
+from anycastd.healthcheck import (
+    CabourotteHealthcheck,
+    CabourotteResultReceiver,
+    Healthcheck,
+    cabourotte_circuit_breakers,
+    cabourotte_client_pool,
+    request_budget,
+    spread,
+)
 from anycastd.prefix import FRRoutingPrefix, Prefix
 
 
-def config_to_service(config: ServiceConfiguration) -> Service:
+def apply_cabourotte_configuration(config: CabourotteConfiguration) -> None:
+    """Apply settings shared by all Cabourotte healthchecks.
+
+    Args:
+        config: The configuration to apply.
+    """
+    cabourotte_client_pool.configure(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry.total_seconds(),
+        ),
+        timeout=httpx.Timeout(config.timeout.total_seconds()),
+    )
+    cabourotte_circuit_breakers.configure(
+        threshold=config.circuit_breaker.threshold,
+        backoff=config.circuit_breaker.backoff,
+        max_backoff=config.circuit_breaker.max_backoff,
+    )
+
+
+def apply_scheduling_configuration(config: SchedulingConfiguration) -> None:
+    """Apply settings for scheduling the evaluation of all healthchecks.
+
+    Args:
+        config: The configuration to apply.
+    """
+    spread.configure(stagger=config.stagger, jitter=config.jitter)
+    request_budget.configure(rate=config.max_requests_per_second, burst=config.burst)
+
+
+def config_to_cabourotte_receiver(
+    config: CabourotteConfiguration, services: Iterable[Service]
+) -> CabourotteResultReceiver | None:
+    """Create a receiver for results pushed by Cabourotte, if enabled.
+
+    All Cabourotte health checks of the given services are registered with the
+    receiver, so that they are updated with pushed results.
+
+    Args:
+        config: The configuration of the receiver.
+        services: The services whose Cabourotte health checks to register.
+
+    Returns:
+        A receiver with all Cabourotte health checks registered,
+        or None if receiving pushed results is not enabled.
+    """
+    if config.receiver is None:
+        return None
+
+    receiver = CabourotteResultReceiver(
+        host=config.receiver.host, port=config.receiver.port
+    )
+    for service in services:
+        for check in service.health_checks:
+            if isinstance(check, CabourotteHealthcheck):
+                receiver.register(check)
+    return receiver
+
+
+def configs_to_services(
+    configs: Iterable[ServiceConfiguration],
+) -> tuple[Service, ...]:
+    """Convert service configurations to actual service instances.
+
+    Identical health check configurations are interned across all services,
+    resulting in a single health check instance shared by all services referencing
+    it, so that each distinct check is only evaluated once.
+
+    Args:
+        configs: The configurations to convert.
+
+    Returns:
+        Service instances with the parameters from the configurations.
+    """
+    health_checks: dict[HealthcheckConfiguration, Healthcheck] = {}
+    return tuple(
+        config_to_service(config, health_checks=health_checks) for config in configs
+    )
+
+
+def config_to_service(
+    config: ServiceConfiguration,
+    *,
+    health_checks: MutableMapping[HealthcheckConfiguration, Healthcheck] | None = None,
+) -> Service:
     """Convert a service configuration to an actual service instance.
 
     Args:
         config: The configuration to convert.
+        health_checks: Health check instances by their configuration. Checks with a
+            configuration contained within are reused instead of creating new
+            instances, while newly created ones are added to it.
 
     Returns:
         A service instance with the parameters from the configuration.
     """
+    if health_checks is None:
+        health_checks = {}
+
     prefixes: tuple[Prefix, ...] = tuple(
         _sub_config_to_instance(prefix) for prefix in config.prefixes
     )
-    health_checks: tuple[Healthcheck, ...] = tuple(
-        _sub_config_to_instance(check) for check in config.checks
+    checks: list[Healthcheck] = []
+    for check_config in (_apply_thresholds(config, check) for check in config.checks):
+        if check_config not in health_checks:
+            health_checks[check_config] = _sub_config_to_instance(check_config)
+        checks.append(health_checks[check_config])
+
+    return Service(
+        name=config.name,
+        prefixes=prefixes,
+        health_checks=tuple(checks),
+        evaluation_deadline=config.evaluation_deadline.total_seconds()
+        if config.evaluation_deadline is not None
+        else None,
+        keep_result_cycles=config.keep_result_cycles,
     )
 
-    return Service(name=config.name, prefixes=prefixes, health_checks=health_checks)
+
+def _apply_thresholds(
+    service: ServiceConfiguration, check: HealthcheckConfiguration
+) -> HealthcheckConfiguration:
+    """Apply the thresholds of a service to a check not configuring them itself."""
+    update = {
+        field: value
+        for field, value in (("rise", service.rise), ("fall", service.fall))
+        if value is not None
+        and field in type(check).model_fields
+        and field not in check.model_fields_set
+    }
+    return check.model_copy(update=update) if update else check
 
 
 @overload
@@ -1,5 +1,7 @@
 import datetime
-from typing import Literal, TypeAlias
+from typing import Literal, Self, TypeAlias
+
+from pydantic import BaseModel, Field, PositiveInt, model_validator
 
 from anycastd._configuration.sub import SubConfiguration
 
@@ -14,12 +16,101 @@ class CabourotteHealthcheckConfiguration(HealthcheckConfiguration):
     Attributes:
         name: The name of the healthcheck.
         url: The URL of the cabourotte http endpoint.
-        interval: The interval in seconds at which the healthcheck should be executed.
+        interval: The interval in seconds at which the healthcheck should be executed,
+            the minimum interval if the interval is adaptive.
+        rise: The number of consecutive healthy results required to become healthy.
+        fall: The number of consecutive unhealthy results required to become
+            unhealthy.
+        timeout: The timeout for requesting the result of the healthcheck. If
+            omitted, the timeout shared by all Cabourotte healthchecks is used.
+        max_interval: The maximum interval to back off to while results are
+            stable. If omitted, the interval is fixed.
+        max_age: The maximum age of a result before it is considered unhealthy.
+            If omitted, results are used regardless of their age.
+        max_duration: The maximum duration of a healthcheck execution before a
+            successful result is considered unhealthy. If omitted, durations
+            are ignored.
+        duration_percentile: The percentile of recent durations to compare to
+            the maximum duration. If omitted, each duration is compared.
+        duration_window: The number of recent durations the percentile is
+            taken over.
+        duration_rise: The number of consecutive durations within the maximum
+            required to no longer be considered slow.
+        duration_fall: The number of consecutive durations exceeding the maximum
+            required to be considered slow.
     """
 
     name: str
     url: str = "http://127.0.0.1:9013"
     interval: datetime.timedelta = datetime.timedelta(seconds=5)
+    rise: PositiveInt = 1
+    fall: PositiveInt = 1
+    timeout: datetime.timedelta | None = None
+    max_interval: datetime.timedelta | None = None
+    max_age: datetime.timedelta | None = None
+    max_duration: datetime.timedelta | None = None
+    duration_percentile: float | None = Field(default=None, gt=0, le=100)
+    duration_window: PositiveInt = 10
+    duration_rise: PositiveInt = 1
+    duration_fall: PositiveInt = 1
+
+    @model_validator(mode="after")
+    def _check_intervals(self) -> Self:
+        if self.max_interval is not None and self.max_interval < self.interval:
+            raise ValueError("max_interval must not be below interval")
+        if self.max_age is not None and self.max_age < self.interval:
+            raise ValueError("max_age must not be below interval")
+        return self
+
+
+class CabourotteReceiverConfiguration(BaseModel, extra="forbid"):
+    """The configuration for receiving results pushed by the Cabourotte exporter.
+
+    Attributes:
+        host: The address to listen on.
+        port: The port to listen on.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 9014
+
+
+class CabourotteCircuitBreakerConfiguration(BaseModel, extra="forbid"):
+    """The configuration of circuit breakers for unreachable Cabourotte APIs.
+
+    Attributes:
+        threshold: The number of consecutive transport failures opening the circuit.
+        backoff: The time to wait before probing an open circuit for the first time.
+        max_backoff: The maximum time to wait between probes.
+    """
+
+    threshold: PositiveInt = 3
+    backoff: datetime.timedelta = datetime.timedelta(seconds=1)
+    max_backoff: datetime.timedelta = datetime.timedelta(seconds=60)
+
+
+class CabourotteConfiguration(BaseModel, extra="forbid"):
+    """Settings shared by all Cabourotte healthchecks.
+
+    Attributes:
+        max_connections: The maximum number of connections per Cabourotte URL.
+        max_keepalive_connections: The maximum number of idle connections kept alive
+            per Cabourotte URL.
+        keepalive_expiry: The time after which idle connections are closed.
+        timeout: The timeout for requests made to the Cabourotte API.
+        receiver: The configuration for receiving pushed results, if enabled.
+        circuit_breaker: The configuration of circuit breakers for unreachable
+            Cabourotte APIs.
+    """
+
+    max_connections: int = 10
+    max_keepalive_connections: int = 10
+    keepalive_expiry: datetime.timedelta = datetime.timedelta(seconds=30)
+    timeout: datetime.timedelta = datetime.timedelta(seconds=5)
+    receiver: CabourotteReceiverConfiguration | None = None
+    circuit_breaker: CabourotteCircuitBreakerConfiguration = (
+        CabourotteCircuitBreakerConfiguration()
+    )
 
 
 Name: TypeAlias = Literal["cabourotte"]
@@ -2,7 +2,7 @@ import tomllib
 from pathlib import Path
 from typing import Self
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from anycastd._configuration.conversion import (
     dict_w_items_named_by_key_to_flat_w_name_value,
@@ -11,13 +11,30 @@ from anycastd._configuration.exceptions import (
     ConfigurationFileUnreadableError,
     ConfigurationSyntaxError,
 )
+from anycastd._configuration.healthcheck import CabourotteConfiguration
+from anycastd._configuration.restart import HoldOnRestartConfiguration
+from anycastd._configuration.scheduling import SchedulingConfiguration
 from anycastd._configuration.service import ServiceConfiguration
+from anycastd._configuration.shutdown import ShutdownConfiguration
 
 
 class MainConfiguration(BaseModel, extra="forbid"):
-    """The top-level configuration object."""
+    """The top-level configuration object.
+
+    Attributes:
+        services: The services to manage.
+        cabourotte: Settings shared by all Cabourotte healthchecks.
+        hold_on_restart: Settings for holding prefixes announced across restarts,
+            if enabled.
+        shutdown: Settings for withdrawing prefixes on shutdown.
+        scheduling: Settings for scheduling health check evaluations.
+    """
 
     services: tuple[ServiceConfiguration, ...]
+    cabourotte: CabourotteConfiguration = CabourotteConfiguration()
+    hold_on_restart: HoldOnRestartConfiguration | None = None
+    shutdown: ShutdownConfiguration = ShutdownConfiguration()
+    scheduling: SchedulingConfiguration = SchedulingConfiguration()
 
     @classmethod
     def from_toml_file(cls, path: Path) -> Self:
@@ -60,7 +77,11 @@ class MainConfiguration(BaseModel, extra="forbid"):
                     "prefixes": {"bgpd": ["2001:db8::bad:1dea"]},
                     "checks": {"pingd": ["flaky-backend"]},
                 },
-            }
+            },
+            "cabourotte": {"max_connections": 4, "timeout": 2},
+            "hold_on_restart": {"grace_period": 60},
+            "shutdown": {"timeout": 5},
+            "scheduling": {"stagger": True, "max_requests_per_second": 20},
         }
         ```
 
@@ -79,7 +100,29 @@ class MainConfiguration(BaseModel, extra="forbid"):
             )
         )
 
-        return cls(services=services)
+        try:
+            cabourotte = CabourotteConfiguration.model_validate(
+                data.get("cabourotte", {})
+            )
+            hold_on_restart = (
+                HoldOnRestartConfiguration.model_validate(data["hold_on_restart"])
+                if "hold_on_restart" in data
+                else None
+            )
+            shutdown = ShutdownConfiguration.model_validate(data.get("shutdown", {}))
+            scheduling = SchedulingConfiguration.model_validate(
+                data.get("scheduling", {})
+            )
+        except ValidationError as exc:
+            raise ConfigurationSyntaxError.from_validation_error(exc) from exc
+
+        return cls(
+            services=services,
+            cabourotte=cabourotte,
+            hold_on_restart=hold_on_restart,
+            shutdown=shutdown,
+            scheduling=scheduling,
+        )
 
 
 def _read_toml_configuration(path: Path) -> dict:
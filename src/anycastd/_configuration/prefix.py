@@ -17,11 +17,18 @@ class FRRPrefixConfiguration(PrefixConfiguration):
         prefix: The prefix to advertise.
         vrf: The VRF to advertise the prefix in.
         vtysh: The path to the vtysh binary.
+        vty_socket: The path to the VTY socket of the BGP daemon. If given,
+            commands are sent to it directly instead of using the vtysh.
+        route_map: The route-map gating the prefix. If given, the prefix is
+            announced and denounced by flipping the route-map, which should be
+            shared by all prefixes of a service.
     """
 
     prefix: IPv4Network | IPv6Network
     vrf: VRF = None
     vtysh: Path = Path("/usr/bin/vtysh")
+    vty_socket: Path | None = None
+    route_map: str | None = None
 
 
 Name: TypeAlias = Literal["frrouting"]
@@ -0,0 +1,17 @@
+import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+class HoldOnRestartConfiguration(BaseModel, extra="forbid"):
+    """The configuration for holding prefixes announced across restarts.
+
+    Attributes:
+        state_file: The path of the file the state of services is written to on
+            shutdown, to be resumed by the next process.
+        grace_period: The time for which a held state is trusted after shutdown.
+    """
+
+    state_file: Path = Path("/var/lib/anycastd/state.json")
+    grace_period: datetime.timedelta = datetime.timedelta(seconds=30)
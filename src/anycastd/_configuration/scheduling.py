@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field, PositiveFloat, PositiveInt
+
+
+class SchedulingConfiguration(BaseModel, extra="forbid"):
+    """The configuration for scheduling health check evaluations.
+
+    Attributes:
+        stagger: Whether to evaluate each health check at a fixed phase offset
+            within its interval, instead of evaluating checks sharing an interval
+            at the same time.
+        jitter: The maximum fraction of the interval by which evaluations are
+            postponed at random.
+        max_requests_per_second: The maximum number of health check requests
+            per second across all health checks. If omitted, requests are not
+            limited.
+        burst: The number of health check requests allowed at once when
+            limiting requests.
+    """
+
+    stagger: bool = False
+    jitter: float = Field(default=0.0, ge=0.0, le=0.5)
+    max_requests_per_second: PositiveFloat | None = None
+    burst: PositiveInt = 1
@@ -1,5 +1,8 @@
+import datetime
 from dataclasses import dataclass
-from typing import Self
+from typing import Annotated, Self
+
+from pydantic import Field, TypeAdapter, ValidationError
 
 from anycastd._configuration import healthcheck, prefix
 from anycastd._configuration.exceptions import ConfigurationSyntaxError
@@ -9,11 +12,30 @@ from anycastd._configuration.prefix import PrefixConfiguration
 
 @dataclass
 class ServiceConfiguration:
-    """A service configuration."""
+    """A service configuration.
+
+    Attributes:
+        name: The name of the service.
+        prefixes: The prefixes of the service.
+        checks: The health checks of the service.
+        rise: The number of consecutive healthy results required for checks of
+            the service to become healthy, unless configured for the check itself.
+        fall: The number of consecutive unhealthy results required for checks of
+            the service to become unhealthy, unless configured for the check itself.
+        evaluation_deadline: The time within which all health checks of the
+            service must be evaluated, if bounded.
+        keep_result_cycles: The number of consecutive evaluations exceeding the
+            deadline for which the last result is kept before treating the
+            service as unhealthy.
+    """
 
     name: str
     prefixes: tuple[PrefixConfiguration, ...]
     checks: tuple[HealthcheckConfiguration, ...]
+    rise: int | None = None
+    fall: int | None = None
+    evaluation_deadline: datetime.timedelta | None = None
+    keep_result_cycles: int = 0
 
     @classmethod
     def from_configuration_dict(cls, data: dict) -> Self:
@@ -26,6 +48,10 @@ class ServiceConfiguration:
         ```python
         {
             "name": "important-API",
+            "rise": 2,
+            "fall": 3,
+            "evaluation_deadline": 2,
+            "keep_result_cycles": 1,
             "prefixes": {"routingd": ["2001:db8::aced:a11:7e57"]},
             "checks": {
                 "healthd": [{"interval": "1s", "name": "important-API-healthy"}]
@@ -42,6 +68,10 @@ class ServiceConfiguration:
             keyed_checks = data["checks"]
         except KeyError as exc:
             raise ConfigurationSyntaxError.from_key_error(exc) from exc
+        rise = _get_integer(data, "rise", minimum=1)
+        fall = _get_integer(data, "fall", minimum=1)
+        evaluation_deadline = _get_duration(data, "evaluation_deadline")
+        keep_result_cycles = _get_integer(data, "keep_result_cycles", minimum=0) or 0
 
         prefixes = []
         for prefix_type, prefix_configs in keyed_prefixes.items():
@@ -57,4 +87,54 @@ class ServiceConfiguration:
             for config in check_configs:
                 checks.append(check_class.from_configuration(config))
 
-        return cls(name=name, prefixes=tuple(prefixes), checks=tuple(checks))
+        return cls(
+            name=name,
+            prefixes=tuple(prefixes),
+            checks=tuple(checks),
+            rise=rise,
+            fall=fall,
+            evaluation_deadline=evaluation_deadline,
+            keep_result_cycles=keep_result_cycles,
+        )
+
+
+def _get_integer(data: dict, key: str, *, minimum: int) -> int | None:
+    """Get an integer from service configuration data, if present.
+
+    Raises:
+        ConfigurationSyntaxError: The value is not an integer of at least the minimum.
+    """
+    value = data.get(key)
+    if value is not None and (
+        not isinstance(value, int) or isinstance(value, bool) or value < minimum
+    ):
+        raise ConfigurationSyntaxError(
+            f"invalid input '{value}' for field '{key}': "
+            f"Input should be an integer of at least {minimum}"
+        )
+    return value
+
+
+_positive_duration: TypeAdapter[datetime.timedelta] = TypeAdapter(
+    Annotated[datetime.timedelta, Field(gt=datetime.timedelta(0))]
+)
+
+
+def _get_duration(data: dict, key: str) -> datetime.timedelta | None:
+    """Get a positive duration from service configuration data, if present.
+
+    Durations are validated like those of other configuration sections, given
+    either as a number of seconds or as an ISO 8601 duration string.
+
+    Raises:
+        ConfigurationSyntaxError: The value is not a positive duration.
+    """
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return _positive_duration.validate_python(value)
+    except ValidationError as exc:
+        raise ConfigurationSyntaxError(
+            f"invalid input '{value}' for field '{key}': {exc.errors()[0]['msg']}"
+        ) from exc
@@ -0,0 +1,14 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class ShutdownConfiguration(BaseModel, extra="forbid"):
+    """The configuration for shutting down anycastd.
+
+    Attributes:
+        timeout: The time allowed for withdrawing all announced prefixes
+            on shutdown.
+    """
+
+    timeout: datetime.timedelta = datetime.timedelta(seconds=10)
@@ -1,12 +1,18 @@
 from typing import Self, final
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ConfigDict, ValidationError
 
 from anycastd._configuration.exceptions import ConfigurationSyntaxError
 
 
 class SubConfiguration(BaseModel, extra="forbid"):
-    """The base class from which all sub-configuration classes must inherit."""
+    """The base class from which all sub-configuration classes must inherit.
+
+    Sub-configurations are immutable and hashable, allowing identical
+    configurations to be used as keys, e.g. to share instances created from them.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     @final
     @classmethod
@@ -9,13 +9,15 @@ class Executor(Protocol):
     """An interface to execute programs."""
 
     async def create_subprocess_exec(
-        self, program: str | Path, *args: str
+        self, program: str | Path, *args: str, merge_stderr: bool = False
     ) -> asyncio.subprocess.Process:
         """Create an async subprocess.
 
         Args:
             program: The path of the program to execute.
             args: The arguments to pass to the program.
+            merge_stderr: Whether to redirect stderr of the subprocess into its
+                stdout, preserving the order in which output was written.
 
         Returns:
             An asyncio.subprocess.Process object.
@@ -23,33 +25,38 @@ class Executor(Protocol):
         raise NotImplementedError
 
 
-@dataclass
+@dataclass(frozen=True)
 class LocalExecutor:
     """An executor that runs commands locally."""
 
     async def create_subprocess_exec(
-        self, program: str | Path, *args: str
+        self, program: str | Path, *args: str, merge_stderr: bool = False
     ) -> asyncio.subprocess.Process:
         """Create an async subprocess.
 
-        This method simply wraps asyncio.create_subprocess_exec.
+        This method simply wraps asyncio.create_subprocess_exec, connecting
+        stdin, stdout and stderr of the subprocess to pipes.
 
         Args:
             program: The path of the program to execute.
             args: The arguments to pass to the program.
+            merge_stderr: Whether to redirect stderr of the subprocess into its
+                stdout, preserving the order in which output was written.
 
         Returns:
             An asyncio.subprocess.Process object.
         """
+        stderr = asyncio.subprocess.STDOUT if merge_stderr else asyncio.subprocess.PIPE
         return await asyncio.create_subprocess_exec(
             program,
             *args,
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            stderr=stderr,
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class DockerExecutor:
     """An executor that runs commands in a Docker container.
 
@@ -62,7 +69,7 @@ class DockerExecutor:
     container: str
 
     async def create_subprocess_exec(
-        self, program: str | Path, *args: str
+        self, program: str | Path, *args: str, merge_stderr: bool = False
     ) -> asyncio.subprocess.Process:
         """Create an async subprocess inside of a Docker container.
 
@@ -72,14 +79,18 @@ class DockerExecutor:
         Args:
             program: The path of the program to execute.
             args: The arguments to pass to the program.
+            merge_stderr: Whether to redirect stderr of the subprocess into its
+                stdout, preserving the order in which output was written.
 
         Returns:
             An asyncio.subprocess.Process object.
         """
         docker_args = ("exec", "-i", self.container, program, *args)
+        stderr = asyncio.subprocess.STDOUT if merge_stderr else asyncio.subprocess.PIPE
         return await asyncio.create_subprocess_exec(
             self.docker,
             *docker_args,
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            stderr=stderr,
         )
@@ -1,3 +1,4 @@
 from anycastd.core._exit import ExitCode
-from anycastd.core._run import run_from_configuration
+from anycastd.core._run import expire_held_state, run_from_configuration
+from anycastd.core._scheduler import HealthcheckScheduler
 from anycastd.core._service import Service
@@ -2,45 +2,237 @@ import asyncio
 import signal
 import sys
 from collections.abc import Iterable
+from contextlib import suppress
 from functools import partial
-from typing import NoReturn
+from pathlib import Path
 
 import structlog
 
-from anycastd._configuration import MainConfiguration, config_to_service
+from anycastd._configuration import (
+    HoldOnRestartConfiguration,
+    MainConfiguration,
+    apply_cabourotte_configuration,
+    apply_scheduling_configuration,
+    config_to_cabourotte_receiver,
+    configs_to_services,
+)
 from anycastd.core._exit import ExitCode
+from anycastd.core._scheduler import HealthcheckScheduler
 from anycastd.core._service import Service
+from anycastd.core._state import HeldState, read_held_state, write_held_state
+from anycastd.healthcheck import cabourotte_client_pool
+from anycastd.prefix import Prefix, vty_session_pool, vtysh_session_pool
 
 logger = structlog.get_logger()
 
+# Interval at which the watchdog checks whether a held state was taken over.
+WATCHDOG_POLL_INTERVAL = 1.0
+
 
 async def run_from_configuration(configuration: MainConfiguration) -> None:
     """Run anycastd using an instance of the main configuration."""
-    services = tuple(config_to_service(config) for config in configuration.services)
-    await run_services(services)
+    apply_cabourotte_configuration(configuration.cabourotte)
+    apply_scheduling_configuration(configuration.scheduling)
+    services = configs_to_services(configuration.services)
+    receiver_task = await _start_cabourotte_receiver(configuration, services)
+    hold_on_restart = configuration.hold_on_restart
+    hold_state_file = None
+    if hold_on_restart is not None:
+        resume_held_state(hold_on_restart, services)
+        hold_state_file = hold_on_restart.state_file
+    try:
+        await run_services(
+            services,
+            hold_state_file=hold_state_file,
+            shutdown_timeout=configuration.shutdown.timeout.total_seconds(),
+        )
+    finally:
+        if receiver_task is not None:
+            receiver_task.cancel()
+            # Failures have been logged when the receiver stopped.
+            with suppress(asyncio.CancelledError, Exception):
+                await receiver_task
+        await cabourotte_client_pool.aclose()
+        await vtysh_session_pool.aclose()
+        await vty_session_pool.aclose()
+
+
+async def _start_cabourotte_receiver(
+    configuration: MainConfiguration, services: Iterable[Service]
+) -> asyncio.Task | None:
+    """Start receiving results pushed by cabourotte, if enabled.
+
+    The receiver starts listening before services are run, so that failing to
+    listen, e.g. since the port is already in use, fails startup.
+
+    Returns:
+        The task serving the receiver, or None if receiving is not enabled.
+    """
+    receiver = config_to_cabourotte_receiver(configuration.cabourotte, services)
+    if receiver is None:
+        return None
+
+    try:
+        server = await receiver.start()
+    except OSError as exc:
+        logger.error(
+            "Failed to receive cabourotte results on %s:%s.",
+            receiver.host,
+            receiver.port,
+            host=receiver.host,
+            port=receiver.port,
+            exc_info=exc,
+        )
+        sys.exit(ExitCode.UNAVAILABLE)
+
+    task = asyncio.create_task(server.serve_forever(), name="cabourotte-receiver")
+    task.add_done_callback(_log_receiver_failure)
+    return task
+
+
+def _log_receiver_failure(task: asyncio.Task) -> None:
+    """Log the failure of the task serving the cabourotte receiver, if any."""
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        logger.error(
+            "Stopped receiving cabourotte results due to an unexpected error, "
+            "relying on requested results only.",
+            exc_info=exc,
+        )
+
+
+def resume_held_state(
+    configuration: HoldOnRestartConfiguration, services: Iterable[Service]
+) -> None:
+    """Resume the state held by a previous process, if any.
+
+    The state file is consumed, signaling a running watchdog that a new process
+    took over the held prefixes. Held states of services whose prefixes changed
+    in the meantime are ignored.
+    """
+    state = read_held_state(configuration.state_file)
+    if state is None:
+        return
+    configuration.state_file.unlink(missing_ok=True)
+
+    remaining = state.remaining(configuration.grace_period).total_seconds()
+    if remaining <= 0:
+        logger.warning(
+            "Ignoring held state from %s since its grace period expired.",
+            state.timestamp.isoformat(),
+            state_file=configuration.state_file.as_posix(),
+        )
+        return
 
+    for service in services:
+        held = state.services.get(service.name)
+        if held is not None and held.matches(service):
+            service.resume_held_state(healthy=held.healthy, grace_period=remaining)
 
-async def run_services(services: Iterable[Service]) -> None:
+
+async def expire_held_state(configuration: MainConfiguration) -> None:
+    """Denounce held prefixes if no process takes them over in time.
+
+    Waits until the grace period of the held state has expired, returning as
+    soon as a new process consumed the state. If the state has not been
+    consumed by then, the prefixes of all held services are denounced and the
+    state is removed.
+    Since a new process needs to be started while waiting, the watchdog must
+    not delay starting it, e.g. by running it detached from the stopped process.
+    """
+    hold_on_restart = configuration.hold_on_restart
+    if hold_on_restart is None:
+        logger.warning("Holding prefixes on restart is not enabled, nothing to do.")
+        return
+
+    state_file = hold_on_restart.state_file
+    state = read_held_state(state_file)
+    if state is None:
+        logger.info("No held state found in %s.", state_file.as_posix())
+        return
+
+    while True:
+        remaining = state.remaining(hold_on_restart.grace_period).total_seconds()
+        await asyncio.sleep(min(max(remaining, 0), WATCHDOG_POLL_INTERVAL))
+        current = read_held_state(state_file)
+        if current is None:
+            logger.info("Held state was taken over by a new process.")
+            return
+        if current.timestamp != state.timestamp:
+            # Another process held its state meanwhile, restarting the grace period.
+            state = current
+        elif remaining <= WATCHDOG_POLL_INTERVAL:
+            break
+
+    services = tuple(
+        service
+        for service in configs_to_services(configuration.services)
+        if service.name in state.services
+    )
+    logger.warning(
+        "Held state expired without being taken over, denouncing prefixes of "
+        "%s services.",
+        len(services),
+        state_file=state_file.as_posix(),
+    )
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for service in services:
+                tg.create_task(service.denounce_all_prefixes())
+    finally:
+        await vtysh_session_pool.aclose()
+        await vty_session_pool.aclose()
+    state_file.unlink(missing_ok=True)
+
+
+async def run_services(
+    services: Iterable[Service],
+    *,
+    hold_state_file: Path | None = None,
+    shutdown_timeout: float = 10.0,
+) -> None:
     """Run services until termination.
 
     A signal handler is installed to manage termination. When a SIGTERM or SIGINT
-    signal is received, graceful termination is managed by the handler.
+    signal is received, all services are stopped and the prefixes they announced
+    are withdrawn at once, after which the process exits.
+    Health checks of all services are evaluated by a single shared scheduler.
+    Before running services, prefixes that are already announced are adopted,
+    avoiding to denounce and announce them again on restarts.
 
     Args:
         services: The services to run.
+        hold_state_file: If given, prefixes are left in their current state on
+            termination, writing the state of all services to this file to be
+            resumed by the next process. If the state cannot be written, prefixes
+            are withdrawn instead.
+        shutdown_timeout: The number of seconds allowed for withdrawing prefixes
+            on termination.
     """
+    shutdown = asyncio.Event()
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(sig, partial(signal_handler, sig))
+        loop.add_signal_handler(sig, partial(signal_handler, sig, shutdown))
 
-    tasks = []
+    services = tuple(services)
+    await asyncio.gather(*(service.adopt_announced_prefixes() for service in services))
+
+    scheduler = HealthcheckScheduler()
+    scheduler_task = asyncio.create_task(scheduler.run(), name="scheduler")
+
+    tasks: list[asyncio.Task] = []
     try:
         async with asyncio.TaskGroup() as tg:
             for service in services:
-                tasks.append(tg.create_task(service.run(), name=service.name))
+                tasks.append(
+                    tg.create_task(
+                        service.run(scheduler=scheduler, denounce_on_terminate=False),
+                        name=service.name,
+                    )
+                )
+            tg.create_task(_cancel_on_shutdown(shutdown, tasks), name="shutdown")
     except ExceptionGroup:
         for task in tasks:
-            if exc := task.exception():
+            if not task.cancelled() and (exc := task.exception()):
                 service_name = task.get_name()
                 logger.error(
                     f'Service "{service_name}" encountered an unexpected '
@@ -55,14 +247,113 @@ async def run_services(services: Iterable[Service]) -> None:
             "Please remediate manually."
         )
         sys.exit(ExitCode.SOFTWARE)
+    finally:
+        scheduler_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await scheduler_task
+
+    if not shutdown.is_set():
+        return
+    if hold_state_file is not None and _hold_prefixes(services, hold_state_file):
+        exit_code = ExitCode.OK
+    else:
+        remaining = await withdraw_prefixes(services, timeout=shutdown_timeout)
+        exit_code = ExitCode.UNAVAILABLE if remaining else ExitCode.OK
+    sys.exit(exit_code)
+
+
+def _hold_prefixes(services: Iterable[Service], state_file: Path) -> bool:
+    """Hold the prefixes of all services by writing their state to a file.
+
+    Returns:
+        Whether the state was written and prefixes are held.
+    """
+    try:
+        write_held_state(state_file, HeldState.from_services(services))
+    except OSError as exc:
+        logger.error(
+            "Failed to write held state to %s, withdrawing prefixes instead.",
+            state_file.as_posix(),
+            state_file=state_file.as_posix(),
+            exc_info=exc,
+        )
+        return False
+    logger.info("Holding prefixes of all services on termination.")
+    return True
 
 
-def signal_handler(signal: signal.Signals) -> NoReturn:
-    """Logs the received signal and terminates all tasks."""
-    msg = f"Received {signal.name}, terminating."
+async def withdraw_prefixes(
+    services: Iterable[Service], *, timeout: float
+) -> tuple[Prefix, ...]:
+    """Withdraw all prefixes announced by services at once.
+
+    All prefixes are denounced concurrently, allowing their commands to be
+    coalesced into as few transactions as possible.
+
+    Args:
+        services: The services whose announced prefixes to withdraw.
+        timeout: The number of seconds after which withdrawing is aborted.
+
+    Returns:
+        The prefixes that could not be withdrawn within the timeout.
+    """
+    prefixes = tuple(
+        prefix for service in services for prefix in service.announced_prefixes
+    )
+    if not prefixes:
+        return ()
+
+    logger.info("Withdrawing %s announced prefixes.", len(prefixes))
+    tasks = tuple(asyncio.create_task(prefix.denounce()) for prefix in prefixes)
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    remaining = tuple(
+        prefix
+        for prefix, task in zip(prefixes, tasks, strict=True)
+        if task in pending or task.exception() is not None
+    )
+    for prefix, task in zip(prefixes, tasks, strict=True):
+        if task not in pending and (exc := task.exception()) is not None:
+            logger.error(
+                "Failed to withdraw prefix %s.",
+                prefix.prefix,
+                prefix=str(prefix.prefix),
+                exc_info=exc,
+            )
+    if remaining:
+        logger.error(
+            "Failed to withdraw %s of %s prefixes within %s seconds. "
+            "Please remediate manually.",
+            len(remaining),
+            len(prefixes),
+            timeout,
+            prefixes=[str(prefix.prefix) for prefix in remaining],
+        )
+    else:
+        logger.info("Withdrew all %s announced prefixes.", len(prefixes))
+    return remaining
+
+
+async def _cancel_on_shutdown(
+    shutdown: asyncio.Event, tasks: list[asyncio.Task]
+) -> None:
+    """Cancel tasks once shutdown was requested, unless they finished before."""
+    requested = asyncio.create_task(shutdown.wait())
+    finished = asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        await asyncio.wait((requested, finished), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        requested.cancel()
+
+    if shutdown.is_set():
+        for task in tasks:
+            task.cancel()
 
-    logger.info(msg)
-    for task in asyncio.all_tasks():
-        task.cancel(msg)
 
-    sys.exit(ExitCode.OK)
+def signal_handler(signal: signal.Signals, shutdown: asyncio.Event) -> None:
+    """Logs the received signal and requests shutdown."""
+    logger.info(f"Received {signal.name}, terminating.")
+    shutdown.set()
@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import partial
+
+import structlog
+
+from anycastd.healthcheck import ObservableHealthcheck
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class HealthcheckScheduler:
+    """Schedules the evaluation of health checks shared by all services.
+
+    The scheduler owns the next due time of every health check scheduled with it,
+    keeping them in a priority queue ordered by monotonic time. A single timer waits
+    for the earliest check to become due, after which all due checks are evaluated.
+    Results are handed to the services owning a check through the check's
+    subscribers, so services only need to wake up when a result changes.
+
+    Checks are queued again whenever their due time may have changed outside of
+    an evaluation, e.g. when receiving a pushed result, superseding their
+    previous entry in the queue.
+    """
+
+    _queue: list[tuple[float, int, ObservableHealthcheck]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _scheduled: set[int] = field(default_factory=set, init=False, repr=False)
+    # The sequence number of the current queue entry of each check.
+    _entries: dict[int, int] = field(default_factory=dict, init=False, repr=False)
+    _evaluations: set[asyncio.Task] = field(default_factory=set, init=False, repr=False)
+    _queue_changed: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False
+    )
+    _sequence: itertools.count = field(
+        default_factory=itertools.count, init=False, repr=False
+    )
+
+    def schedule(self, check: ObservableHealthcheck) -> None:
+        """Schedule a health check to be evaluated whenever it is due.
+
+        Scheduling the same check multiple times has no effect.
+        """
+        if id(check) in self._scheduled:
+            return
+        self._scheduled.add(id(check))
+        check.subscribe_due(partial(self._push, check))
+        self._push(check)
+        logger.debug(
+            'Scheduled health check "%s".', check.name, health_check=check.name
+        )
+
+    def is_scheduled(self, check: ObservableHealthcheck) -> bool:
+        """Whether a health check is scheduled with this scheduler."""
+        return id(check) in self._scheduled
+
+    async def run(self) -> None:
+        """Evaluate scheduled health checks whenever they are due.
+
+        Runs until cancelled, cancelling all running evaluations in the process.
+        """
+        try:
+            while True:
+                self._start_due_evaluations()
+                await self._wait_for_next_due()
+        finally:
+            for evaluation in tuple(self._evaluations):
+                evaluation.cancel()
+
+    def _push(self, check: ObservableHealthcheck) -> None:
+        """Add a health check to the queue based on its next due time.
+
+        The entry supersedes any previous entry of the check.
+        """
+        next_due = check.next_due
+        due = next_due if next_due is not None else time.monotonic()
+        sequence = next(self._sequence)
+        self._entries[id(check)] = sequence
+        heapq.heappush(self._queue, (due, sequence, check))
+        self._queue_changed.set()
+
+    def _start_due_evaluations(self) -> None:
+        """Start evaluating all health checks that are due."""
+        now = time.monotonic()
+        while self._queue and self._queue[0][0] <= now:
+            _, sequence, check = heapq.heappop(self._queue)
+            if self._entries.get(id(check)) != sequence:
+                continue
+
+            # The check may have been evaluated elsewhere since it was queued.
+            next_due = check.next_due
+            if next_due is not None and next_due > now:
+                self._push(check)
+                continue
+
+            evaluation = asyncio.create_task(self._evaluate(check))
+            self._evaluations.add(evaluation)
+            evaluation.add_done_callback(self._evaluations.discard)
+
+    async def _wait_for_next_due(self) -> None:
+        """Wait until the earliest health check is due or the queue changes."""
+        delay = self._queue[0][0] - time.monotonic() if self._queue else None
+        if delay is None or delay > 0:
+            with suppress(TimeoutError):
+                async with asyncio.timeout(delay):
+                    await self._queue_changed.wait()
+        self._queue_changed.clear()
+
+    async def _evaluate(self, check: ObservableHealthcheck) -> None:
+        """Evaluate a health check and queue it again afterwards."""
+        try:
+            await check.refresh()
+        except Exception as exc:
+            logger.error(
+                'An unhandled exception occurred while running health check "%s".',
+                check.name,
+                health_check=check.name,
+                exc_info=exc,
+            )
+        finally:
+            self._push(check)
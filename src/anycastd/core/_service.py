@@ -1,13 +1,23 @@
 import asyncio
+import time
+from contextlib import suppress
 from dataclasses import dataclass, field
 
 import structlog
 
-from anycastd.healthcheck import Healthcheck
+from anycastd.core._scheduler import HealthcheckScheduler
+from anycastd.healthcheck import (
+    CachedHealthcheck,
+    Healthcheck,
+    ObservableHealthcheck,
+)
 from anycastd.prefix import Prefix
 
 logger = structlog.get_logger()
 
+# Interval at which health checks that cannot signal changes are polled.
+POLL_INTERVAL = 0.05
+
 
 @dataclass
 class Service:
@@ -44,14 +54,40 @@ class Service:
     ╎  └─────────────────────────────────┘              └──────────────────┘          ╎
     └─────────────────────────────────────────────────────────────────────────────────┘
     ```
+
+    Attributes:
+        name: The name of the service.
+        prefixes: The prefixes announced while the service is healthy.
+        health_checks: The health checks determining whether the service is healthy.
+        evaluation_deadline: The number of seconds within which all health checks
+            must be evaluated. If omitted, evaluations are not bounded.
+        keep_result_cycles: The number of consecutive evaluations exceeding the
+            deadline for which the last result is kept before treating the
+            service as unhealthy. If zero, the service is treated as unhealthy
+            as soon as the deadline is exceeded.
     """
 
     name: str
     prefixes: tuple[Prefix, ...]
     health_checks: tuple[Healthcheck, ...]
+    evaluation_deadline: float | None = field(default=None, kw_only=True)
+    keep_result_cycles: int = field(default=0, kw_only=True)
 
     _healthy: bool = field(default=False, init=False, repr=False, compare=False)
+    _deadlines_exceeded: int = field(default=0, init=False, repr=False, compare=False)
     _terminate: bool = field(default=False, init=False, repr=False, compare=False)
+    _adopted: tuple[bool, ...] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _grace_deadline: float | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _checks_changed: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False, compare=False
+    )
+    _scheduler: HealthcheckScheduler | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
     _log: structlog.typing.FilteringBoundLogger = field(
         default=logger, init=False, repr=False, compare=False
     )
@@ -61,11 +97,18 @@ class Service:
             raise TypeError("Prefixes must implement the Prefix protocol")
         if not all(isinstance(_, Healthcheck) for _ in self.health_checks):
             raise TypeError("Health checks must implement the Healthcheck protocol")
+        if self.keep_result_cycles < 0:
+            raise ValueError(
+                "The number of cycles to keep results must not be negative."
+            )
         self._log = logger.bind(
             service_name=self.name,
             service_prefixes=[str(prefix.prefix) for prefix in self.prefixes],
             service_health_checks=[check.name for check in self.health_checks],
         )
+        for check in self.health_checks:
+            if isinstance(check, ObservableHealthcheck):
+                check.subscribe(self._on_check_result_changed)
 
     @property
     def healthy(self) -> bool:
@@ -84,28 +127,65 @@ class Service:
                 service_healthy=self.healthy,
             )
 
-    async def run(self) -> None:
+    @property
+    def announced_prefixes(self) -> tuple[Prefix, ...]:
+        """The prefixes that are currently assumed to be announced."""
+        if self._adopted is not None:
+            return tuple(
+                prefix
+                for prefix, announced in zip(self.prefixes, self._adopted, strict=True)
+                if announced
+            )
+        return self.prefixes if self.healthy else ()
+
+    async def run(
+        self,
+        scheduler: HealthcheckScheduler | None = None,
+        *,
+        denounce_on_terminate: bool = True,
+    ) -> None:
         """Run the service.
 
         This will announce the prefixes when all health checks are
         passing, and denounce them otherwise. If the returned coroutine is cancelled,
-        the service will be terminated, denouncing all prefixes in the process.
+        the service will be terminated, denouncing all prefixes in the process
+        unless requested otherwise.
+
+        Between evaluations, the service sleeps until one of its health checks
+        signals a changed result or the next check is due.
+
+        Args:
+            scheduler: A scheduler evaluating observable health checks on behalf
+                of the service. If omitted, the service evaluates checks itself
+                whenever they are due.
+            denounce_on_terminate: Whether to denounce all prefixes on termination.
+                Otherwise, prefixes are left in their current state, e.g. to
+                withdraw them in bulk or hand them over to a restarted process.
         """
         self._log.info(
             'Starting service "%s".', self.name, service_healthy=self.healthy
         )
+        if scheduler is not None:
+            self._scheduler = scheduler
+            for check in self.health_checks:
+                if isinstance(check, ObservableHealthcheck):
+                    scheduler.schedule(check)
         try:
             while not self._terminate:
-                checks_currently_healthy: bool = await self.all_checks_healthy()
+                checks_currently_healthy: bool = await self._evaluate_checks()
 
-                if checks_currently_healthy and not self.healthy:
+                if self._adopted is not None:
+                    await self._reconcile_adopted_prefixes(
+                        healthy=checks_currently_healthy
+                    )
+                elif checks_currently_healthy and not self.healthy:
                     self.healthy = True
                     await self.announce_all_prefixes()
                 elif not checks_currently_healthy and self.healthy:
                     self.healthy = False
                     await self.denounce_all_prefixes()
 
-                await asyncio.sleep(0.05)
+                await self._wait_for_next_evaluation()
 
         except asyncio.CancelledError:
             self._log.debug(
@@ -113,20 +193,239 @@ class Service:
                 self.name,
                 service_healthy=self.healthy,
             )
-            await self.terminate()
+            if denounce_on_terminate:
+                await self.terminate()
+            else:
+                self._terminate = True
+                self._log.info(
+                    'Service "%s" terminated without denouncing its prefixes.',
+                    self.name,
+                    service_healthy=self.healthy,
+                )
+
+    def resume_held_state(self, *, healthy: bool, grace_period: float) -> None:
+        """Resume the state of the service held by a previous process.
+
+        The prefixes of the service are assumed to be announced if the service
+        was healthy and denounced otherwise. This state is trusted until the
+        health checks have been evaluated for the first time, which must happen
+        within the grace period. Otherwise, the service is treated as unhealthy.
+        Adopting the actual state of the prefixes takes precedence over the
+        assumed one.
+
+        Args:
+            healthy: Whether the service was healthy when its state was held.
+            grace_period: The number of seconds for which the state is trusted.
+        """
+        self._adopted = (healthy,) * len(self.prefixes)
+        self._healthy = healthy
+        self._grace_deadline = time.monotonic() + grace_period
+        self._log.info(
+            'Service "%s" resumed held state, trusting it for %.1f seconds.',
+            self.name,
+            grace_period,
+            service_healthy=self.healthy,
+        )
+
+    async def adopt_announced_prefixes(self) -> None:
+        """Adopt the current announcement state of the services prefixes.
+
+        Prefixes may still be announced from a previous run, e.g. after a restart.
+        Instead of announcing or denouncing all prefixes once the health checks
+        have been evaluated for the first time, only prefixes whose state differs
+        from the result of the first evaluation are announced or denounced.
+        If all prefixes are announced, the service is considered healthy until then.
+        """
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = tuple(
+                    tg.create_task(prefix.is_announced()) for prefix in self.prefixes
+                )
+        except ExceptionGroup as exc_group:
+            self._log.warning(
+                'Failed to adopt announced prefixes of service "%s".',
+                self.name,
+                service_healthy=self.healthy,
+                exc_info=exc_group,
+            )
+            return
+
+        self._adopted = tuple(task.result() for task in tasks)
+        self._healthy = bool(self._adopted) and all(self._adopted)
+        self._log.info(
+            'Service "%s" adopted %s of %s prefixes as announced.',
+            self.name,
+            sum(self._adopted),
+            len(self._adopted),
+            service_healthy=self.healthy,
+        )
+
+    async def _reconcile_adopted_prefixes(self, *, healthy: bool) -> None:
+        """Announce or denounce adopted prefixes whose state differs from health."""
+        adopted, self._adopted = self._adopted or (), None
+        self.healthy = healthy
+
+        differing = tuple(
+            prefix
+            for prefix, announced in zip(self.prefixes, adopted, strict=True)
+            if announced is not healthy
+        )
+        async with asyncio.TaskGroup() as tg:
+            for prefix in differing:
+                tg.create_task(prefix.announce() if healthy else prefix.denounce())
+
+    async def _evaluate_checks(self) -> bool:
+        """Evaluate all checks, within the evaluation deadline if any.
+
+        If the deadline is exceeded, the last result is kept for up to the
+        configured number of consecutive evaluations, after which the service
+        is treated as unhealthy.
+        """
+        if self._grace_deadline is not None:
+            return await self._evaluate_checks_within_grace_period()
+        if self.evaluation_deadline is None:
+            return await self.all_checks_healthy()
+
+        try:
+            async with asyncio.timeout(self.evaluation_deadline):
+                healthy = await self.all_checks_healthy()
+        except TimeoutError:
+            self._deadlines_exceeded += 1
+            keep = self._deadlines_exceeded <= self.keep_result_cycles
+            self._log.warning(
+                'Health checks of service "%s" exceeded the evaluation deadline '
+                "of %s seconds, %s.",
+                self.name,
+                self.evaluation_deadline,
+                "keeping the last result"
+                if keep
+                else "treating the service as unhealthy",
+                service_healthy=self.healthy if keep else False,
+                service_deadlines_exceeded=self._deadlines_exceeded,
+            )
+            return self.healthy if keep else False
+
+        self._deadlines_exceeded = 0
+        return healthy
+
+    async def _evaluate_checks_within_grace_period(self) -> bool:
+        """Evaluate all checks within the grace period of a resumed state."""
+        if self._grace_deadline is None:
+            raise RuntimeError("No grace period of a resumed state is pending.")
+        deadline, self._grace_deadline = self._grace_deadline, None
+        try:
+            async with asyncio.timeout(max(deadline - time.monotonic(), 0)):
+                return await self.all_checks_healthy()
+        except TimeoutError:
+            self._log.warning(
+                'Health checks of service "%s" did not complete within the grace '
+                "period of its held state, treating the service as unhealthy.",
+                self.name,
+                service_healthy=False,
+            )
+            return False
+
+    def _on_check_result_changed(self) -> None:
+        """Wake up the service when the result of a health check changed."""
+        self._checks_changed.set()
+
+    def _seconds_until_next_evaluation(self) -> float | None:
+        """Get the number of seconds until the health checks need to be evaluated.
+
+        Health checks that do not signal changes of their result are polled,
+        while observable ones are only evaluated again once they are due.
+        Checks evaluated by a scheduler never require an evaluation since
+        the scheduler signals changes of their results.
+        After the evaluation deadline was exceeded, the checks are evaluated
+        again within the deadline at the latest, since checks that were still
+        in flight may complete without signalling a change.
+
+        Returns:
+            The number of seconds until the next evaluation, or None if no
+            evaluation is required until a health check signals a change.
+        """
+        seconds = self._seconds_until_next_due_check()
+        if self._deadlines_exceeded and self.evaluation_deadline is not None:
+            return min(seconds or self.evaluation_deadline, self.evaluation_deadline)
+        return seconds
+
+    def _seconds_until_next_due_check(self) -> float | None:
+        """Get the number of seconds until the next health check is due."""
+        due_times: list[float] = []
+        for check in self.health_checks:
+            if not isinstance(check, ObservableHealthcheck):
+                return POLL_INTERVAL
+            if self._scheduler is not None and self._scheduler.is_scheduled(check):
+                continue
+            if (next_due := check.next_due) is None:
+                return POLL_INTERVAL
+            due_times.append(next_due)
+
+        if not due_times:
+            return None
+
+        remaining = min(due_times) - time.monotonic()
+        # A check that is still due after being evaluated failed to run,
+        # so retry it after the poll interval instead of spinning.
+        return remaining if remaining > 0 else POLL_INTERVAL
+
+    async def _wait_for_next_evaluation(self) -> None:
+        """Wait until a health check signals a change or the next check is due."""
+        with suppress(TimeoutError):
+            async with asyncio.timeout(self._seconds_until_next_evaluation()):
+                await self._checks_changed.wait()
+        self._checks_changed.clear()
 
     async def all_checks_healthy(self) -> bool:
         """Runs all checks and returns their cumulative result.
 
         Returns True if all health checks report as healthy, False otherwise.
+        Cached results of checks that are not due are read directly, so that
+        only due checks are evaluated, and no tasks are created if none are due.
+        As soon as any health check reports as unhealthy, the remaining checks
+        are cancelled and False is returned, without waiting for slower checks.
         If any health check raises an exception, the remaining checks are aborted,
         the exception(s) are logged, and False is returned.
         """
+        due: list[Healthcheck] = []
+        for check in self.health_checks:
+            cached = (
+                check.cached_status if isinstance(check, CachedHealthcheck) else None
+            )
+            if cached is False:
+                return False
+            if cached is None:
+                due.append(check)
+        if not due:
+            return True
+
         try:
             async with asyncio.TaskGroup() as tg:
-                tasks = tuple(
-                    tg.create_task(_.is_healthy()) for _ in self.health_checks
-                )
+                pending = {
+                    tg.create_task(check.is_healthy(), name=check.name) for check in due
+                }
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    # Failed checks are handled by the task group.
+                    if unhealthy := [
+                        task.get_name()
+                        for task in done
+                        if not task.cancelled()
+                        and task.exception() is None
+                        and not task.result()
+                    ]:
+                        for task in pending:
+                            task.cancel()
+                        self._log.debug(
+                            "Health check(s) %s reported as unhealthy, "
+                            "cancelling %s remaining checks.",
+                            ", ".join(unhealthy),
+                            len(pending),
+                            service_healthy=self.healthy,
+                        )
+                        return False
         except ExceptionGroup as exc_group:
             for exc in exc_group.exceptions:
                 self._log.error(
@@ -140,8 +439,7 @@ class Service:
             )
             return False
 
-        results = (_.result() for _ in tasks)
-        return all(results)
+        return True
 
     async def announce_all_prefixes(self) -> None:
         """Announce all prefixes."""
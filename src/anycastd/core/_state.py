@@ -0,0 +1,136 @@
+import datetime
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+import orjson
+import structlog
+
+from anycastd.core._service import Service
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class ServiceState:
+    """The state of a service at the time of shutdown.
+
+    Attributes:
+        healthy: Whether the service was healthy.
+        prefixes: The prefixes of the service.
+    """
+
+    healthy: bool
+    prefixes: tuple[str, ...]
+
+    @classmethod
+    def from_service(cls, service: Service) -> Self:
+        """Capture the state of a service."""
+        return cls(
+            healthy=service.healthy,
+            prefixes=tuple(str(prefix.prefix) for prefix in service.prefixes),
+        )
+
+    def matches(self, service: Service) -> bool:
+        """Whether the state was captured from a service with the same prefixes."""
+        return set(self.prefixes) == {str(prefix.prefix) for prefix in service.prefixes}
+
+
+@dataclass(frozen=True)
+class HeldState:
+    """The state of all services held on shutdown, to be resumed by the next process.
+
+    Attributes:
+        timestamp: The time at which the state was captured.
+        services: The state of each service by its name.
+    """
+
+    timestamp: datetime.datetime
+    services: dict[str, ServiceState]
+
+    @classmethod
+    def from_services(cls, services: Iterable[Service]) -> Self:
+        """Capture the current state of services."""
+        return cls(
+            timestamp=datetime.datetime.now(tz=datetime.UTC),
+            services={
+                service.name: ServiceState.from_service(service) for service in services
+            },
+        )
+
+    def remaining(self, grace_period: datetime.timedelta) -> datetime.timedelta:
+        """The remaining time of a grace period started at the time of capture."""
+        return self.timestamp + grace_period - datetime.datetime.now(tz=datetime.UTC)
+
+    def to_json(self) -> bytes:
+        """Serialize the state to JSON."""
+        return orjson.dumps(
+            {
+                "timestamp": self.timestamp,
+                "services": {
+                    name: {"healthy": state.healthy, "prefixes": state.prefixes}
+                    for name, state in self.services.items()
+                },
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: bytes) -> Self:
+        """Deserialize a state from JSON.
+
+        Raises:
+            ValueError: The data does not contain a valid state.
+        """
+        try:
+            parsed = orjson.loads(data)
+            return cls(
+                timestamp=datetime.datetime.fromisoformat(parsed["timestamp"]),
+                services={
+                    name: ServiceState(
+                        healthy=bool(state["healthy"]),
+                        prefixes=tuple(state["prefixes"]),
+                    )
+                    for name, state in parsed["services"].items()
+                },
+            )
+        except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Invalid held state: {exc}") from exc
+
+
+def write_held_state(path: Path, state: HeldState) -> None:
+    """Atomically write a held state to a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(state.to_json())
+    os.replace(tmp, path)
+    logger.info(
+        "Wrote held state of %s services to %s.",
+        len(state.services),
+        path.as_posix(),
+        state_file=path.as_posix(),
+    )
+
+
+def read_held_state(path: Path) -> HeldState | None:
+    """Read a held state from a file.
+
+    Returns:
+        The held state, or None if the file does not exist or is invalid.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    try:
+        return HeldState.from_json(data)
+    except ValueError as exc:
+        logger.warning(
+            "Ignoring invalid held state in %s.",
+            path.as_posix(),
+            state_file=path.as_posix(),
+            exc_info=exc,
+        )
+        return None
@@ -1,2 +1,16 @@
+from anycastd.healthcheck._cabourotte.circuit import (
+    circuit_breakers as cabourotte_circuit_breakers,
+)
+from anycastd.healthcheck._cabourotte.client import (
+    client_pool as cabourotte_client_pool,
+)
 from anycastd.healthcheck._cabourotte.main import CabourotteHealthcheck
-from anycastd.healthcheck._main import Healthcheck
+from anycastd.healthcheck._cabourotte.receiver import (
+    ResultReceiver as CabourotteResultReceiver,
+)
+from anycastd.healthcheck._common import request_budget, spread
+from anycastd.healthcheck._main import (
+    CachedHealthcheck,
+    Healthcheck,
+    ObservableHealthcheck,
+)
@@ -0,0 +1,155 @@
+import datetime
+import time
+from dataclasses import dataclass, field
+
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_THRESHOLD = 3
+DEFAULT_BACKOFF = datetime.timedelta(seconds=1)
+DEFAULT_MAX_BACKOFF = datetime.timedelta(seconds=60)
+
+
+@dataclass
+class CircuitBreaker:
+    """A circuit breaker for requests made to a single Cabourotte API.
+
+    The circuit opens after a number of consecutive transport failures, failing
+    requests fast instead of making them. While open, a single probe request is
+    allowed after a backoff that doubles with every failed probe, up to a maximum.
+    The circuit closes again on the first successful request.
+
+    Times are measured using a monotonic clock, as returned by `time.monotonic`.
+
+    Attributes:
+        url: The URL of the Cabourotte API.
+        threshold: The number of consecutive failures opening the circuit.
+        backoff: The time to wait before the first probe of an open circuit.
+        max_backoff: The maximum time to wait between probes.
+        failures: The number of consecutive failures.
+        retry_at: The monotonic time at which the next probe is allowed,
+            None if the circuit is closed.
+    """
+
+    url: str
+    threshold: int = DEFAULT_THRESHOLD
+    backoff: datetime.timedelta = DEFAULT_BACKOFF
+    max_backoff: datetime.timedelta = DEFAULT_MAX_BACKOFF
+    failures: int = field(default=0, init=False)
+    retry_at: float | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if self.threshold < 1:
+            raise ValueError("Threshold must be at least one.")
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the circuit is open."""
+        return self.retry_at is not None
+
+    def allow(self) -> bool:
+        """Whether a request should be made, either normally or as a probe."""
+        if self.retry_at is None:
+            return True
+        if time.monotonic() < self.retry_at:
+            return False
+        # Allow a single probe, postponing further ones until it failed again.
+        self.retry_at = time.monotonic() + self._current_backoff()
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit if open."""
+        if self.retry_at is not None:
+            logger.info(
+                "Cabourotte API at %s is reachable again, closing circuit.",
+                self.url,
+                url=self.url,
+            )
+        self.failures = 0
+        self.retry_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if the threshold is reached."""
+        self.failures += 1
+        if self.failures < self.threshold:
+            return
+
+        backoff = self._current_backoff()
+        if self.retry_at is None:
+            logger.warning(
+                "Cabourotte API at %s is unreachable after %s consecutive failures, "
+                "opening circuit and probing with backoff.",
+                self.url,
+                self.failures,
+                url=self.url,
+                failures=self.failures,
+            )
+        else:
+            logger.debug(
+                "Probe of Cabourotte API at %s failed, retrying in %s seconds.",
+                self.url,
+                backoff,
+                url=self.url,
+                failures=self.failures,
+            )
+        self.retry_at = time.monotonic() + backoff
+
+    def _current_backoff(self) -> float:
+        """The backoff in seconds after the current number of failures."""
+        probes = max(self.failures - self.threshold, 0)
+        return min(
+            self.backoff.total_seconds() * 2.0 ** min(probes, 32),
+            self.max_backoff.total_seconds(),
+        )
+
+
+@dataclass
+class CircuitBreakers:
+    """Circuit breakers shared by all Cabourotte checks, one for each URL.
+
+    Attributes:
+        threshold: The failure threshold of newly created circuit breakers.
+        backoff: The initial backoff of newly created circuit breakers.
+        max_backoff: The maximum backoff of newly created circuit breakers.
+    """
+
+    threshold: int = DEFAULT_THRESHOLD
+    backoff: datetime.timedelta = DEFAULT_BACKOFF
+    max_backoff: datetime.timedelta = DEFAULT_MAX_BACKOFF
+
+    _breakers: dict[str, CircuitBreaker] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def configure(
+        self,
+        *,
+        threshold: int,
+        backoff: datetime.timedelta,
+        max_backoff: datetime.timedelta,
+    ) -> None:
+        """Configure circuit breakers created afterwards."""
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Get the circuit breaker for a Cabourotte base URL, creating it if needed."""
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                url,
+                threshold=self.threshold,
+                backoff=self.backoff,
+                max_backoff=self.max_backoff,
+            )
+            self._breakers[url] = breaker
+        return breaker
+
+    def clear(self) -> None:
+        """Forget all circuit breakers along with their state."""
+        self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakers()
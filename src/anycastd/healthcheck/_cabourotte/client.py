@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+
+import httpx
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=10, max_keepalive_connections=10, keepalive_expiry=30
+)
+DEFAULT_TIMEOUT = httpx.Timeout(5)
+
+
+@dataclass
+class ClientPool:
+    """Keep-alive, connection pooled HTTP clients shared by all Cabourotte checks.
+
+    A single client is kept for each Cabourotte base URL, reusing connections
+    across requests instead of establishing a new connection for every result.
+
+    Attributes:
+        limits: The connection pool limits of newly created clients.
+        timeout: The request timeout of newly created clients.
+    """
+
+    limits: httpx.Limits = field(default_factory=lambda: DEFAULT_LIMITS)
+    timeout: httpx.Timeout = field(default_factory=lambda: DEFAULT_TIMEOUT)
+
+    _clients: dict[str, httpx.AsyncClient] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def configure(self, *, limits: httpx.Limits, timeout: httpx.Timeout) -> None:
+        """Configure the pool limits and timeout of clients created afterwards."""
+        self.limits = limits
+        self.timeout = timeout
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Get the client for a Cabourotte base URL, creating it if required."""
+        client = self._clients.get(url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._clients[url] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close all clients along with their connections."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+client_pool = ClientPool()
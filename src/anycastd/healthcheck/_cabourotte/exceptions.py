@@ -24,3 +24,11 @@ class CabourotteCheckNotFoundError(CabourotteCheckError):
     def __init__(self, name: str, url: str):
         spec = "The check could not be found"
         super().__init__(name, url, spec)
+
+
+class CabourotteCircuitOpenError(CabourotteCheckError):
+    """The Cabourotte API is unreachable and no request was made."""
+
+    def __init__(self, name: str, url: str):
+        spec = "The Cabourotte API is unreachable, failing fast"
+        super().__init__(name, url, spec)
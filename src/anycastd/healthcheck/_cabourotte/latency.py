@@ -0,0 +1,93 @@
+import datetime
+import math
+from collections import deque
+from dataclasses import dataclass, field
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class DurationThreshold:
+    """Tracks whether the durations of successful check executions are too slow.
+
+    Durations are either compared to the maximum duration one by one, or, if a
+    percentile is given, the percentile of a moving window of recent durations
+    is compared instead, tolerating occasional outliers.
+
+    To avoid flapping, the check only becomes slow after a number of consecutive
+    slow observations and fast again after a number of consecutive fast ones.
+
+    Attributes:
+        name: The name of the check, used for logging.
+        max_duration: The maximum duration of a check execution.
+        percentile: The percentile of the moving window to compare, or None to
+            compare each duration on its own.
+        window: The number of recent durations the percentile is taken over.
+        rise: The number of consecutive fast observations required to become fast.
+        fall: The number of consecutive slow observations required to become slow.
+        slow: Whether the check is currently considered too slow.
+    """
+
+    name: str
+    max_duration: datetime.timedelta
+    percentile: float | None = None
+    window: int = 10
+    rise: int = 1
+    fall: int = 1
+    slow: bool = field(default=False, init=False)
+
+    _durations: deque[datetime.timedelta] = field(init=False, repr=False)
+    _fast_count: int = field(default=0, init=False, repr=False)
+    _slow_count: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.percentile is not None and not 0 < self.percentile <= 100:  # noqa: PLR2004
+            raise ValueError("Percentile must be above 0 and at most 100.")
+        if self.window < 1 or self.rise < 1 or self.fall < 1:
+            raise ValueError("Window, rise and fall must be at least one.")
+        self._durations = deque(maxlen=self.window)
+
+    def observe(self, duration: datetime.timedelta) -> bool:
+        """Observe the duration of a check execution.
+
+        Returns:
+            Whether the check is considered too slow after the observation.
+        """
+        self._durations.append(duration)
+        observed = self._observed()
+        if observed > self.max_duration:
+            self._fast_count, self._slow_count = 0, self._slow_count + 1
+        else:
+            self._fast_count, self._slow_count = self._fast_count + 1, 0
+
+        if not self.slow and self._slow_count >= self.fall:
+            self.slow = True
+            logger.warning(
+                'Cabourotte health check "%s" took %s, exceeding the maximum '
+                "duration of %s, returning an unhealthy status.",
+                self.name,
+                observed,
+                self.max_duration,
+                name=self.name,
+            )
+        elif self.slow and self._fast_count >= self.rise:
+            self.slow = False
+            logger.info(
+                'Cabourotte health check "%s" took %s, within the maximum '
+                "duration of %s again.",
+                self.name,
+                observed,
+                self.max_duration,
+                name=self.name,
+            )
+        return self.slow
+
+    def _observed(self) -> datetime.timedelta:
+        """The duration to compare, either the latest or the moving percentile."""
+        if self.percentile is None:
+            return self._durations[-1]
+        ordered = sorted(self._durations)
+        rank = math.ceil(self.percentile / 100 * len(ordered))
+        return ordered[max(rank, 1) - 1]
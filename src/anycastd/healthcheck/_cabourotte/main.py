@@ -1,22 +1,57 @@
+import asyncio
 import datetime
+import time
 from dataclasses import dataclass, field
 
 import structlog
 
-from anycastd.healthcheck._cabourotte.exceptions import CabourotteCheckNotFoundError
-from anycastd.healthcheck._cabourotte.result import get_result
-from anycastd.healthcheck._common import CheckCoroutine, interval_check
+from anycastd.healthcheck._cabourotte.exceptions import (
+    CabourotteCheckError,
+    CabourotteCheckNotFoundError,
+    CabourotteCircuitOpenError,
+)
+from anycastd.healthcheck._cabourotte.latency import DurationThreshold
+from anycastd.healthcheck._cabourotte.result import (
+    LeanResult,
+    Result,
+    get_batched_result,
+    subscribe_results,
+)
+from anycastd.healthcheck._common import (
+    IntervalCheck,
+    ResultListener,
+    interval_check,
+)
 
 logger = structlog.get_logger()
 
+# The time allowed for cabourotte to publish a result after it is expected.
+RESULT_DELAY = datetime.timedelta(milliseconds=500)
+
 
 @dataclass
 class CabourotteHealthcheck:
     name: str
     url: str = field(kw_only=True)
     interval: datetime.timedelta = field(kw_only=True)
+    rise: int = field(default=1, kw_only=True)
+    fall: int = field(default=1, kw_only=True)
+    timeout: datetime.timedelta | None = field(default=None, kw_only=True)
+    max_interval: datetime.timedelta | None = field(default=None, kw_only=True)
+    max_age: datetime.timedelta | None = field(default=None, kw_only=True)
+    max_duration: datetime.timedelta | None = field(default=None, kw_only=True)
+    duration_percentile: float | None = field(default=None, kw_only=True)
+    duration_window: int = field(default=10, kw_only=True)
+    duration_rise: int = field(default=1, kw_only=True)
+    duration_fall: int = field(default=1, kw_only=True)
 
-    _check: CheckCoroutine = field(init=False, repr=False, compare=False)
+    _check: IntervalCheck = field(init=False, repr=False, compare=False)
+    _latest: datetime.datetime | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _duration: DurationThreshold | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
         if not isinstance(self.interval, datetime.timedelta):
@@ -25,15 +60,60 @@ class CabourotteHealthcheck:
             raise TypeError("Name must be a string.")
         if not isinstance(self.url, str):
             raise TypeError("URL must be a string.")
-        self._check = interval_check(self.interval, self._get_status)
+        if self.timeout is not None and not isinstance(
+            self.timeout, datetime.timedelta
+        ):
+            raise TypeError("Timeout must be a timedelta.")
+        if self.max_interval is not None and not isinstance(
+            self.max_interval, datetime.timedelta
+        ):
+            raise TypeError("Maximum interval must be a timedelta.")
+        if self.max_age is not None and not isinstance(
+            self.max_age, datetime.timedelta
+        ):
+            raise TypeError("Maximum age must be a timedelta.")
+        if self.max_duration is not None:
+            if not isinstance(self.max_duration, datetime.timedelta):
+                raise TypeError("Maximum duration must be a timedelta.")
+            self._duration = DurationThreshold(
+                self.name,
+                self.max_duration,
+                percentile=self.duration_percentile,
+                window=self.duration_window,
+                rise=self.duration_rise,
+                fall=self.duration_fall,
+            )
+        self._check = interval_check(
+            self.interval,
+            self._get_status,
+            rise=self.rise,
+            fall=self.fall,
+            key=f"{self.url}/result/{self.name}",
+            max_interval=self.max_interval,
+        )
+        subscribe_results(self.name, self.receive, url=self.url)
+
+    async def _get_status(self) -> bool | None:
+        """Get the current status of the check as reported by cabourotte.
+
+        Results requested by any check of the same cabourotte API are received
+        by all of them, including this one.
 
-    async def _get_status(self) -> bool:
-        """Get the current status of the check as reported by cabourotte."""
-        log = logger.bind(name=self.name, url=self.url, interval=str(self.interval))
+        Returns:
+            Whether the check is healthy, or None if cabourotte has not produced
+            a new result since the last one, or the result has been received
+            already, since it was counted then. Results exceeding the maximum
+            age are unhealthy whenever requested, since their age keeps growing
+            until cabourotte produces a new one.
+        """
+        log = logger.bind(
+            name=self.name, url=self.url, interval=str(self.current_interval)
+        )
 
         log.debug('Cabourotte health check "%s" awaiting check result.', self.name)
+        latest = self._latest
         try:
-            result = await get_result(self.name, url=self.url)
+            result = await self._get_result()
         except CabourotteCheckNotFoundError as exc:
             log.error(
                 'Cabourotte health check "%s" does not exist, '
@@ -42,14 +122,176 @@ class CabourotteHealthcheck:
                 exc_info=exc,
             )
             return False
+        except CabourotteCircuitOpenError:
+            # The circuit breaker logs changes to its state once for all checks.
+            log.debug(
+                'Cabourotte health check "%s" failing fast since the API is '
+                "unreachable, returning an unhealthy status.",
+                self.name,
+            )
+            return False
         log.debug(
             'Cabourotte health check "%s" received check result.',
             self.name,
             result=result,
         )
 
+        if self._latest != latest:
+            # The result was received along with the results of other checks.
+            return None
+        if latest is not None and result.timestamp <= latest:
+            self._expect_next(result)
+            return False if self._expired(result) else None
+        self._latest = result.timestamp
+        return self._assess(result)
+
+    def _assess(self, result: LeanResult | Result) -> bool:
+        """Assess the freshness of a new result, returning whether it is healthy.
+
+        Results older than the maximum age are unhealthy regardless of their
+        success, so that a check cabourotte stopped executing does not keep
+        reporting its last result. Successful results are unhealthy while the
+        check is too slow, if a maximum duration is given.
+        """
+        self._expect_next(result)
+        if self._expired(result):
+            return False
+        if result.success and self._duration is not None:
+            # Cabourotte reports durations in milliseconds.
+            duration = datetime.timedelta(milliseconds=result.duration)
+            return not self._duration.observe(duration)
         return result.success
 
+    def _expect_next(self, result: LeanResult | Result) -> None:
+        """Expect the next result one interval after a result was produced.
+
+        This way, the next result is not requested before it can exist. Since
+        checks of the same cabourotte API receive the results of every request,
+        requests follow the earliest result expected by any of them instead of
+        the phase offset of each check when staggering.
+        """
+        until_next = self.interval - _age(result) + RESULT_DELAY
+        self._check.expect_result(
+            time.monotonic() + until_next.total_seconds()
+            if datetime.timedelta(0) < until_next <= self.interval + RESULT_DELAY
+            else None
+        )
+
+    def _expired(self, result: LeanResult | Result) -> bool:
+        """Whether a result exceeds the maximum age, logging a warning if so."""
+        age = _age(result)
+        if self.max_age is not None and age > self.max_age:
+            logger.warning(
+                'Cabourotte health check "%s" result is %s old, exceeding the '
+                "maximum age of %s, returning an unhealthy status.",
+                self.name,
+                age,
+                self.max_age,
+                name=self.name,
+                url=self.url,
+                result=result,
+            )
+            return True
+        return False
+
+    async def _get_result(self) -> LeanResult:
+        """Get the result of the check, within the timeout of the check if any.
+
+        Raises:
+            CabourotteCheckError: The result could not be retrieved in time.
+        """
+        if self.timeout is None:
+            return await get_batched_result(self.name, url=self.url)
+
+        try:
+            async with asyncio.timeout(self.timeout.total_seconds()):
+                return await get_batched_result(self.name, url=self.url)
+        except TimeoutError as exc:
+            raise CabourotteCheckError(
+                self.name,
+                self.url,
+                f"Timed out after {self.timeout.total_seconds()} seconds",
+            ) from exc
+
+    def receive(self, result: LeanResult | Result) -> None:
+        """Update the check with a result it did not request itself.
+
+        Results are either pushed by cabourotte or requested along with the
+        results of other checks of the same cabourotte API. The result is stored
+        as if the check had just been evaluated, postponing the next request for
+        the check result until the next result is expected. Results that are not
+        newer than the latest known result, e.g. ones received out of order or
+        received again, are discarded as stale.
+        """
+        log = logger.bind(
+            name=self.name, url=self.url, interval=str(self.current_interval)
+        )
+
+        if self._latest is not None and result.timestamp <= self._latest:
+            log.debug(
+                'Cabourotte health check "%s" discarded stale result.',
+                self.name,
+                result=result,
+            )
+            return
+
+        log.debug(
+            'Cabourotte health check "%s" received check result without requesting it.',
+            self.name,
+            result=result,
+        )
+        self._latest = result.timestamp
+        self._check.update(healthy=self._assess(result))
+
+    @property
+    def successes(self) -> int:
+        """The number of consecutive healthy results counted towards rising."""
+        return self._check.successes
+
+    @property
+    def failures(self) -> int:
+        """The number of consecutive unhealthy results counted towards falling."""
+        return self._check.failures
+
+    @property
+    def current_interval(self) -> datetime.timedelta:
+        """The interval to wait until the next evaluation."""
+        return self._check.current_interval
+
+    @property
+    def next_due(self) -> float | None:
+        """The monotonic time at which the check is due next, None if due now."""
+        return self._check.next_due
+
+    @property
+    def cached_status(self) -> bool | None:
+        """The cached result of the check, None if the check is due."""
+        return self._check.cached
+
+    def subscribe(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the result changes."""
+        self._check.subscribe(listener)
+
+    def subscribe_due(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the next due time may change."""
+        self._check.subscribe_due(listener)
+
+    async def refresh(self) -> bool:
+        """Request the current check result, regardless of whether it is due."""
+        return await self._check.refresh()
+
     async def is_healthy(self) -> bool:
         """Return whether the healthcheck is healthy or not."""
         return await self._check()
+
+
+def _age(result: LeanResult | Result) -> datetime.timedelta:
+    """The time passed since a result was produced."""
+    return datetime.datetime.now(tz=datetime.UTC) - _aware(result.timestamp)
+
+
+def _aware(timestamp: datetime.datetime) -> datetime.datetime:
+    """Interpret a timestamp without a timezone as UTC."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=datetime.UTC)
+    return timestamp
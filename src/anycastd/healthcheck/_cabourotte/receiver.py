@@ -0,0 +1,143 @@
+import asyncio
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+
+import pydantic
+import structlog
+
+from anycastd.healthcheck._cabourotte.main import CabourotteHealthcheck
+from anycastd.healthcheck._cabourotte.result import LeanResult, Result
+
+logger = structlog.get_logger()
+
+MAX_BODY_SIZE = 64 * 1024
+
+
+@dataclass
+class ResultReceiver:
+    """Receives check results pushed by the cabourotte HTTP exporter.
+
+    Cabourotte POSTs the result of every check execution as JSON to the configured
+    exporter URL. Received results are handed to all registered checks with the
+    same name, updating their state immediately instead of waiting for their next
+    request of the check result.
+
+    Attributes:
+        host: The address to listen on.
+        port: The port to listen on.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 9014
+
+    _checks: defaultdict[str, list[CabourotteHealthcheck]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False
+    )
+
+    def register(self, check: CabourotteHealthcheck) -> None:
+        """Register a check to be updated with pushed results of the same name."""
+        if check not in self._checks[check.name]:
+            self._checks[check.name].append(check)
+
+    def receive(self, result: LeanResult | Result) -> bool:
+        """Hand a result to all registered checks with the same name.
+
+        Returns:
+            Whether any check has been registered for the result.
+        """
+        checks = self._checks.get(result.name, [])
+        for check in checks:
+            check.receive(result)
+        return bool(checks)
+
+    async def start(self) -> asyncio.Server:
+        """Start listening for pushed results."""
+        server = await asyncio.start_server(
+            self._handle_connection, host=self.host, port=self.port
+        )
+        logger.info(
+            "Receiving cabourotte results on %s:%s.",
+            self.host,
+            self.port,
+            host=self.host,
+            port=self.port,
+        )
+        return server
+
+    async def serve(self) -> None:
+        """Receive pushed results until cancelled."""
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle requests made on a single, possibly persistent connection."""
+        try:
+            while request := await _read_request(reader):
+                method, body = request
+                status = self._handle_request(method, body)
+                writer.write(_response(status))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as exc:
+            logger.debug("Closing cabourotte exporter connection.", exc_info=exc)
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def _handle_request(self, method: str, body: bytes) -> HTTPStatus:
+        """Handle a single request, returning the status to respond with."""
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED
+
+        try:
+            result = LeanResult.from_json(body)
+        except pydantic.ValidationError as exc:
+            logger.warning(
+                "Received an invalid result from cabourotte, ignoring it.",
+                exc_info=exc,
+            )
+            return HTTPStatus.BAD_REQUEST
+
+        if not self.receive(result):
+            logger.debug(
+                'Received result for unknown cabourotte health check "%s".',
+                result.name,
+                name=result.name,
+            )
+        return HTTPStatus.NO_CONTENT
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, bytes] | None:
+    """Read a HTTP/1.1 request, returning its method and body.
+
+    Returns:
+        The method and body of the request, or None if the connection was closed.
+
+    Raises:
+        ValueError: The request is malformed or its body exceeds the maximum size.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, _, _ = request_line.decode("latin-1").partition(" ")
+
+    content_length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+
+    if content_length > MAX_BODY_SIZE:
+        raise ValueError("Request body exceeds the maximum body size.")
+    return method, await reader.readexactly(content_length)
+
+
+def _response(status: HTTPStatus) -> bytes:
+    """Create an empty HTTP/1.1 response with the given status."""
+    status_line = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+    return (status_line + "Content-Length: 0\r\n\r\n").encode("latin-1")
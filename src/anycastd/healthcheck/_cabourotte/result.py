@@ -1,17 +1,30 @@
+import asyncio
 import datetime
-from typing import Self
+import weakref
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Self, TypeAlias
 
 import httpx
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter
 
+from anycastd.healthcheck._cabourotte.circuit import circuit_breakers
+from anycastd.healthcheck._cabourotte.client import client_pool
 from anycastd.healthcheck._cabourotte.exceptions import (
     CabourotteCheckError,
     CabourotteCheckNotFoundError,
+    CabourotteCircuitOpenError,
 )
+from anycastd.healthcheck._common import request_budget
 
 
 class Result(BaseModel):
-    """The result of a healthcheck."""
+    """The result of a healthcheck.
+
+    The duration of the healthcheck execution is given in milliseconds.
+    """
 
     name: str
     summary: str
@@ -27,8 +40,156 @@ class Result(BaseModel):
         return cls.model_validate_json(data)
 
 
-async def get_result(name: str, *, url: str) -> Result:
-    """Get the result of a specific healthcheck.
+_result_list = TypeAdapter(list[Result])
+
+
+def results_from_json(data: str | bytes | bytearray) -> dict[str, Result]:
+    """Create results by name from a JSON list returned by the cabourotte API."""
+    return {result.name: result for result in _result_list.validate_json(data)}
+
+
+# Larger unix timestamps are interpreted as milliseconds by pydantic.
+_MAX_TIMESTAMP_SECONDS = 2 * 10**10
+
+
+@dataclass(frozen=True, slots=True)
+class LeanResult:
+    """The parts of a healthcheck result required to assess it.
+
+    Lean results are decoded without validating fields that are never used to
+    assess a result, e.g. its message, falling back to the full `Result` only
+    for data deviating from the format cabourotte usually returns.
+
+    Attributes:
+        name: The name of the healthcheck.
+        success: Whether the healthcheck succeeded.
+        timestamp: The time at which the healthcheck was executed.
+        duration: The duration of the healthcheck execution in milliseconds.
+    """
+
+    name: str
+    success: bool
+    timestamp: datetime.datetime
+    duration: int
+
+    @classmethod
+    def from_result(cls, result: Result) -> Self:
+        """Create a lean result from a fully validated result."""
+        return cls(
+            name=result.name,
+            success=result.success,
+            timestamp=result.timestamp,
+            duration=result.duration,
+        )
+
+    @classmethod
+    def from_json(cls, data: str | bytes | bytearray) -> Self:
+        """Create a lean result from JSON returned by the cabourotte API.
+
+        Raises:
+            pydantic.ValidationError: The data does not contain a valid result.
+        """
+        try:
+            return cls._decode(orjson.loads(data))
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            return cls.from_result(Result.from_json(data))
+
+    @classmethod
+    def _decode(cls, item: Any) -> Self:
+        """Decode a result from parsed JSON in the format cabourotte returns.
+
+        Raises:
+            KeyError: A required field is missing.
+            TypeError: A field has an unexpected type.
+        """
+        name, success = item["name"], item["success"]
+        timestamp, duration = item["healthcheck-timestamp"], item["duration"]
+        if (
+            type(name) is not str
+            or type(success) is not bool
+            or type(timestamp) is not int
+            or type(duration) is not int
+        ):
+            raise TypeError("Unexpected field type.")
+        if not 0 <= timestamp < _MAX_TIMESTAMP_SECONDS:
+            raise ValueError("Timestamp is not in seconds.")
+        return cls(
+            name=name,
+            success=success,
+            timestamp=datetime.datetime.fromtimestamp(timestamp, datetime.UTC),
+            duration=duration,
+        )
+
+
+def lean_results_from_json(data: str | bytes | bytearray) -> dict[str, LeanResult]:
+    """Create lean results by name from a JSON list returned by the cabourotte API.
+
+    Raises:
+        pydantic.ValidationError: The data does not contain a valid list of results.
+    """
+    try:
+        results = tuple(LeanResult._decode(item) for item in orjson.loads(data))
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        # Validate the data fully, either raising a descriptive error or
+        # accepting results in a format deviating from the usual one.
+        return {
+            name: LeanResult.from_result(result)
+            for name, result in results_from_json(data).items()
+        }
+    return {result.name: result for result in results}
+
+
+ResultRecipient: TypeAlias = Callable[[LeanResult], None]
+
+# Requests for all results that are currently in progress by cabourotte URL.
+_bulk_requests: dict[str, asyncio.Task[dict[str, LeanResult]]] = {}
+# Methods receiving the results of every bulk request by cabourotte URL and name.
+_recipients: defaultdict[str, defaultdict[str, list[weakref.WeakMethod]]] = defaultdict(
+    lambda: defaultdict(list)
+)
+
+
+def subscribe_results(name: str, recipient: ResultRecipient, *, url: str) -> None:
+    """Hand the result of a healthcheck to a method with every bulk request.
+
+    Only a weak reference to the method is kept, so that subscribing does not
+    keep the object the method is bound to alive.
+
+    Arguments:
+        name: The name of the healthcheck.
+        recipient: A bound method receiving the result of the healthcheck.
+        url: The URL of the cabourotte API.
+    """
+    _recipients[url][name].append(weakref.WeakMethod(recipient))
+
+
+def _distribute(url: str, results: dict[str, LeanResult]) -> None:
+    """Hand results to all recipients subscribed to them, forgetting dead ones."""
+    recipients = _recipients.get(url)
+    if recipients is None:
+        return
+    for name, result in results.items():
+        if (refs := recipients.get(name)) is None:
+            continue
+        for ref in tuple(refs):
+            if (recipient := ref()) is None:
+                refs.remove(ref)
+            else:
+                recipient(result)
+
+
+async def get_batched_result(name: str, *, url: str) -> LeanResult:
+    """Get the result of a specific healthcheck as part of a bulk request.
+
+    Instead of requesting the result of each healthcheck individually, all results
+    are requested at once. Concurrent requests for results from the same cabourotte
+    API, e.g. of all checks that are due at the same time, share a single request.
+    The results of every request are handed to all subscribed recipients, so that
+    checks of the same API are updated without making requests of their own.
+
+    Requests are guarded by the circuit breaker of the cabourotte API, failing
+    fast without making a request while the API is known to be unreachable,
+    and each request takes a token from the `request_budget`.
 
     Arguments:
         name: The name of the healthcheck.
@@ -36,19 +197,50 @@ async def get_result(name: str, *, url: str) -> Result:
 
     Returns:
         The result of the healthcheck.
+
+    Raises:
+        CabourotteCircuitOpenError: The circuit breaker of the API is open.
     """
-    result_url = f"{url}/result/{name}"
+    results_url = f"{url}/result"
+    request = _bulk_requests.get(url)
+    if request is None:
+        if not circuit_breakers.get(url).allow():
+            raise CabourotteCircuitOpenError(name, results_url)
+        request = asyncio.create_task(_request_results(results_url, url=url))
+        _bulk_requests[url] = request
+        request.add_done_callback(
+            lambda done: _bulk_requests.pop(url)
+            if _bulk_requests.get(url) is done
+            else None
+        )
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(result_url)
-            response.raise_for_status()
+        results = await asyncio.shield(request)
     except httpx.HTTPError as exc:
-        if (
-            isinstance(exc, httpx.HTTPStatusError)
-            and exc.response.status_code == httpx.codes.NOT_FOUND
-        ):
-            raise CabourotteCheckNotFoundError(name, result_url) from None
+        raise CabourotteCheckError(name, results_url, str(exc)) from exc
+
+    try:
+        return results[name]
+    except KeyError:
+        raise CabourotteCheckNotFoundError(name, results_url) from None
 
-        raise CabourotteCheckError(name, result_url, str(exc)) from exc
 
-    return Result.from_json(response.content)
+async def _request_results(results_url: str, *, url: str) -> dict[str, LeanResult]:
+    """Request the results of all healthchecks from the cabourotte API.
+
+    The outcome is recorded by the circuit breaker of the cabourotte API, where
+    only transport errors count as failures, since any response shows that the
+    API is reachable.
+    """
+    await request_budget.acquire()
+    breaker = circuit_breakers.get(url)
+    try:
+        response = await client_pool.get(url).get(results_url)
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    response.raise_for_status()
+    results = lean_results_from_json(response.content)
+    _distribute(url, results)
+    return results
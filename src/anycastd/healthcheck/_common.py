@@ -1,11 +1,381 @@
+import asyncio
+import math
+import random
+import time
+import zlib
 from collections.abc import Awaitable, Callable
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from datetime import timedelta
 from typing import TypeAlias
 
-CheckCoroutine: TypeAlias = Callable[[], Awaitable[bool]]
+import structlog
 
+logger = structlog.get_logger()
 
-def interval_check(interval: timedelta, check: CheckCoroutine) -> CheckCoroutine:
+# Check coroutines return None if no new result was produced since the last one.
+CheckCoroutine: TypeAlias = Callable[[], Awaitable[bool | None]]
+ResultListener: TypeAlias = Callable[[], None]
+
+# The maximum jitter as a fraction of the interval of a check.
+MAX_JITTER = 0.5
+
+
+@dataclass
+class Spread:
+    """Spreads evaluations of interval checks sharing an interval across it.
+
+    Checks started at the same time with the same interval would otherwise be
+    evaluated in lockstep, causing bursts of requests once every interval.
+    When staggering, each check is evaluated at a fixed phase offset within its
+    interval, derived deterministically from the key identifying it. Jitter
+    postpones each evaluation by a random fraction of the interval on top.
+
+    Attributes:
+        stagger: Whether to evaluate checks at their phase offset.
+        jitter: The maximum fraction of the interval to postpone evaluations by.
+    """
+
+    stagger: bool = False
+    jitter: float = 0.0
+
+    def configure(self, *, stagger: bool, jitter: float) -> None:
+        """Configure how evaluations of interval checks are spread."""
+        if not 0 <= jitter <= MAX_JITTER:
+            raise ValueError(f"Jitter must be between 0 and {MAX_JITTER}.")
+        self.stagger = stagger
+        self.jitter = jitter
+
+    def due(self, key: str | None, last_checked: float, interval: float) -> float:
+        """The monotonic time at which a check is due, not considering jitter.
+
+        When staggering, this is the first time at the phase offset of the check
+        that is at least half an interval after its last evaluation.
+        """
+        if not self.stagger or key is None or interval <= 0:
+            return last_checked + interval
+        phase = zlib.crc32(key.encode()) / 2**32 * interval
+        periods = math.ceil((last_checked + interval / 2 - phase) / interval)
+        return phase + periods * interval
+
+    def delay(self, interval: float) -> float:
+        """A random delay in seconds to postpone an evaluation by."""
+        return random.uniform(0, self.jitter * interval) if self.jitter else 0.0  # noqa: S311
+
+
+@dataclass
+class TokenBucket:
+    """A token bucket capping the rate of health check requests.
+
+    Every request made by a health check takes a token, waiting for one to
+    become available if required. Tokens are refilled at a fixed rate, up to a
+    burst allowing that many requests at once. Waiting requests are served in
+    the order they arrived.
+
+    Attributes:
+        rate: The number of tokens refilled per second, unlimited if None.
+        burst: The maximum number of tokens available at once.
+    """
+
+    rate: float | None = None
+    burst: int = 1
+
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _updated: float | None = field(default=None, init=False, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+
+    def configure(self, *, rate: float | None, burst: int) -> None:
+        """Configure the rate and burst, starting with a full bucket."""
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate must be positive.")
+        if burst < 1:
+            raise ValueError("Burst must be at least one.")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = None
+
+    async def acquire(self) -> None:
+        """Take a token, waiting until one is available if required."""
+        if self.rate is None:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._updated is None:
+                self._tokens = float(self.burst)
+            else:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens, self._updated = 1.0, time.monotonic()
+            self._tokens -= 1
+
+
+spread = Spread()
+request_budget = TokenBucket()
+
+
+class IntervalCheck:
+    """A check coroutine that is only evaluated if a given interval has passed.
+
+    Awaiting an instance evaluates the wrapped check coroutine if the interval has
+    passed since its last evaluation, returning the last result otherwise.
+    Listeners can subscribe to be notified whenever the result changes, or
+    whenever the time at which the check is due next may have changed.
+
+    To avoid flapping, the result only changes to healthy after a number of
+    consecutive healthy evaluations and to unhealthy after a number of consecutive
+    unhealthy ones. The first evaluation determines the initial result on its own.
+    Evaluations of a check coroutine returning None did not produce a new result,
+    e.g. since the source of results has not replaced the last one yet, and are
+    not counted towards either threshold. Evaluations held back by a threshold
+    are logged with the number of consecutive results counted so far.
+
+    If a maximum interval is given, the interval adapts to the stability of the
+    results. While the result is healthy, it doubles with every healthy evaluation
+    following a healthy one, up to the maximum interval, and snaps back to the
+    interval on any unhealthy evaluation or change of the result, so that changes
+    are detected quickly.
+
+    Checks whose results are produced by an external source on its own schedule
+    can announce when their next result is expected, in which case the check is
+    due once that result can exist instead of after the interval, regardless of
+    its phase offset when staggering.
+
+    Evaluations are spread across the interval as configured by `spread`.
+
+    Times are measured using a monotonic clock, as returned by `time.monotonic`.
+
+    Attributes:
+        interval: The interval to wait between evaluations, the minimum interval
+            if the interval is adaptive.
+        max_interval: The maximum interval to back off to while results are
+            stable. If None, the interval is fixed.
+        current_interval: The interval to wait until the next evaluation.
+        key: A key identifying the check, used to derive its phase offset when
+            staggering. If None, the check is not staggered.
+        rise: The number of consecutive healthy evaluations required to become
+            healthy.
+        fall: The number of consecutive unhealthy evaluations required to become
+            unhealthy.
+        last_checked: The monotonic time of the last evaluation, if any.
+        last_healthy: The result after applying the rise and fall thresholds.
+        successes: The number of consecutive healthy evaluations.
+        failures: The number of consecutive unhealthy evaluations.
+    """
+
+    interval: timedelta
+    max_interval: timedelta | None
+    current_interval: timedelta
+    key: str | None
+    rise: int
+    fall: int
+    last_checked: float | None
+    last_healthy: bool
+    successes: int
+    failures: int
+
+    def __init__(  # noqa: PLR0913
+        self,
+        interval: timedelta,
+        check: CheckCoroutine,
+        *,
+        rise: int = 1,
+        fall: int = 1,
+        key: str | None = None,
+        max_interval: timedelta | None = None,
+    ) -> None:
+        if rise < 1 or fall < 1:
+            raise ValueError("Rise and fall thresholds must be at least one.")
+        if max_interval is not None and max_interval < interval:
+            raise ValueError("The maximum interval must not be below the interval.")
+        self.interval = interval
+        self.max_interval = max_interval
+        self.current_interval = interval
+        self.key = key
+        self.rise = rise
+        self.fall = fall
+        self.last_checked = None
+        self.last_healthy = False
+        self.successes = 0
+        self.failures = 0
+        self._check = check
+        self._listeners: list[ResultListener] = []
+        self._due_listeners: list[ResultListener] = []
+        self._evaluation: asyncio.Task[bool] | None = None
+        self._delay = 0.0
+        self._last_result: bool | None = None
+        self._expected: float | None = None
+
+    @property
+    def next_due(self) -> float | None:
+        """The monotonic time at which the check is due next.
+
+        None if the check was never evaluated.
+        """
+        if self.last_checked is None:
+            return None
+        if self._expected is not None and self._expected > self.last_checked:
+            # Adaptive intervals back off from the time the result is expected.
+            backoff = self.current_interval - self.interval
+            return self._expected + backoff.total_seconds() + self._delay
+        interval = self.current_interval.total_seconds()
+        return spread.due(self.key, self.last_checked, interval) + self._delay
+
+    @property
+    def cached(self) -> bool | None:
+        """The result of the last evaluation if the check is not due, None otherwise."""
+        next_due = self.next_due
+        if next_due is None or time.monotonic() >= next_due:
+            return None
+        return self.last_healthy
+
+    def expect_result(self, at: float | None) -> None:
+        """Expect the next result to become available at a monotonic time.
+
+        The check is due once the expected result can exist, instead of after
+        the interval. Expectations that are not after the last evaluation are
+        ignored, e.g. if the source is late, falling back to the interval.
+
+        Args:
+            at: The monotonic time at which the next result is expected, or None
+                if unknown.
+        """
+        self._expected = at
+        self._notify_due_changed()
+
+    def subscribe(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the result changes."""
+        self._listeners.append(listener)
+
+    def subscribe_due(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the next due time may change."""
+        self._due_listeners.append(listener)
+
+    def _notify_due_changed(self) -> None:
+        """Notify listeners that the next due time may have changed."""
+        for listener in self._due_listeners:
+            listener()
+
+    async def __call__(self) -> bool:
+        next_due = self.next_due
+        if next_due is None or time.monotonic() >= next_due:
+            return await self.refresh()
+
+        return self.last_healthy
+
+    async def refresh(self) -> bool:
+        """Evaluate the check regardless of whether it is due.
+
+        Concurrent callers share a single evaluation of the wrapped check coroutine.
+        """
+        if self._evaluation is None:
+            self._evaluation = asyncio.create_task(self._evaluate())
+        evaluation = self._evaluation
+        return await asyncio.shield(evaluation)
+
+    async def _evaluate(self) -> bool:
+        """Evaluate the wrapped check coroutine and store its result.
+
+        A failed evaluation counts as an unhealthy one. The exception is only
+        raised if the result is unhealthy, i.e. the fall threshold is reached.
+        """
+        try:
+            healthy = await self._check()
+        except Exception as exc:
+            self.update(healthy=False)
+            if not self.last_healthy:
+                raise
+            logger.warning(
+                "Check evaluation failed, %s of %s failures until unhealthy.",
+                self.failures,
+                self.fall,
+                exc_info=exc,
+            )
+            return self.last_healthy
+        finally:
+            self._evaluation = None
+
+        if healthy is None:
+            self.keep()
+        else:
+            self.update(healthy=healthy)
+        return self.last_healthy
+
+    def update(self, *, healthy: bool) -> None:
+        """Store the result of an evaluation, notifying listeners if it changed.
+
+        Results obtained without evaluating the wrapped check coroutine, e.g. ones
+        pushed by an external source, can be stored directly, postponing the next
+        evaluation until the interval has passed again.
+        """
+        first = self.last_checked is None
+        self.last_checked = time.monotonic()
+        if healthy:
+            self.successes, self.failures = self.successes + 1, 0
+        else:
+            self.successes, self.failures = 0, self.failures + 1
+
+        if first:
+            result = healthy
+        elif healthy:
+            result = self.last_healthy or self.successes >= self.rise
+        else:
+            result = self.last_healthy and self.failures < self.fall
+
+        changed = result != self.last_healthy
+        self.last_healthy = result
+        if result != healthy:
+            logger.info(
+                "Check evaluated %s, %s of %s consecutive results until %s.",
+                "healthy" if healthy else "unhealthy",
+                self.successes if healthy else self.failures,
+                self.rise if healthy else self.fall,
+                "healthy" if healthy else "unhealthy",
+                check=self.key,
+                successes=self.successes,
+                failures=self.failures,
+            )
+        self._adapt_interval(healthy=healthy, changed=changed)
+        self._delay = spread.delay(self.current_interval.total_seconds())
+        self._notify_due_changed()
+        if changed:
+            for listener in self._listeners:
+                listener()
+
+    def keep(self) -> None:
+        """Store an evaluation that did not produce a new result.
+
+        The result and the numbers of consecutive results are kept, while the
+        next evaluation is postponed until the interval has passed again.
+        """
+        self.last_checked = time.monotonic()
+        self._delay = spread.delay(self.current_interval.total_seconds())
+        self._notify_due_changed()
+
+    def _adapt_interval(self, *, healthy: bool, changed: bool) -> None:
+        """Back off the interval while results are stable, resetting it otherwise."""
+        stable = (
+            healthy and self.last_healthy and self._last_result is True and not changed
+        )
+        self._last_result = healthy
+        if self.max_interval is None or not stable:
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.current_interval * 2, self.max_interval)
+
+
+def interval_check(  # noqa: PLR0913
+    interval: timedelta,
+    check: CheckCoroutine,
+    *,
+    rise: int = 1,
+    fall: int = 1,
+    key: str | None = None,
+    max_interval: timedelta | None = None,
+) -> IntervalCheck:
     """Wrap a check coroutine to only evaluate it if a given interval has passed.
 
     Wraps a given check coroutine to only evaluate it if a given interval has passed,
@@ -14,25 +384,19 @@ def interval_check(interval: timedelta, check: CheckCoroutine) -> CheckCoroutine
     Args:
         interval: The interval to wait between evaluations.
         check: A check coroutine to be evaluated.
+        rise: The number of consecutive healthy evaluations required to become
+            healthy.
+        fall: The number of consecutive unhealthy evaluations required to become
+            unhealthy.
+        key: A key identifying the check, used to derive its phase offset when
+            staggering.
+        max_interval: The maximum interval to back off to while results are
+            stable. If omitted, the interval is fixed.
 
     Returns:
-        A coroutine returning either the result of the given check coroutine or the
-        last result returned by it if the interval has not passed.
+        An awaitable callable returning either the result of the given check
+        coroutine or the last result returned by it if the interval has not passed.
     """
-    last_checked: datetime | None = None
-    last_healthy: bool = False
-
-    async def _check() -> bool:
-        nonlocal last_checked, last_healthy
-
-        if last_checked is None or datetime.now(timezone.utc) - last_checked > interval:
-            healthy = await check()
-
-            last_checked = datetime.now(timezone.utc)
-            last_healthy = healthy
-
-            return healthy
-
-        return last_healthy
-
-    return _check
+    return IntervalCheck(
+        interval, check, rise=rise, fall=fall, key=key, max_interval=max_interval
+    )
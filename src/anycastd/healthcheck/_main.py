@@ -1,5 +1,7 @@
 from typing import Protocol, runtime_checkable
 
+from anycastd.healthcheck._common import ResultListener
+
 
 @runtime_checkable
 class Healthcheck(Protocol):
@@ -10,3 +12,50 @@ class Healthcheck(Protocol):
     async def is_healthy(self) -> bool:
         """Whether the health checked component is healthy or not."""
         ...
+
+
+@runtime_checkable
+class ObservableHealthcheck(Healthcheck, Protocol):
+    """A health check that signals changes of its result.
+
+    Observable health checks allow services to sleep until a result changes
+    or the check is due to be evaluated again, instead of polling them.
+    They can be evaluated by a scheduler, in which case `is_healthy` returns
+    the result of the last evaluation.
+    """
+
+    @property
+    def next_due(self) -> float | None:
+        """The monotonic time at which the check is due next, None if due now."""
+        ...
+
+    async def refresh(self) -> bool:
+        """Evaluate the check regardless of whether it is due."""
+        ...
+
+    def subscribe(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the result changes."""
+        ...
+
+    def subscribe_due(self, listener: ResultListener) -> None:
+        """Subscribe a listener to be called when the next due time may change."""
+        ...
+
+
+@runtime_checkable
+class CachedHealthcheck(Healthcheck, Protocol):
+    """A health check whose cached result can be read without awaiting it.
+
+    Reading the cached result of a check that is not due avoids creating a task
+    and coroutine just to return a result that is already known.
+    """
+
+    @property
+    def next_due(self) -> float | None:
+        """The monotonic time at which the check is due next, None if due now."""
+        ...
+
+    @property
+    def cached_status(self) -> bool | None:
+        """The cached result of the check, None if the check is due."""
+        ...
@@ -1,2 +1,4 @@
 from anycastd.prefix._frrouting.main import FRRoutingPrefix
+from anycastd.prefix._frrouting.vty import session_pool as vty_session_pool
+from anycastd.prefix._frrouting.vtysh import session_pool as vtysh_session_pool
 from anycastd.prefix._main import AFI, VRF, Prefix
@@ -0,0 +1,139 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import TypeAlias
+
+import structlog
+
+logger = structlog.get_logger()
+
+CommandRunner: TypeAlias = Callable[..., Awaitable[str]]
+
+
+@dataclass
+class _Submission:
+    """A command submitted to be run as part of a batch."""
+
+    command: str
+    run: CommandRunner
+    result: asyncio.Future[None]
+
+
+@dataclass
+class CommandCoalescer:
+    """Coalesces configuration commands submitted within a short window.
+
+    When many prefixes are announced or denounced at once, e.g. because a shared
+    dependency of multiple services failed, every prefix would otherwise enter
+    the FRRouting configuration on its own. Instead, commands submitted within a
+    short window that share the same context are run as a single batch.
+
+    If a batch fails, its commands are run again one by one, so that the result
+    of each submission only reflects its own command.
+
+    Attributes:
+        window: The time in seconds to wait for further commands to be submitted
+            before running a batch.
+    """
+
+    window: float = 0.005
+
+    _batches: dict[Hashable, list[_Submission]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _flushes: set[asyncio.Task] = field(default_factory=set, init=False, repr=False)
+
+    async def submit(
+        self, key: Hashable, run: CommandRunner, context: str, command: str
+    ) -> None:
+        """Submit a command to be run as part of a batch.
+
+        Args:
+            key: Commands are only batched with commands using the same key.
+                Commands using the same key must be runnable using the same runner.
+            run: Runs commands, raising an exception on failure.
+            context: A command entering the context of the command, shared by
+                the batch.
+            command: The command to run.
+
+        Raises:
+            Exception: The exception raised when running the command on its own.
+            asyncio.CancelledError: Running the batch has been cancelled.
+        """
+        submission = _Submission(
+            command, run, asyncio.get_running_loop().create_future()
+        )
+        batch_key = (key, context)
+        if (batch := self._batches.get(batch_key)) is not None:
+            batch.append(submission)
+        else:
+            self._batches[batch_key] = [submission]
+            flush = asyncio.create_task(self._flush(batch_key, context))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+        await submission.result
+
+    async def _flush(self, batch_key: Hashable, context: str) -> None:
+        """Run a batch of commands once the window has passed."""
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            batch = self._batches.pop(batch_key)
+
+        try:
+            await self._run_batch(
+                [submission for submission in batch if not submission.result.done()],
+                context,
+            )
+        finally:
+            # Submissions must not wait forever if running the batch was cancelled.
+            for submission in batch:
+                submission.result.cancel()
+
+    async def _run_batch(self, batch: list[_Submission], context: str) -> None:
+        """Run a batch of commands, running them one by one if the batch fails."""
+        if not batch:
+            return
+
+        try:
+            await batch[0].run(context, *(submission.command for submission in batch))
+        except Exception as exc:
+            if len(batch) == 1:
+                _resolve(batch[0], exc)
+                return
+            logger.debug(
+                "Running batched commands failed, running them one by one.",
+                commands=[submission.command for submission in batch],
+                exc_info=exc,
+            )
+        else:
+            for submission in batch:
+                _resolve(submission, None)
+            return
+
+        async with asyncio.TaskGroup() as tg:
+            for submission in batch:
+                tg.create_task(self._run_single(submission, context))
+
+    async def _run_single(self, submission: _Submission, context: str) -> None:
+        """Run a single command, resolving its submission."""
+        try:
+            await submission.run(context, submission.command)
+        except Exception as exc:
+            _resolve(submission, exc)
+        else:
+            _resolve(submission, None)
+
+
+coalescer = CommandCoalescer()
+
+
+def _resolve(submission: _Submission, exc: Exception | None) -> None:
+    """Resolve the result of a submission, unless it was cancelled."""
+    if submission.result.done():
+        return
+    if exc is not None:
+        submission.result.set_exception(exc)
+    else:
+        submission.result.set_result(None)
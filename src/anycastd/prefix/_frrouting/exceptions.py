@@ -14,6 +14,18 @@ class FRRInvalidVTYSHError(Exception):
         super().__init__(f"The given VTYSH {self.vtysh} is invalid: {reason}.")
 
 
+class FRRInvalidVTYSocketError(Exception):
+    """The FRRouting VTY socket is invalid."""
+
+    vty_socket: Path
+
+    def __init__(self, vty_socket: Path, reason: str):
+        self.vty_socket = vty_socket
+        super().__init__(
+            f"The given VTY socket {self.vty_socket} is invalid: {reason}."
+        )
+
+
 class FRRCommandError(Exception):
     """Failed to run a FRRouting VTY command."""
 
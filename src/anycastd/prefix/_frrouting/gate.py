@@ -0,0 +1,61 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RouteMapGates:
+    """Tracks route-maps gating the announcement of all prefixes bound to them.
+
+    Prefixes in gate mode keep their network statement configured at all times,
+    bound to a route-map shared by all prefixes of a service. Announcing or
+    denouncing them flips the route-map between permit and deny, which is done
+    once for all prefixes bound to the route-map, regardless of their number.
+
+    Flips of the same route-map are serialized, and flips to the state the
+    route-map is already known to be in are skipped.
+    """
+
+    _states: dict[Hashable, bool] = field(default_factory=dict, init=False, repr=False)
+    _locks: dict[Hashable, asyncio.Lock] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    async def set(
+        self,
+        key: Hashable,
+        flip: Callable[[bool], Awaitable[object]],
+        *,
+        permit: bool,
+    ) -> None:
+        """Set the state of a route-map, flipping it if required.
+
+        Args:
+            key: The key identifying the route-map.
+            flip: Flips the route-map to permit if called with True, or to deny
+                otherwise, raising an exception on failure.
+            permit: Whether the route-map should permit the bound prefixes.
+        """
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if self._states.get(key) is permit:
+                return
+            # The state is unknown until flipping it succeeded.
+            self._states.pop(key, None)
+            await flip(permit)
+            self._states[key] = permit
+
+    def get(self, key: Hashable) -> bool | None:
+        """The state a route-map is known to be in, None if unknown."""
+        return self._states.get(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget the state of a route-map, flipping it on the next change."""
+        self._states.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget the state of all route-maps."""
+        self._states.clear()
+        self._locks.clear()
+
+
+gates = RouteMapGates()
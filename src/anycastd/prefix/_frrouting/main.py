@@ -1,5 +1,4 @@
 import asyncio
-from contextlib import suppress
 from ipaddress import IPv4Network, IPv6Network
 from pathlib import Path
 from typing import Self, assert_never
@@ -8,31 +7,66 @@ import orjson
 import structlog
 
 from anycastd._executor import Executor
+from anycastd.prefix._frrouting.coalescing import coalescer
 from anycastd.prefix._frrouting.exceptions import (
     FRRCommandError,
     FRRCommandTimeoutError,
     FRRInvalidVRFError,
     FRRInvalidVTYSHError,
+    FRRInvalidVTYSocketError,
     FRRNoBGPError,
 )
+from anycastd.prefix._frrouting.gate import gates
+from anycastd.prefix._frrouting.snapshot import snapshots
+from anycastd.prefix._frrouting.vty import VtySocketSession
+from anycastd.prefix._frrouting.vty import session_pool as vty_session_pool
+from anycastd.prefix._frrouting.vtysh import VtyshSession
+from anycastd.prefix._frrouting.vtysh import session_pool as vtysh_session_pool
 from anycastd.prefix._main import AFI, VRF
 
 logger = structlog.get_logger()
 
+# The local ASN by executor, vtysh, VTY socket and VRF, shared by all prefixes,
+# along with the generation of the session it was resolved through.
+_local_asns: dict[tuple[Executor, Path, Path | None, VRF], tuple[int, int]] = {}
+
+# Errors reported by FRRouting when configuring BGP using an outdated local ASN.
+_ASN_MISMATCH_ERRORS = (
+    "BGP is already running",
+    "AS number mismatch",
+    "unknown router bgp",
+)
+
+# Network statements bound to a route-map, by local ASN key, prefix and route-map.
+_provisioned: set[tuple[tuple[Executor, Path, Path | None, VRF], str, str]] = set()
+
+# Prefixes in gate mode by the key of their route-map and the key of their network.
+_gated: dict[
+    tuple[Executor, Path, Path | None, str | None],
+    dict[tuple[tuple[Executor, Path, Path | None, VRF], str, str], "FRRoutingPrefix"],
+] = {}
+
+# The sequence number of the route-map entry gating prefixes bound to it.
+_GATE_SEQUENCE = 10
+
 
 class FRRoutingPrefix:
     vrf: VRF
     vtysh: Path
+    vty_socket: Path | None
+    route_map: str | None
     executor: Executor
 
     _log: structlog.typing.FilteringBoundLogger
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         prefix: IPv4Network | IPv6Network,
         *,
         vrf: VRF = None,
         vtysh: Path = Path("/usr/bin/vtysh"),
+        vty_socket: Path | None = None,
+        route_map: str | None = None,
         executor: Executor,
     ) -> None:
         """Initialize the FRRouting prefix.
@@ -40,6 +74,14 @@ class FRRoutingPrefix:
         It is recommended to use the `new` classmethod instead of this constructor
         to validate the prefix against the FRRouting configuration, avoiding
         potential errors later in runtime.
+
+        If a VTY socket is given, commands are sent directly to the BGP daemon
+        through it instead of running them in the vtysh.
+
+        If a route-map is given, the prefix is announced in gate mode: its network
+        statement is bound to the route-map and kept configured, while announcing
+        or denouncing it flips the route-map, shared by all prefixes bound to it,
+        between permit and deny.
         """
         if not any((isinstance(prefix, IPv4Network), isinstance(prefix, IPv6Network))):
             raise TypeError("Prefix must be an IPv4 or IPv6 network.")
@@ -48,6 +90,8 @@ class FRRoutingPrefix:
         self.__prefix = prefix
         self.vrf = vrf
         self.vtysh = vtysh
+        self.vty_socket = vty_socket
+        self.route_map = route_map
         self.executor = executor
         self._log = logger.bind(
             prefix=str(self.prefix),
@@ -55,11 +99,17 @@ class FRRoutingPrefix:
             prefix_vrf=self.vrf,
             vtysh_path=self.vtysh.as_posix(),
         )
+        if self.vty_socket is not None:
+            self._log = self._log.bind(vty_socket=self.vty_socket.as_posix())
+        if self.route_map is not None:
+            self._log = self._log.bind(route_map=self.route_map)
+            _gated.setdefault(self._gate_key, {})[self._network_key] = self
 
     def __repr__(self) -> str:
         return (
             f"FRRoutingPrefix(prefix={self.prefix!r}, vrf={self.vrf!r}, "
-            f"vtysh={self.vtysh!r}, executor={self.executor!r})"
+            f"vtysh={self.vtysh!r}, vty_socket={self.vty_socket!r}, "
+            f"route_map={self.route_map!r}, executor={self.executor!r})"
         )
 
     def __eq__(self, other: object) -> bool:
@@ -86,54 +136,56 @@ class FRRoutingPrefix:
     async def is_announced(self) -> bool:
         """Returns True if the prefix is announced.
 
-        Checks if the respective BGP prefix is configured in its VRF.
+        Checks if the respective BGP prefix is locally originated in its VRF.
+        Locally originated routes are fetched once for all prefixes in the same
+        VRF and address family, reusing the resulting snapshot for a short time.
         """
-        cmd = (
-            f"show bgp vrf {self.vrf} {self.afi} unicast {self.prefix} json"
-            if self.vrf
-            else f"show bgp {self.afi} unicast {self.prefix} json"
+        snapshot = await snapshots.get(
+            (self._asn_key, self.afi), self._show_self_originated_routes
         )
-        show_prefix = await self._run_vtysh_commands(cmd)
-        prefix_info = orjson.loads(show_prefix)
-
-        with suppress(KeyError):
-            paths = prefix_info["paths"]
-            origin = paths[0]["origin"]
-            local = paths[0]["local"]
-            if origin == "IGP" and local is True:
-                return True
+        announced = self.prefix in snapshot
+        if self.route_map is not None:
+            permit = gates.get(self._gate_key)
+            if permit is not None and permit is not announced:
+                # The BGP configuration changed, e.g. since bgpd was restarted.
+                self._log.warning(
+                    "Route-map state contradicts the announcement of the prefix, "
+                    "provisioning and flipping it again on the next change."
+                )
+                self._invalidate_gate()
+        return announced
 
-        return False
+    async def _show_self_originated_routes(self) -> str:
+        """Returns the locally originated routes in the VRF and AFI of the prefix."""
+        return await self._run_vtysh_commands(
+            f"show bgp vrf {self.vrf} {self.afi} unicast self-originate json"
+            if self.vrf
+            else f"show bgp {self.afi} unicast self-originate json"
+        )
 
     async def announce(self) -> None:
         """Announce the prefix in its VRF.
 
-        Adds the respective BGP prefix to its VRF.
+        Adds the respective BGP prefix to its VRF, or permits it through its
+        route-map in gate mode.
         """
-        asn = await self._get_local_asn()
-
-        await self._run_vtysh_commands(
-            "configure terminal",
-            f"router bgp {asn} vrf {self.vrf}" if self.vrf else f"router bgp {asn}",
-            f"address-family {self.afi} unicast",
-            f"network {self.prefix}",
-        )
+        if self.route_map is not None:
+            await self._set_gate(permit=True)
+            return
+        await self._configure_network(f"network {self.prefix}")
 
     async def denounce(self) -> None:
         """Denounce the prefix in its VRF.
 
-        Removes the respective BGP prefix from its VRF. If the prefix is not
-        announced, the error raised by FRRouting is caught and a warning is logged.
+        Removes the respective BGP prefix from its VRF, or denies it through its
+        route-map in gate mode. If the prefix is not announced, the error raised
+        by FRRouting is caught and a warning is logged.
         """
-        asn = await self._get_local_asn()
-
+        if self.route_map is not None:
+            await self._set_gate(permit=False)
+            return
         try:
-            await self._run_vtysh_commands(
-                "configure terminal",
-                f"router bgp {asn} vrf {self.vrf}" if self.vrf else f"router bgp {asn}",
-                f"address-family {self.afi} unicast",
-                f"no network {self.prefix}",
-            )
+            await self._configure_network(f"no network {self.prefix}")
         except FRRCommandError as exc:
             if exc.stdout is not None:
                 if "Can't find static route specified" in exc.stdout:
@@ -144,58 +196,211 @@ class FRRoutingPrefix:
 
             raise
 
+    async def _set_gate(self, *, permit: bool) -> None:
+        """Permit or deny the prefix through the route-map it is bound to.
+
+        Since the route-map is shared, it is only flipped once for all prefixes
+        bound to it. If flipping fails, e.g. since bgpd was restarted and lost
+        its configuration, the network statements are provisioned again before
+        the next flip.
+        """
+        try:
+            await gates.set(self._gate_key, self._flip_route_map, permit=permit)
+        except FRRCommandError:
+            self._invalidate_gate()
+            raise
+        finally:
+            snapshots.invalidate((self._asn_key, self.afi))
+
+    async def _provision_networks(self) -> None:
+        """Configure the network statements of all prefixes bound to the route-map.
+
+        The statements of all prefixes bound to the route-map are configured at
+        once before it is flipped, coalesced into as few transactions as possible.
+        Until the route-map is configured, FRRouting treats it as denying the
+        prefixes, so provisioning does not announce them by itself.
+        """
+        pending = [
+            prefix
+            for key, prefix in _gated.get(self._gate_key, {}).items()
+            if key not in _provisioned
+        ]
+        results = await asyncio.gather(
+            *(prefix._provision_network() for prefix in pending),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _provision_network(self) -> None:
+        """Configure the network statement of the prefix bound to its route-map."""
+        if self.route_map is None:
+            raise RuntimeError("Only prefixes in gate mode can be provisioned.")
+        await self._configure_network(
+            f"network {self.prefix} route-map {self.route_map}"
+        )
+        _provisioned.add(self._network_key)
+
+    async def _flip_route_map(self, permit: bool) -> str:  # noqa: FBT001
+        """Flip the route-map of the prefix to either permit or deny.
+
+        The network statements bound to the route-map are provisioned first.
+        """
+        await self._provision_networks()
+        action = "permit" if permit else "deny"
+        return await self._run_vtysh_commands(
+            "configure terminal",
+            f"route-map {self.route_map} {action} {_GATE_SEQUENCE}",
+        )
+
+    def _invalidate_gate(self) -> None:
+        """Forget the route-map state and provisioned networks bound to it."""
+        gates.invalidate(self._gate_key)
+        _provisioned.difference_update(_gated.get(self._gate_key, {}))
+
+    @property
+    def _gate_key(self) -> tuple[Executor, Path, Path | None, str | None]:
+        """The key of the route-map in the gates shared by all prefixes."""
+        return (self.executor, self.vtysh, self.vty_socket, self.route_map)
+
+    @property
+    def _network_key(self) -> tuple[tuple[Executor, Path, Path | None, VRF], str, str]:
+        """The key of the network statement bound to the route-map."""
+        return (self._asn_key, str(self.prefix), str(self.route_map))
+
+    async def _configure_network(self, command: str) -> None:
+        """Run a network command in the address family of the prefix.
+
+        Network commands of all prefixes in the same VRF and address family that
+        are run at about the same time are coalesced into a single configuration
+        transaction, while failures are still reported for each prefix on its own.
+        """
+        try:
+            await coalescer.submit(
+                self._asn_key,
+                self._run_bgp_commands,
+                f"address-family {self.afi} unicast",
+                command,
+            )
+        finally:
+            snapshots.invalidate((self._asn_key, self.afi))
+
+    async def _run_bgp_commands(self, *commands: str) -> str:
+        """Run commands in the BGP configuration of the prefixes VRF.
+
+        If FRRouting reports that the local ASN used to enter the BGP configuration
+        is outdated, it is resolved again and the commands are retried once.
+        Since any failure may be caused by a changed BGP configuration, the local
+        ASN is resolved again before running the next commands after any failure.
+
+        Raises:
+            FRRCommandError: The commands failed to run.
+        """
+        asn = await self._get_local_asn()
+        try:
+            return await self._run_vtysh_commands(
+                "configure terminal", self._router_bgp(asn), *commands
+            )
+        except FRRCommandError as exc:
+            _local_asns.pop(self._asn_key, None)
+            if not _is_asn_mismatch(exc):
+                raise
+            self._log.warning(
+                "Local ASN %s is outdated, resolving it again.", asn, asn=asn
+            )
+
+        asn = await self._get_local_asn()
+        return await self._run_vtysh_commands(
+            "configure terminal", self._router_bgp(asn), *commands
+        )
+
+    def _router_bgp(self, asn: int) -> str:
+        """The command entering the BGP configuration of the prefixes VRF."""
+        return f"router bgp {asn} vrf {self.vrf}" if self.vrf else f"router bgp {asn}"
+
+    @property
+    def _asn_key(self) -> tuple[Executor, Path, Path | None, VRF]:
+        """The key of the local ASN in the cache shared by all prefixes."""
+        return (self.executor, self.vtysh, self.vty_socket, self.vrf)
+
     async def _get_local_asn(self) -> int:
         """Returns the local ASN in the VRF of the prefix.
 
+        The ASN is resolved once and shared by all prefixes in the same VRF,
+        until it may be outdated, i.e. running commands using it failed or the
+        session to FRRouting was replaced, e.g. since FRRouting was restarted.
+        Resolving it again fails if the BGP instance of the VRF no longer exists,
+        instead of creating a new one by entering its configuration. Removing the
+        BGP instance of a VRF while FRRouting keeps running is not detected until
+        then, in which case announcing creates a new instance.
+
+        The ASN is taken from the BGP summary, which is small regardless of the
+        size of the BGP table, falling back to the BGP details only if the summary
+        is empty because no neighbors are configured.
+
         Raises:
             RuntimeError: Failed to get the local ASN.
         """
-        show_bgp_detail = await self._run_vtysh_commands(
-            f"show bgp vrf {self.vrf} detail json"
-            if self.vrf
-            else "show bgp detail json"
+        session = self._session
+        cached = _local_asns.get(self._asn_key)
+        if cached is not None and cached[1] == session.generation:
+            return cached[0]
+
+        vrf = f" vrf {self.vrf}" if self.vrf else ""
+        summary = orjson.loads(
+            await self._run_vtysh_commands(f"show bgp{vrf} summary json")
         )
-        bgp_detail = orjson.loads(show_bgp_detail)
-        if warning := bgp_detail.get("warning"):
+        if warning := summary.get("warning"):
             raise RuntimeError(f"Failed to get local ASN: {warning}")
-        return int(bgp_detail["localAS"])
+        asn = _asn_from_summary(summary)
+        if asn is None:
+            bgp_detail = orjson.loads(
+                await self._run_vtysh_commands(f"show bgp{vrf} detail json")
+            )
+            if warning := bgp_detail.get("warning"):
+                raise RuntimeError(f"Failed to get local ASN: {warning}")
+            if "localAS" not in bgp_detail:
+                raise RuntimeError(f"Failed to get local ASN: No BGP instance{vrf}")
+            asn = int(bgp_detail["localAS"])
+        _local_asns[self._asn_key] = (asn, session.generation)
+        return asn
+
+    @property
+    def _session(self) -> VtyshSession | VtySocketSession:
+        """The session shared by all prefixes that commands are run through."""
+        if self.vty_socket is not None:
+            return vty_session_pool.get(self.vty_socket)
+        return vtysh_session_pool.get(self.executor, self.vtysh)
 
     async def _run_vtysh_commands(self, *commands: str, timeout: float = 1.5) -> str:
         """Run commands in the vtysh.
 
+        Commands are run through a long-lived vtysh session shared by all prefixes
+        using the same executor and vtysh, or sent directly to the BGP daemon through
+        a persistent connection to its VTY socket if one is configured. The timeout
+        only applies once the session is no longer busy running other commands.
+
         Raises:
-            FRRCommandFailed: The command failed to run due to a non-zero exit code
-                or existing stderr output.
+            FRRCommandFailed: The command failed to run due to an error reported
+                by FRRouting or the vtysh exiting unexpectedly.
             FRRCommandTimeoutError: The command timed out.
         """
+        session = self._session
         try:
-            async with asyncio.timeout(timeout):
-                proc = await self.executor.create_subprocess_exec(
-                    self.vtysh, "-c", "\n".join(commands)
-                )
-                stdout, stderr = await proc.communicate()
+            stdout, stderr = await session.run(*commands, timeout=timeout)
         except TimeoutError as exc:
             raise FRRCommandTimeoutError(commands) from exc
 
         self._log.debug(
             "Ran vtysh commands.",
             vtysh_commands=list(commands),
-            vtysh_pid=proc.pid,
-            vtysh_returncode=proc.returncode,
-            vtysh_stdout=stdout.decode("utf-8") if stdout else None,
-            vtysh_stderr=stderr.decode("utf-8") if stderr else None,
+            vtysh_pid=session.pid if isinstance(session, VtyshSession) else None,
+            vtysh_stdout=stdout or None,
+            vtysh_stderr=stderr or None,
         )
 
-        # Command may have failed even if the returncode is 0.
-        if proc.returncode != 0 or stderr:
-            raise FRRCommandError(
-                commands,
-                proc.returncode,
-                stdout=stdout.decode("utf-8") if stdout else None,
-                stderr=stderr.decode("utf-8") if stderr else None,
-            )
-
-        return stdout.decode("utf-8")
+        return stdout
 
     async def validate(self) -> Self:
         """Validate the prefix, raising an error on invalid configuration.
@@ -204,29 +409,50 @@ class FRRoutingPrefix:
 
         Raises:
             FRRInvalidVTYSHError: The vtysh is invalid.
+            FRRInvalidVTYSocketError: The VTY socket is invalid.
             FRRInvalidVRFError: The prefixes VRF is invalid and does not exist.
             FRRNoBGPError: BGP is not configured.
         """
-        if not self.vtysh.is_file():
+        if self.vty_socket is not None:
+            if not self.vty_socket.is_socket():
+                raise FRRInvalidVTYSocketError(
+                    self.vty_socket, "The given VTY socket is not a socket."
+                )
+        elif not self.vtysh.is_file():
             raise FRRInvalidVTYSHError(self.vtysh, "The given VTYSH is not a file.")
-        if self.vrf:
-            show_vrf = await self._run_vtysh_commands(f"show bgp vrf {self.vrf}")
-            if "unknown" in show_vrf.lower():
-                raise FRRInvalidVRFError(self.vrf)
-        else:
-            show_bgp = await self._run_vtysh_commands("show bgp")
-            if "not found" in show_bgp.lower():
-                raise FRRNoBGPError(self.vrf)
+        command = f"show bgp vrf {self.vrf}" if self.vrf else "show bgp"
+        try:
+            show_bgp = await self._run_vtysh_commands(command)
+        except FRRCommandError as exc:
+            # FRRouting reports a missing VRF or BGP instance as an error.
+            self._raise_for_missing_bgp(exc.stdout or "")
+            raise
+        self._raise_for_missing_bgp(show_bgp)
 
         return self
 
+    def _raise_for_missing_bgp(self, show_bgp: str) -> None:
+        """Raise if the output of show bgp reports a missing VRF or BGP instance.
+
+        Raises:
+            FRRInvalidVRFError: The prefixes VRF does not exist.
+            FRRNoBGPError: BGP is not configured.
+        """
+        if self.vrf:
+            if "is unknown" in show_bgp.lower():
+                raise FRRInvalidVRFError(self.vrf)
+        elif "not found" in show_bgp.lower():
+            raise FRRNoBGPError(self.vrf)
+
     @classmethod
-    async def new(
+    async def new(  # noqa: PLR0913
         cls,
         prefix: IPv4Network | IPv6Network,
         *,
         vrf: VRF = None,
         vtysh: Path = Path("/usr/bin/vtysh"),
+        vty_socket: Path | None = None,
+        route_map: str | None = None,
         executor: Executor,
     ) -> Self:
         """Create a new validated FRRoutingPrefix.
@@ -239,5 +465,30 @@ class FRRoutingPrefix:
             FRRouting configuration.
         """
         return await cls(
-            prefix=prefix, vrf=vrf, vtysh=vtysh, executor=executor
+            prefix=prefix,
+            vrf=vrf,
+            vtysh=vtysh,
+            vty_socket=vty_socket,
+            route_map=route_map,
+            executor=executor,
         ).validate()
+
+
+def _asn_from_summary(summary: dict) -> int | None:
+    """The local ASN reported in a BGP summary, if any address family reports it.
+
+    Summaries of all address families contain the summary of each address family
+    by name, while summaries of a single address family report the ASN directly.
+    """
+    if "as" in summary:
+        return int(summary["as"])
+    for afi_summary in summary.values():
+        if isinstance(afi_summary, dict) and "as" in afi_summary:
+            return int(afi_summary["as"])
+    return None
+
+
+def _is_asn_mismatch(exc: FRRCommandError) -> bool:
+    """Whether a command failed due to using an outdated local ASN."""
+    output = f"{exc.stdout or ''}{exc.stderr or ''}".lower()
+    return any(error.lower() in output for error in _ASN_MISMATCH_ERRORS)
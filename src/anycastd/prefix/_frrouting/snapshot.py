@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from ipaddress import IPv4Network, IPv6Network, ip_network
+from typing import Self
+
+import orjson
+
+
+@dataclass(frozen=True)
+class RIBSnapshot:
+    """The locally originated routes of a VRF and address family at a point in time.
+
+    Attributes:
+        networks: The networks of all locally originated routes.
+        taken: The monotonic time at which the snapshot was taken.
+    """
+
+    networks: frozenset[IPv4Network | IPv6Network]
+    taken: float
+
+    @classmethod
+    def from_json(cls, data: str | bytes, *, taken: float) -> Self:
+        """Create a snapshot from the JSON output of a self-originate route query."""
+        routes = orjson.loads(data).get("routes", {})
+        return cls(
+            networks=frozenset(
+                ip_network(network)
+                for network, paths in routes.items()
+                if any(path.get("origin") == "IGP" for path in paths)
+            ),
+            taken=taken,
+        )
+
+    def __contains__(self, network: object) -> bool:
+        return network in self.networks
+
+
+@dataclass
+class RIBSnapshotCache:
+    """Caches RIB snapshots shared by all prefixes in the same VRF and address family.
+
+    Snapshots are reused until they are older than the TTL or invalidated,
+    e.g. after changing the configuration. Concurrent requests for an outdated
+    snapshot share a single refresh.
+
+    Attributes:
+        ttl: The time in seconds for which snapshots are reused.
+    """
+
+    ttl: float = 1.0
+
+    _snapshots: dict[Hashable, RIBSnapshot] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _refreshes: dict[Hashable, asyncio.Task[RIBSnapshot]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    async def get(
+        self, key: Hashable, fetch: Callable[[], Awaitable[str]]
+    ) -> RIBSnapshot:
+        """Get a snapshot, refreshing it if it is outdated.
+
+        Args:
+            key: The key identifying the VRF and address family of the snapshot.
+            fetch: Returns the JSON output of a self-originate route query.
+
+        Returns:
+            A snapshot that is not older than the TTL.
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.monotonic() - snapshot.taken < self.ttl:
+            return snapshot
+
+        refresh = self._refreshes.get(key)
+        if refresh is None:
+            refresh = asyncio.create_task(self._refresh(key, fetch))
+            self._refreshes[key] = refresh
+            refresh.add_done_callback(
+                lambda done: self._refreshes.pop(key)
+                if self._refreshes.get(key) is done
+                else None
+            )
+        return await asyncio.shield(refresh)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Invalidate a snapshot, including one that is currently being refreshed."""
+        self._snapshots.pop(key, None)
+        self._refreshes.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate all snapshots."""
+        self._snapshots.clear()
+        self._refreshes.clear()
+
+    async def _refresh(
+        self, key: Hashable, fetch: Callable[[], Awaitable[str]]
+    ) -> RIBSnapshot:
+        """Fetch a new snapshot, storing it unless it was invalidated meanwhile."""
+        task = asyncio.current_task()
+        taken = time.monotonic()
+        snapshot = RIBSnapshot.from_json(await fetch(), taken=taken)
+        if self._refreshes.get(key) is task:
+            self._snapshots[key] = snapshot
+        return snapshot
+
+
+snapshots = RIBSnapshotCache()
@@ -0,0 +1,198 @@
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+
+from anycastd.prefix._frrouting.exceptions import FRRCommandError
+
+logger = structlog.get_logger()
+
+# Replies are terminated by three null bytes followed by the command status.
+_REPLY_TERMINATOR = b"\0\0\0"
+_CMD_SUCCESS = 0
+# The maximum size of a single reply, e.g. a JSON dump of the BGP table.
+_REPLY_LIMIT = 64 * 1024 * 1024
+
+
+@dataclass
+class VtySocketSession:
+    """A persistent connection to the VTY socket of a FRRouting daemon.
+
+    Commands are sent directly to the daemon using the protocol spoken between
+    the vtysh and FRRouting daemons, bypassing the vtysh binary entirely.
+    Each command is terminated by a null byte, while each reply consists of the
+    output of the command, followed by three null bytes and a status byte that
+    is zero if the command succeeded.
+
+    If the daemon closes the connection, e.g. because it was restarted, a new
+    connection is established and the commands are sent again.
+
+    Attributes:
+        path: The path to the VTY socket of the daemon, e.g.
+            `/var/run/frr/bgpd.vty`.
+        generation: The number of connections established so far, changing
+            whenever the daemon may have been restarted.
+    """
+
+    path: Path
+    generation: int = field(default=0, init=False)
+
+    _reader: asyncio.StreamReader | None = field(default=None, init=False, repr=False)
+    _writer: asyncio.StreamWriter | None = field(default=None, init=False, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+
+    async def run(
+        self, *commands: str, timeout: float | None = None
+    ) -> tuple[str, str]:
+        """Run commands through the VTY socket.
+
+        Commands are run one set at a time. If the connection is closed before
+        all replies have been read, they are sent again once using a new connection.
+
+        Args:
+            commands: The commands to run.
+            timeout: The time in seconds to wait for the commands to complete
+                once no other commands are running, or None to wait indefinitely.
+
+        Returns:
+            The output of the commands along with an always empty stderr output,
+            since the VTY protocol does not distinguish between the two.
+
+        Raises:
+            FRRCommandError: One of the commands failed or the connection failed.
+            TimeoutError: The commands did not complete within the timeout.
+        """
+        async with self._lock, asyncio.timeout(timeout):
+            try:
+                return await self._run(commands), ""
+            except (OSError, asyncio.IncompleteReadError):
+                logger.warning(
+                    "The VTY connection closed unexpectedly, retrying with a new one.",
+                    vty_socket=self.path.as_posix(),
+                )
+                self._discard()
+
+            try:
+                return await self._run(commands), ""
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                self._discard()
+                raise FRRCommandError(commands, None, stdout=None, stderr=None) from exc
+
+    async def aclose(self) -> None:
+        """Close the connection."""
+        writer = self._writer
+        self._discard()
+        if writer is not None:
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _run(self, commands: tuple[str, ...]) -> str:
+        """Run commands using the current connection, connecting if required.
+
+        Raises:
+            OSError: The connection failed.
+            asyncio.IncompleteReadError: The connection closed during a reply.
+            FRRCommandError: One of the commands failed or a reply exceeded the
+                size limit.
+        """
+        reader, writer = await self._ensure_connection()
+        output: list[str] = []
+        status = _CMD_SUCCESS
+        try:
+            for command in commands:
+                reply, status = await _execute(reader, writer, command)
+                output.append(reply)
+                if status != _CMD_SUCCESS:
+                    break
+            # Return to the enable node, regardless of whether the commands failed.
+            if "configure terminal" in commands:
+                await _execute(reader, writer, "end")
+        except asyncio.LimitOverrunError as exc:
+            self._discard()
+            raise FRRCommandError(commands, None, stdout=None, stderr=None) from exc
+        except BaseException:
+            # Replies to the interrupted commands would be read by the next ones.
+            self._discard()
+            raise
+
+        if status != _CMD_SUCCESS:
+            raise FRRCommandError(commands, status, stdout="".join(output), stderr=None)
+        return "".join(output)
+
+    async def _ensure_connection(
+        self,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Return the current connection, connecting if required."""
+        if (
+            self._reader is not None
+            and self._writer is not None
+            and not self._writer.is_closing()
+        ):
+            return self._reader, self._writer
+
+        self._discard()
+        reader, writer = await asyncio.open_unix_connection(
+            self.path, limit=_REPLY_LIMIT
+        )
+        self._reader, self._writer = reader, writer
+        self.generation += 1
+        logger.debug("Connected to VTY socket.", vty_socket=self.path.as_posix())
+
+        # Connections start out in the view node, only allowing show commands.
+        _, status = await _execute(reader, writer, "enable")
+        if status != _CMD_SUCCESS:
+            self._discard()
+            raise ConnectionRefusedError("Failed to enter the enable node.")
+        return reader, writer
+
+    def _discard(self) -> None:
+        """Close the current connection, if any."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader, self._writer = None, None
+
+
+@dataclass
+class VtySocketSessionPool:
+    """Persistent VTY socket connections shared by all FRRouting prefixes.
+
+    A single connection is kept for each VTY socket.
+    """
+
+    _sessions: dict[Path, VtySocketSession] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get(self, path: Path) -> VtySocketSession:
+        """Get the session for a VTY socket, creating it if required."""
+        session = self._sessions.get(path)
+        if session is None:
+            session = VtySocketSession(path)
+            self._sessions[path] = session
+        return session
+
+    async def aclose(self) -> None:
+        """Close all sessions."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.aclose()
+
+
+session_pool = VtySocketSessionPool()
+
+
+async def _execute(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, command: str
+) -> tuple[str, int]:
+    """Send a single command and read its reply.
+
+    Returns:
+        The output of the command and its status.
+    """
+    writer.write(command.encode("utf-8") + b"\0")
+    await writer.drain()
+    reply = await reader.readuntil(_REPLY_TERMINATOR)
+    status = await reader.readexactly(1)
+    return reply.removesuffix(_REPLY_TERMINATOR).decode("utf-8"), status[0]
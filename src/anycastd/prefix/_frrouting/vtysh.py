@@ -0,0 +1,242 @@
+import asyncio
+import itertools
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+
+from anycastd._executor import Executor
+from anycastd.prefix._frrouting.exceptions import FRRCommandError
+
+logger = structlog.get_logger()
+
+# Prompt characters preceding commands echoed back by the vtysh.
+_PROMPT_SUFFIXES = ("#", ">")
+
+
+@dataclass
+class VtyshSession:
+    """A long-lived vtysh co-process that commands are run through.
+
+    Instead of spawning a new vtysh for every set of commands, which connects to
+    every FRRouting daemon before running them, commands are written to the stdin
+    of a single vtysh process. The output of each set of commands is delimited by
+    echoing unique markers before and after running them.
+
+    Since the exit code of the vtysh is not available for individual commands,
+    failed commands are detected through error messages, which are prefixed with
+    a percent sign by FRRouting. Stderr of the vtysh is merged into its stdout,
+    so that error messages are read between the markers of the commands causing
+    them instead of being attributed to later ones. If the vtysh exits, e.g.
+    because FRRouting was restarted, a new process is spawned and the commands
+    are run again.
+
+    Attributes:
+        vtysh: The path to the vtysh binary.
+        executor: The executor used to spawn the vtysh.
+        generation: The number of vtysh processes spawned so far, changing
+            whenever FRRouting may have been restarted.
+    """
+
+    vtysh: Path
+    executor: Executor
+    generation: int = field(default=0, init=False)
+
+    _process: asyncio.subprocess.Process | None = field(
+        default=None, init=False, repr=False
+    )
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    _sequence: itertools.count = field(
+        default_factory=itertools.count, init=False, repr=False
+    )
+
+    @property
+    def pid(self) -> int | None:
+        """The process ID of the running vtysh, if any."""
+        return self._process.pid if self._process is not None else None
+
+    async def run(
+        self, *commands: str, timeout: float | None = None
+    ) -> tuple[str, str]:
+        """Run commands in the vtysh.
+
+        Commands are run one set at a time. If the process exits before the
+        output of the commands has been read, they are run again once using
+        a newly spawned process.
+
+        Args:
+            commands: The commands to run.
+            timeout: The time in seconds to wait for the commands to complete
+                once no other commands are running, or None to wait indefinitely.
+
+        Returns:
+            The output of the commands, including anything written to stderr,
+            and an empty stderr.
+
+        Raises:
+            FRRCommandError: One of the commands failed or the vtysh exited.
+            TimeoutError: The commands did not complete within the timeout.
+        """
+        async with self._lock, asyncio.timeout(timeout):
+            try:
+                return await self._run(commands)
+            except ConnectionError:
+                logger.warning(
+                    "The vtysh exited unexpectedly, retrying with a new process.",
+                    vtysh_path=self.vtysh.as_posix(),
+                )
+                self._discard()
+
+            try:
+                return await self._run(commands)
+            except ConnectionError as exc:
+                self._discard()
+                raise FRRCommandError(commands, None, stdout=None, stderr=None) from exc
+
+    async def aclose(self) -> None:
+        """Terminate the vtysh process."""
+        process = self._process
+        self._discard()
+        if process is not None:
+            with suppress(ProcessLookupError):
+                await process.wait()
+
+    async def _run(self, commands: tuple[str, ...]) -> tuple[str, str]:
+        """Run commands in the running vtysh, spawning it if required.
+
+        Raises:
+            ConnectionError: The vtysh exited before all output was read.
+            FRRCommandError: One of the commands failed.
+        """
+        process = await self._ensure_process()
+        if process.stdin is None or process.stdout is None:
+            raise RuntimeError("The vtysh must be spawned with stdin and stdout pipes.")
+
+        sequence = next(self._sequence)
+        begin, end = f"anycastd-begin-{sequence}", f"anycastd-end-{sequence}"
+        lines = [f"echo {begin}", *commands]
+        # Return to the enable node, in which markers can be echoed.
+        if "configure terminal" in commands:
+            lines.append("end")
+        lines.append(f"echo {end}")
+
+        try:
+            process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            await process.stdin.drain()
+            await _read_until(process.stdout, begin)
+            output = await _read_until(process.stdout, end)
+        except BaseException:
+            # Output of the interrupted commands would be read by the next ones.
+            self._discard()
+            raise
+
+        stdout = "".join(line for line in output if not _is_echo(line, lines))
+        if any(line.startswith("%") for line in stdout.splitlines()):
+            raise FRRCommandError(commands, None, stdout=stdout, stderr=None)
+
+        return stdout, ""
+
+    async def _ensure_process(self) -> asyncio.subprocess.Process:
+        """Return the running vtysh process, spawning a new one if required."""
+        if self._process is not None and self._process.returncode is None:
+            return self._process
+
+        self._discard()
+        process = await self.executor.create_subprocess_exec(
+            self.vtysh, merge_stderr=True
+        )
+        self._process = process
+        self.generation += 1
+        logger.debug(
+            "Spawned vtysh session.",
+            vtysh_path=self.vtysh.as_posix(),
+            vtysh_pid=process.pid,
+        )
+        return process
+
+    def _discard(self) -> None:
+        """Kill the current vtysh process, if any."""
+        if self._process is not None:
+            if self._process.returncode is None:
+                with suppress(ProcessLookupError):
+                    self._process.kill()
+            self._process = None
+
+
+@dataclass
+class VtyshSessionPool:
+    """Long-lived vtysh sessions shared by all FRRouting prefixes.
+
+    A single session is kept for each combination of executor and vtysh binary.
+    """
+
+    _sessions: dict[tuple[Executor, Path], VtyshSession] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get(self, executor: Executor, vtysh: Path) -> VtyshSession:
+        """Get the session for an executor and vtysh, creating it if required."""
+        key = (executor, vtysh)
+        session = self._sessions.get(key)
+        if session is None:
+            session = VtyshSession(vtysh, executor)
+            self._sessions[key] = session
+        return session
+
+    async def aclose(self) -> None:
+        """Terminate all sessions."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.aclose()
+
+
+session_pool = VtyshSessionPool()
+
+
+async def _read_until(stream: asyncio.StreamReader, marker: str) -> list[str]:
+    """Read lines from a stream until a line consisting of the given marker.
+
+    Returns:
+        The lines read before the marker.
+
+    Raises:
+        ConnectionError: The stream ended before the marker was read.
+    """
+    lines: list[str] = []
+    while line := (await _readline(stream)).decode("utf-8"):
+        if line.strip() == marker:
+            return lines
+        lines.append(line)
+    raise ConnectionResetError("The vtysh exited before the marker was read.")
+
+
+async def _readline(stream: asyncio.StreamReader) -> bytes:
+    """Read a line from a stream, regardless of the buffer limit of the stream.
+
+    Returns:
+        The line including its trailing newline, or the remaining data if the
+        stream ended before a newline, which is empty at the end of the stream.
+    """
+    chunks: list[bytes] = []
+    while True:
+        try:
+            chunks.append(await stream.readuntil(b"\n"))
+        except asyncio.IncompleteReadError as exc:
+            chunks.append(exc.partial)
+        except asyncio.LimitOverrunError as exc:
+            # Consume the part of the line exceeding the limit and read on.
+            chunks.append(await stream.readexactly(exc.consumed))
+            continue
+        return b"".join(chunks)
+
+
+def _is_echo(line: str, commands: list[str]) -> bool:
+    """Whether a line is a command echoed back along with the vtysh prompt."""
+    line = line.rstrip()
+    for command in commands:
+        if line.endswith(command):
+            prompt = line.removesuffix(command).rstrip()
+            if prompt.endswith(_PROMPT_SUFFIXES):
+                return True
+    return False
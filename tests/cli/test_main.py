@@ -203,6 +203,22 @@ class TestRunCMD:
         assert re.fullmatch(expected_first_line, output_lines[0])
 
 
+def test_watchdog_calls_expire_held_state(anycastd_cli, mocker):
+    """The watchdog command expires the held state of the configuration."""
+    mock_configuration = mocker.create_autospec(
+        "anycastd._configuration.MainConfiguration", spec_set=True, instance=True
+    )
+    mocker.patch(
+        "anycastd._cli.main._get_main_configuration", return_value=mock_configuration
+    )
+    mock_expire = mocker.patch("anycastd._cli.main.expire_held_state", autospec=True)
+
+    result = anycastd_cli("watchdog")
+
+    assert result.exit_code == 0
+    mock_expire.assert_called_once_with(mock_configuration)
+
+
 def test_reading_configuration_is_logged(mocker):
     """Reading the configuration is logged."""
     path = Path("/path/to/config.toml")
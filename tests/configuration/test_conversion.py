@@ -6,13 +6,18 @@ import pytest
 
 from anycastd._configuration.conversion import (
     _sub_config_to_instance,
+    config_to_cabourotte_receiver,
+    configs_to_services,
     dict_w_items_named_by_key_to_flat_w_name_value,
 )
 from anycastd._configuration.healthcheck import (
+    CabourotteConfiguration,
     CabourotteHealthcheckConfiguration,
+    CabourotteReceiverConfiguration,
     HealthcheckConfiguration,
 )
 from anycastd._configuration.prefix import FRRPrefixConfiguration, PrefixConfiguration
+from anycastd._configuration.service import ServiceConfiguration
 from anycastd._executor import LocalExecutor
 from anycastd.healthcheck import CabourotteHealthcheck, Healthcheck
 from anycastd.prefix import FRRoutingPrefix, Prefix
@@ -57,6 +62,95 @@ def test_subconfiguration_converted_to_instance(
     assert converted == expected
 
 
+def test_identical_checks_shared_between_services():
+    """Services with identical health check configurations share a single instance."""
+    check = CabourotteHealthcheckConfiguration(name="dns")
+    configs = tuple(
+        ServiceConfiguration(
+            name=name,
+            prefixes=(FRRPrefixConfiguration(prefix=IPv6Network(prefix)),),
+            checks=(check,),
+        )
+        for name, prefix in (
+            ("dns_v6", "2001:db8::53/128"),
+            ("dns_vrf", "2001:db8::/32"),
+        )
+    )
+
+    services = configs_to_services(configs)
+
+    assert services[0].health_checks[0] is services[1].health_checks[0]
+
+
+def test_different_checks_not_shared_between_services():
+    """Services with different health check configurations use separate instances."""
+    configs = tuple(
+        ServiceConfiguration(
+            name="dns",
+            prefixes=(FRRPrefixConfiguration(prefix=IPv6Network("2001:db8::/32")),),
+            checks=(
+                CabourotteHealthcheckConfiguration(
+                    name="dns", interval=datetime.timedelta(seconds=interval)
+                ),
+            ),
+        )
+        for interval in (1, 2)
+    )
+
+    services = configs_to_services(configs)
+
+    assert services[0].health_checks[0] is not services[1].health_checks[0]
+
+
+def test_service_thresholds_apply_to_checks():
+    """Thresholds of a service apply to checks that do not configure their own."""
+    config = ServiceConfiguration(
+        name="dns",
+        prefixes=(FRRPrefixConfiguration(prefix=IPv6Network("2001:db8::/32")),),
+        checks=(
+            CabourotteHealthcheckConfiguration(name="dns"),
+            CabourotteHealthcheckConfiguration(name="dns-ext", fall=5),
+        ),
+        rise=2,
+        fall=3,
+    )
+
+    (service,) = configs_to_services([config])
+
+    assert [(check.rise, check.fall) for check in service.health_checks] == [
+        (2, 3),
+        (2, 5),
+    ]
+
+
+def test_no_cabourotte_receiver_if_not_enabled():
+    """No receiver is created if receiving pushed results is not enabled."""
+    assert config_to_cabourotte_receiver(CabourotteConfiguration(), ()) is None
+
+
+def test_cabourotte_receiver_registers_checks():
+    """Cabourotte health checks of all services are registered with the receiver."""
+    services = configs_to_services(
+        (
+            ServiceConfiguration(
+                name="dns",
+                prefixes=(FRRPrefixConfiguration(prefix=IPv6Network("2001:db8::/32")),),
+                checks=(CabourotteHealthcheckConfiguration(name="dns"),),
+            ),
+        )
+    )
+    config = CabourotteConfiguration(
+        receiver=CabourotteReceiverConfiguration(host="::1", port=9999)
+    )
+
+    receiver = config_to_cabourotte_receiver(config, services)
+
+    assert receiver is not None
+    assert receiver.host == "::1"
+    assert receiver.port == 9999  # noqa: PLR2004
+    assert receiver._checks["dns"] == [services[0].health_checks[0]]
+
+
 def test_dict_w_named_to_flat_w_name_value():
     """Dictionaries with named items can be converted to flat dictionaries."""
     named = {"foo": {"bar": "baz"}, "qux": {"quux": "corge"}}
@@ -1,7 +1,16 @@
+import datetime
+
 import pytest
 
 from anycastd._configuration.exceptions import ConfigurationSyntaxError
+from anycastd._configuration.healthcheck import (
+    CabourotteConfiguration,
+    CabourotteReceiverConfiguration,
+)
 from anycastd._configuration.main import MainConfiguration
+from anycastd._configuration.restart import HoldOnRestartConfiguration
+from anycastd._configuration.scheduling import SchedulingConfiguration
+from anycastd._configuration.shutdown import ShutdownConfiguration
 
 
 def test_initialized_from_valid_toml(sample_configuration, sample_configuration_file):
@@ -18,3 +27,146 @@ def test_missing_required_top_level_field_raises(sample_configuration_dict):
 
     with pytest.raises(ConfigurationSyntaxError, match=expected):
         MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+
+def test_cabourotte_settings_default_when_omitted(sample_configuration_dict):
+    """Cabourotte settings use their defaults when omitted."""
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+    assert config.cabourotte == CabourotteConfiguration()
+
+
+def test_cabourotte_settings_parsed(sample_configuration_dict):
+    """Cabourotte settings are parsed from the cabourotte table."""
+    sample_configuration_dict["cabourotte"] = {"max_connections": 2, "timeout": 1}
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.cabourotte.max_connections == 2  # noqa: PLR2004
+    assert config.cabourotte.timeout == datetime.timedelta(seconds=1)
+
+
+def test_cabourotte_receiver_parsed(sample_configuration_dict):
+    """The cabourotte receiver is enabled through the receiver table."""
+    sample_configuration_dict["cabourotte"] = {"receiver": {"port": 9999}}
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.cabourotte.receiver == CabourotteReceiverConfiguration(port=9999)
+
+
+def test_cabourotte_circuit_breaker_parsed(sample_configuration_dict):
+    """Circuit breaker settings are parsed from the circuit_breaker table."""
+    sample_configuration_dict["cabourotte"] = {
+        "circuit_breaker": {"threshold": 5, "max_backoff": 30}
+    }
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.cabourotte.circuit_breaker.threshold == 5  # noqa: PLR2004
+    assert config.cabourotte.circuit_breaker.max_backoff == datetime.timedelta(
+        seconds=30
+    )
+
+
+def test_invalid_cabourotte_settings_raise(sample_configuration_dict):
+    """Exception raised when the cabourotte table contains invalid fields."""
+    sample_configuration_dict["cabourotte"] = {"max_connection": 2}
+
+    with pytest.raises(ConfigurationSyntaxError, match=".*max_connection.*"):
+        MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+
+def test_hold_on_restart_disabled_when_omitted(sample_configuration_dict):
+    """Holding prefixes on restart is disabled unless configured."""
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+    assert config.hold_on_restart is None
+
+
+def test_hold_on_restart_parsed(sample_configuration_dict):
+    """Holding prefixes on restart is enabled through the hold_on_restart table."""
+    sample_configuration_dict["hold_on_restart"] = {"grace_period": 60}
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.hold_on_restart == HoldOnRestartConfiguration(
+        grace_period=datetime.timedelta(seconds=60)
+    )
+
+
+def test_shutdown_settings_parsed(sample_configuration_dict):
+    """Shutdown settings are parsed from the shutdown table."""
+    sample_configuration_dict["shutdown"] = {"timeout": 3}
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.shutdown == ShutdownConfiguration(
+        timeout=datetime.timedelta(seconds=3)
+    )
+
+
+def test_scheduling_settings_parsed(sample_configuration_dict):
+    """Scheduling settings are parsed from the scheduling table."""
+    sample_configuration_dict["scheduling"] = {
+        "stagger": True,
+        "jitter": 0.1,
+        "max_requests_per_second": 20,
+    }
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.scheduling == SchedulingConfiguration(
+        stagger=True, jitter=0.1, max_requests_per_second=20
+    )
+
+
+@pytest.mark.parametrize(
+    "scheduling", [{"jitter": 0.6}, {"max_requests_per_second": 0}, {"burst": 0}]
+)
+def test_invalid_scheduling_settings_raise(sample_configuration_dict, scheduling):
+    """Exception raised when the scheduling table contains invalid values."""
+    sample_configuration_dict["scheduling"] = scheduling
+
+    with pytest.raises(ConfigurationSyntaxError):
+        MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+
+def test_service_thresholds_parsed(sample_configuration_dict):
+    """Rise and fall thresholds are parsed from service tables."""
+    service = next(iter(sample_configuration_dict["services"].values()))
+    service.update(rise=2, fall=3)
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert (config.services[0].rise, config.services[0].fall) == (2, 3)
+
+
+@pytest.mark.parametrize("value", [0, -1, "2", True])
+def test_invalid_service_thresholds_raise(sample_configuration_dict, value):
+    """Exception raised when a service threshold is not a positive integer."""
+    service = next(iter(sample_configuration_dict["services"].values()))
+    service["fall"] = value
+
+    with pytest.raises(ConfigurationSyntaxError, match=".*'fall'.*"):
+        MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+
+@pytest.mark.parametrize("value", [1.5, "PT1.5S"])
+def test_service_evaluation_deadline_parsed(sample_configuration_dict, value):
+    """The evaluation deadline and its policy are parsed from service tables."""
+    service = next(iter(sample_configuration_dict["services"].values()))
+    service.update(evaluation_deadline=value, keep_result_cycles=2)
+
+    config = MainConfiguration.from_configuration_dict(sample_configuration_dict)
+
+    assert config.services[0].evaluation_deadline == datetime.timedelta(seconds=1.5)
+    assert config.services[0].keep_result_cycles == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("value", [0, -1, "PT0S", "2", "soon"])
+def test_invalid_service_evaluation_deadline_raises(sample_configuration_dict, value):
+    """Exception raised when the evaluation deadline is not a positive duration."""
+    service = next(iter(sample_configuration_dict["services"].values()))
+    service["evaluation_deadline"] = value
+
+    with pytest.raises(ConfigurationSyntaxError, match=".*'evaluation_deadline'.*"):
+        MainConfiguration.from_configuration_dict(sample_configuration_dict)
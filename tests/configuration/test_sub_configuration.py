@@ -80,6 +80,28 @@ def test_from_expanded_format(config: dict, expected: SubConfiguration):
     assert result == expected
 
 
+@pytest.mark.parametrize("field", ["max_interval", "max_age"])
+def test_maximum_below_interval_raises(field: str):
+    """Exception raised when a maximum interval or age is below the interval."""
+    config = {"name": "example-healthcheck", "interval": 5, field: 2}
+
+    with pytest.raises(ConfigurationSyntaxError, match=f".*{field}.*"):
+        CabourotteHealthcheckConfiguration.from_configuration(config)
+
+
+@pytest.mark.parametrize("percentile", [0, 101])
+def test_invalid_duration_percentile_raises(percentile: float):
+    """Exception raised when the duration percentile is out of range."""
+    config = {
+        "name": "example-healthcheck",
+        "max_duration": 0.8,
+        "duration_percentile": percentile,
+    }
+
+    with pytest.raises(ConfigurationSyntaxError, match=".*duration_percentile.*"):
+        CabourotteHealthcheckConfiguration.from_configuration(config)
+
+
 def test_from_simple_when_multiple_required_fields_raises():
     """Exception raised when multiple fields are required but only a string is given."""
 
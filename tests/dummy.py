@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from ipaddress import IPv4Network, IPv6Network
 
+from anycastd.healthcheck._common import ResultListener
 from anycastd.prefix import Prefix
 
 
@@ -15,6 +17,45 @@ class DummyHealthcheck:
         return True
 
 
+@dataclass
+class DummyObservableHealthcheck(DummyHealthcheck):
+    """A dummy healthcheck that signals changes of its result."""
+
+    next_due: float | None = None
+    interval: float = 1.0
+    refresh_count: int = 0
+    listeners: list[ResultListener] = field(default_factory=list)
+    due_listeners: list[ResultListener] = field(default_factory=list)
+
+    def subscribe(self, listener: ResultListener) -> None:
+        """Store the listener."""
+        self.listeners.append(listener)
+
+    def subscribe_due(self, listener: ResultListener) -> None:
+        """Store the listener."""
+        self.due_listeners.append(listener)
+
+    async def refresh(self) -> bool:
+        """Count the refresh and become due again after the interval."""
+        self.refresh_count += 1
+        self.next_due = time.monotonic() + self.interval
+        return True
+
+
+@dataclass
+class DummyCachedHealthcheck(DummyHealthcheck):
+    """A dummy healthcheck exposing a cached result."""
+
+    next_due: float | None = None
+    cached_status: bool | None = None
+    evaluations: int = 0
+
+    async def is_healthy(self) -> bool:
+        """Count the evaluation."""
+        self.evaluations += 1
+        return True
+
+
 class DummyPrefix(Prefix):
     """A dummy prefix to test the abstract base class."""
 
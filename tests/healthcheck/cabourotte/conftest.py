@@ -0,0 +1,26 @@
+import pytest
+
+from anycastd.healthcheck._cabourotte.circuit import circuit_breakers
+from anycastd.healthcheck._cabourotte.client import client_pool
+from anycastd.healthcheck._cabourotte.result import _recipients
+
+
+@pytest.fixture(autouse=True)
+async def close_client_pool():
+    """Close shared clients after each test, since they are bound to an event loop."""
+    yield
+    await client_pool.aclose()
+
+
+@pytest.fixture(autouse=True)
+def clear_circuit_breakers():
+    """Forget the state of circuit breakers shared between tests."""
+    yield
+    circuit_breakers.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_result_recipients():
+    """Forget the recipients of results subscribed by checks of previous tests."""
+    yield
+    _recipients.clear()
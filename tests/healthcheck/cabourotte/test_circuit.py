@@ -0,0 +1,118 @@
+import datetime
+
+import pytest
+from structlog.testing import capture_logs
+
+from anycastd.healthcheck._cabourotte.circuit import CircuitBreaker, CircuitBreakers
+
+URL = "http://[::1]:9013"
+
+
+@pytest.fixture
+def mock_monotonic(mocker):
+    """A mocked monotonic clock starting at zero."""
+    return mocker.patch(
+        "anycastd.healthcheck._cabourotte.circuit.time.monotonic", return_value=0.0
+    )
+
+
+def _opened(breaker: CircuitBreaker) -> CircuitBreaker:
+    """Record failures on a circuit breaker until it opens."""
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_circuit_opens_after_threshold(mock_monotonic):
+    """Requests are allowed until the failure threshold is reached."""
+    breaker = CircuitBreaker(URL, threshold=2)
+
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_single_probe_allowed_after_backoff(mock_monotonic):
+    """Once the backoff passed, a single probe request is allowed."""
+    breaker = _opened(CircuitBreaker(URL, backoff=datetime.timedelta(seconds=1)))
+
+    mock_monotonic.return_value = 1.0
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_backoff_doubles_up_to_maximum(mock_monotonic):
+    """The backoff doubles with every failed probe, up to the maximum."""
+    breaker = _opened(
+        CircuitBreaker(
+            URL,
+            backoff=datetime.timedelta(seconds=1),
+            max_backoff=datetime.timedelta(seconds=3),
+        )
+    )
+
+    retries = [breaker.retry_at]
+    for _ in range(3):
+        mock_monotonic.return_value = breaker.retry_at
+        assert breaker.allow()
+        breaker.record_failure()
+        retries.append(breaker.retry_at - mock_monotonic.return_value)
+
+    assert retries == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_success_closes_circuit(mock_monotonic):
+    """The first successful request closes the circuit."""
+    breaker = _opened(CircuitBreaker(URL))
+
+    breaker.record_success()
+
+    assert not breaker.is_open
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_state_changes_logged_once(mock_monotonic):
+    """Opening and closing the circuit is logged once each."""
+    breaker = CircuitBreaker(URL, threshold=1)
+
+    with capture_logs() as logs:
+        breaker.record_failure()
+        breaker.allow()
+        breaker.allow()
+        breaker.record_success()
+        breaker.record_success()
+
+    assert [log["log_level"] for log in logs] == ["warning", "info"]
+
+
+def test_invalid_threshold_raises():
+    """A threshold below one raises a ValueError."""
+    with pytest.raises(ValueError, match="Threshold"):
+        CircuitBreaker(URL, threshold=0)
+
+
+def test_breakers_shared_per_url():
+    """The same circuit breaker is returned for the same URL."""
+    breakers = CircuitBreakers()
+
+    assert breakers.get(URL) is breakers.get(URL)
+    assert breakers.get(URL) is not breakers.get("http://[::1]:9014")
+
+
+def test_configured_breakers_created():
+    """Circuit breakers are created using the configured settings."""
+    breakers = CircuitBreakers()
+
+    breakers.configure(
+        threshold=5,
+        backoff=datetime.timedelta(seconds=2),
+        max_backoff=datetime.timedelta(seconds=10),
+    )
+
+    assert breakers.get(URL).threshold == 5  # noqa: PLR2004
+    assert breakers.get(URL).max_backoff == datetime.timedelta(seconds=10)
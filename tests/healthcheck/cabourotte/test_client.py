@@ -0,0 +1,45 @@
+import httpx
+
+from anycastd.healthcheck._cabourotte.client import ClientPool
+
+
+def test_client_reused_for_same_url():
+    """The same client is returned for the same URL."""
+    pool = ClientPool()
+
+    client = pool.get("http://[::1]:9013")
+
+    assert pool.get("http://[::1]:9013") is client
+
+
+def test_separate_clients_for_different_urls():
+    """Different URLs use separate clients."""
+    pool = ClientPool()
+
+    client = pool.get("http://[::1]:9013")
+
+    assert pool.get("http://[::1]:9014") is not client
+
+
+def test_configured_limits_and_timeout_used():
+    """Clients are created using the configured limits and timeout."""
+    pool = ClientPool()
+    limits = httpx.Limits(max_connections=2)
+    timeout = httpx.Timeout(0.5)
+
+    pool.configure(limits=limits, timeout=timeout)
+    client = pool.get("http://[::1]:9013")
+
+    assert client.timeout == timeout
+    assert client._transport._pool._max_connections == limits.max_connections
+
+
+async def test_aclose_closes_clients():
+    """Closing the pool closes all clients, creating new ones when required."""
+    pool = ClientPool()
+    client = pool.get("http://[::1]:9013")
+
+    await pool.aclose()
+
+    assert client.is_closed
+    assert pool.get("http://[::1]:9013") is not client
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from structlog.testing import capture_logs
+
+from anycastd.healthcheck._cabourotte.latency import DurationThreshold
+
+MAX_DURATION = datetime.timedelta(milliseconds=500)
+
+
+def _ms(*durations: int) -> list[datetime.timedelta]:
+    """Durations from milliseconds."""
+    return [datetime.timedelta(milliseconds=duration) for duration in durations]
+
+
+def _observe(threshold: DurationThreshold, durations) -> list[bool]:
+    """Observe durations, returning whether the check was slow after each."""
+    return [threshold.observe(duration) for duration in durations]
+
+
+def test_each_duration_compared_without_percentile():
+    """Without a percentile, each duration is compared to the maximum."""
+    threshold = DurationThreshold("test", MAX_DURATION)
+
+    assert _observe(threshold, _ms(100, 800, 100)) == [False, True, False]
+
+
+def test_percentile_tolerates_outliers():
+    """With a percentile, single outliers within the window are tolerated."""
+    threshold = DurationThreshold("test", MAX_DURATION, percentile=50, window=5)
+
+    assert _observe(threshold, _ms(100, 100, 900, 100, 800, 900)) == [
+        False,
+        False,
+        False,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_hysteresis():
+    """Slowness only changes after consecutive observations."""
+    threshold = DurationThreshold("test", MAX_DURATION, rise=2, fall=2)
+
+    assert _observe(threshold, _ms(800, 100, 800, 800, 100, 100)) == [
+        False,
+        False,
+        False,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_changes_logged_once():
+    """Becoming slow and fast again is logged once each."""
+    threshold = DurationThreshold("test", MAX_DURATION)
+
+    with capture_logs() as logs:
+        _observe(threshold, _ms(800, 900, 100, 100))
+
+    assert [log["log_level"] for log in logs] == ["warning", "info"]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"percentile": 0}, {"percentile": 101}, {"window": 0}, {"rise": 0}]
+)
+def test_invalid_parameters_raise(kwargs: dict):
+    """Invalid parameters raise a ValueError."""
+    with pytest.raises(ValueError):
+        DurationThreshold("test", MAX_DURATION, **kwargs)
@@ -1,11 +1,17 @@
+import asyncio
 import datetime
+import time
 
 import httpx
 import pytest
 from pytest_mock import MockerFixture
 from structlog.testing import capture_logs
 
-from anycastd.healthcheck._cabourotte.exceptions import CabourotteCheckNotFoundError
+from anycastd.healthcheck._cabourotte.exceptions import (
+    CabourotteCheckError,
+    CabourotteCheckNotFoundError,
+    CabourotteCircuitOpenError,
+)
 from anycastd.healthcheck._cabourotte.main import CabourotteHealthcheck
 from anycastd.healthcheck._cabourotte.result import Result
 
@@ -47,6 +53,16 @@ def test__init__non_string_url_raises_type_error():
             "name": "test",
             "url": "https://example.com",
             "interval": datetime.timedelta(seconds=30),
+            "rise": 2,
+            "fall": 3,
+            "timeout": datetime.timedelta(seconds=2),
+            "max_interval": datetime.timedelta(seconds=120),
+            "max_age": datetime.timedelta(seconds=90),
+            "max_duration": datetime.timedelta(milliseconds=800),
+            "duration_percentile": 90.0,
+            "duration_window": 20,
+            "duration_rise": 2,
+            "duration_fall": 3,
         }
     ],
 )
@@ -80,14 +96,17 @@ def test_non_equal():
     assert healthcheck1 != healthcheck2
 
 
-async def test_get_status_awaits_get_result(mocker: MockerFixture):
-    """The get status method awaits the result of get_result."""
+async def test_get_status_awaits_get_batched_result(mocker: MockerFixture):
+    """The get status method awaits the result of get_batched_result."""
     name = "test"
     url = "https://example.com"
     healthcheck = CabourotteHealthcheck(
         name, url=url, interval=datetime.timedelta(seconds=10)
     )
-    mock_get_result = mocker.patch("anycastd.healthcheck._cabourotte.main.get_result")
+    mock_get_result = mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now()),
+    )
 
     await healthcheck._get_status()
 
@@ -101,9 +120,14 @@ async def test_get_status_returns_result(success: bool, mocker: MockerFixture):
         "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
     )
 
-    mock_result = mocker.create_autospec(Result, success=success)
+    mock_result = mocker.create_autospec(
+        Result,
+        success=success,
+        timestamp=datetime.datetime.now(tz=datetime.timezone.utc),
+    )
     mocker.patch(
-        "anycastd.healthcheck._cabourotte.main.get_result", return_value=mock_result
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=mock_result,
     )
 
     assert await healthcheck._get_status() == success
@@ -116,7 +140,7 @@ async def test_get_status_logs_error_if_check_does_not_exist(mocker: MockerFixtu
     )
     exc = CabourotteCheckNotFoundError("test", "https://example.com")
     mocker.patch(
-        "anycastd.healthcheck._cabourotte.main.get_result",
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
         side_effect=exc,
     )
 
@@ -136,10 +160,285 @@ async def test_get_status_returns_false_if_check_does_not_exist(mocker: MockerFi
     healthcheck = CabourotteHealthcheck(
         "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
     )
-    mocker.patch("anycastd.healthcheck._cabourotte.main.get_result", return_value=True)
     mocker.patch(
-        "anycastd.healthcheck._cabourotte.main.get_result",
+        "anycastd.healthcheck._cabourotte.main.get_batched_result", return_value=True
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
         side_effect=CabourotteCheckNotFoundError("test", "https://example.com"),
     )
 
     assert await healthcheck._get_status() is False
+
+
+async def test_get_status_fails_fast_while_circuit_is_open(mocker: MockerFixture):
+    """An open circuit results in an unhealthy status without logging an error."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        side_effect=CabourotteCircuitOpenError("test", "https://example.com"),
+    )
+
+    with capture_logs() as logs:
+        healthy = await healthcheck._get_status()
+
+    assert healthy is False
+    assert all(log["log_level"] == "debug" for log in logs)
+
+
+def _result(*, success: bool, timestamp: int, duration: int = 1) -> Result:
+    """Create a result of the test check at the given unix timestamp."""
+    return Result.model_validate(
+        {
+            "name": "test",
+            "summary": "test",
+            "success": success,
+            "healthcheck-timestamp": timestamp,
+            "message": "test",
+            "duration": duration,
+            "source": "configuration",
+        }
+    )
+
+
+async def test_receive_updates_result_without_request(mocker: MockerFixture):
+    """A received result is returned without requesting the check result."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    mock_get_result = mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result"
+    )
+
+    healthcheck.receive(_result(success=True, timestamp=1))
+
+    assert await healthcheck.is_healthy() is True
+    assert healthcheck.next_due is not None
+    mock_get_result.assert_not_awaited()
+
+
+def test_receive_notifies_listeners_on_change():
+    """Receiving a result with a different status notifies listeners."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    notifications = []
+    healthcheck.subscribe(lambda: notifications.append(None))
+
+    healthcheck.receive(_result(success=True, timestamp=1))
+
+    assert len(notifications) == 1
+
+
+async def test_receive_discards_stale_result():
+    """Results older than the latest known result are discarded."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+
+    healthcheck.receive(_result(success=True, timestamp=2))
+    healthcheck.receive(_result(success=False, timestamp=1))
+
+    assert await healthcheck.is_healthy() is True
+
+
+def test_received_result_is_cached():
+    """A received result is available as cached status until the check is due."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    assert healthcheck.cached_status is None
+
+    healthcheck.receive(_result(success=False, timestamp=1))
+
+    assert healthcheck.cached_status is False
+
+
+async def test_result_requested_by_one_check_is_received_by_others(respx_mock):
+    """
+    Results requested by one check are received by all checks of the same
+    cabourotte API, which do not make requests of their own until their next
+    result is expected.
+    """
+    checks = [
+        CabourotteHealthcheck(
+            name, url="https://example.com", interval=datetime.timedelta(seconds=10)
+        )
+        for name in ("a", "b", "c")
+    ]
+    mock_endpoint = respx_mock.get("https://example.com/result")
+    mock_endpoint.return_value = httpx.Response(
+        status_code=200,
+        json=[
+            {
+                **_result(success=True, timestamp=_now()).model_dump(by_alias=True),
+                "name": check.name,
+                "healthcheck-timestamp": _now(),
+            }
+            for check in checks
+        ],
+    )
+
+    results = [await check.is_healthy() for check in checks]
+
+    assert results == [True, True, True]
+    assert mock_endpoint.call_count == 1
+    assert all(check.cached_status is True for check in checks)
+
+
+def _now() -> int:
+    """The current unix timestamp."""
+    return int(datetime.datetime.now(tz=datetime.UTC).timestamp())
+
+
+async def test_result_older_than_max_age_is_unhealthy(mocker: MockerFixture):
+    """A successful result older than the maximum age is unhealthy."""
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=10),
+        max_age=datetime.timedelta(seconds=30),
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now() - 60),
+    )
+
+    with capture_logs() as logs:
+        healthy = await healthcheck._get_status()
+
+    assert healthy is False
+    assert logs[-1]["log_level"] == "warning"
+
+
+@pytest.mark.parametrize("duration, expected", [(100, True), (900, False)])
+async def test_slow_result_is_unhealthy(
+    mocker: MockerFixture, duration: int, expected: bool
+):
+    """A successful result exceeding the maximum duration is unhealthy."""
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=10),
+        max_duration=datetime.timedelta(milliseconds=800),
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now(), duration=duration),
+    )
+
+    assert await healthcheck._get_status() is expected
+
+
+async def test_duration_of_polled_result_is_observed_once(mocker: MockerFixture):
+    """
+    The duration of a result that is requested repeatedly is only observed
+    once, so that a single slow result does not count as multiple ones.
+    """
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=1),
+        max_duration=datetime.timedelta(milliseconds=500),
+        duration_fall=3,
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now(), duration=800),
+    )
+
+    results = [await healthcheck._get_status() for _ in range(3)]
+
+    assert results == [True, None, None]
+
+
+async def test_polled_result_is_counted_once(mocker: MockerFixture):
+    """A result that is requested repeatedly counts towards the fall threshold once."""
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=10),
+        fall=2,
+    )
+    mock_get_result = mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now() - 1),
+    )
+    await healthcheck.refresh()
+    mock_get_result.return_value = _result(success=False, timestamp=_now())
+
+    results = [await healthcheck.refresh() for _ in range(3)]
+
+    assert results == [True, True, True]
+    assert (healthcheck.successes, healthcheck.failures) == (0, 1)
+
+
+async def test_polled_result_exceeding_max_age_is_counted(mocker: MockerFixture):
+    """A repeatedly requested result exceeding the maximum age is unhealthy."""
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=10),
+        max_age=datetime.timedelta(seconds=30),
+    )
+    healthcheck.receive(_result(success=True, timestamp=_now() - 60))
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now() - 60),
+    )
+
+    assert await healthcheck._get_status() is False
+
+
+async def test_next_request_when_next_result_expected(mocker: MockerFixture):
+    """The check is due once cabourotte produced its next result."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now() - 8),
+    )
+
+    await healthcheck.is_healthy()
+
+    # The result is expected 10 seconds after the last one, i.e. in 2 seconds.
+    assert 1 < healthcheck.next_due - time.monotonic() < 4  # noqa: PLR2004
+
+
+async def test_late_result_falls_back_to_interval(mocker: MockerFixture):
+    """A result older than the interval does not schedule an immediate request."""
+    healthcheck = CabourotteHealthcheck(
+        "test", url="https://example.com", interval=datetime.timedelta(seconds=10)
+    )
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result",
+        return_value=_result(success=True, timestamp=_now() - 30),
+    )
+
+    await healthcheck.is_healthy()
+
+    assert healthcheck.next_due == pytest.approx(time.monotonic() + 10, abs=1)
+
+
+async def test_get_status_times_out(mocker: MockerFixture):
+    """Requesting a result taking longer than the check timeout raises an error."""
+    healthcheck = CabourotteHealthcheck(
+        "test",
+        url="https://example.com",
+        interval=datetime.timedelta(seconds=10),
+        timeout=datetime.timedelta(milliseconds=10),
+    )
+
+    async def hangs(*args, **kwargs) -> Result:
+        await asyncio.sleep(60)
+        return _result(success=True, timestamp=1)
+
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.main.get_batched_result", side_effect=hangs
+    )
+
+    with pytest.raises(CabourotteCheckError, match="Timed out"):
+        await healthcheck._get_status()
@@ -0,0 +1,104 @@
+import datetime
+import json
+
+import httpx
+import pytest
+
+from anycastd.healthcheck._cabourotte.main import CabourotteHealthcheck
+from anycastd.healthcheck._cabourotte.receiver import ResultReceiver
+from anycastd.healthcheck._cabourotte.result import Result
+
+
+def example_result(name: str = "example-api") -> dict:
+    """Return an example result as pushed by the cabourotte HTTP exporter."""
+    return {
+        "name": name,
+        "summary": "HTTP healthcheck on ::1:8080",
+        "success": True,
+        "healthcheck-timestamp": 1695648161,
+        "message": "success",
+        "duration": 1,
+        "source": "configuration",
+    }
+
+
+@pytest.fixture
+def check() -> CabourotteHealthcheck:
+    return CabourotteHealthcheck(
+        "example-api",
+        url="http://127.0.0.1:9013",
+        interval=datetime.timedelta(seconds=10),
+    )
+
+
+@pytest.fixture
+async def receiver_url(check: CabourotteHealthcheck):
+    """The URL of a running receiver with the example check registered."""
+    receiver = ResultReceiver(port=0)
+    receiver.register(check)
+    server = await receiver.start()
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        yield f"http://127.0.0.1:{port}"
+
+
+def test_receive_updates_registered_checks(check: CabourotteHealthcheck):
+    """Received results are handed to all checks registered with the same name."""
+    receiver = ResultReceiver()
+    receiver.register(check)
+
+    received = receiver.receive(Result.model_validate(example_result()))
+
+    assert received is True
+    assert check._check.last_healthy is True
+
+
+def test_receive_unknown_check_ignored(check: CabourotteHealthcheck):
+    """Results of checks that have not been registered are ignored."""
+    receiver = ResultReceiver()
+    receiver.register(check)
+
+    received = receiver.receive(Result.model_validate(example_result("unknown")))
+
+    assert received is False
+    assert check._check.last_healthy is False
+
+
+def test_register_same_check_once(check: CabourotteHealthcheck):
+    """Registering the same check multiple times has no effect."""
+    receiver = ResultReceiver()
+
+    receiver.register(check)
+    receiver.register(check)
+
+    assert receiver._checks["example-api"] == [check]
+
+
+async def test_pushed_results_update_checks(
+    receiver_url: str, check: CabourotteHealthcheck
+):
+    """Results pushed over a persistent connection update the registered check."""
+    async with httpx.AsyncClient() as client:
+        for success in (True, False):
+            data = {**example_result(), "success": success}
+            data["healthcheck-timestamp"] += int(not success)
+            response = await client.post(receiver_url, content=json.dumps(data))
+
+            assert response.status_code == httpx.codes.NO_CONTENT
+            assert check._check.last_healthy is success
+
+
+async def test_invalid_result_rejected(receiver_url: str):
+    """Invalid results are rejected with a bad request status."""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(receiver_url, content=b'{"name": "a"}')
+
+    assert response.status_code == httpx.codes.BAD_REQUEST
+
+
+async def test_non_post_request_rejected(receiver_url: str):
+    """Requests other than POST are rejected."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(receiver_url)
+
+    assert response.status_code == httpx.codes.METHOD_NOT_ALLOWED
@@ -1,18 +1,27 @@
+import asyncio
 import datetime
 import json
 from typing import TypedDict
 
 import httpx
+import pydantic
 import pytest
 import respx
-from hypothesis import assume, given, strategies
-from pytest_mock import MockerFixture
+from hypothesis import assume, given, settings, strategies
 
 from anycastd.healthcheck._cabourotte.exceptions import (
     CabourotteCheckError,
     CabourotteCheckNotFoundError,
+    CabourotteCircuitOpenError,
+)
+from anycastd.healthcheck._cabourotte.result import (
+    LeanResult,
+    Result,
+    get_batched_result,
+    lean_results_from_json,
+    results_from_json,
+    subscribe_results,
 )
-from anycastd.healthcheck._cabourotte.result import Result, get_result
 
 CABOUROTTE_URL = "http://[::1]:9013"
 
@@ -70,78 +79,183 @@ def test_result_from_api_json(data: _ResultData):
     assert result.source == data["source"]
 
 
-class TestGetResult:
-    """Test getting a result from the cabourotte API."""
+def test_results_by_name_from_api_json_list():
+    """Results by name can be created from a JSON list returned by cabourotte."""
+    data = [example_result(), {**example_result(), "name": "other-api"}]
 
-    @respx.mock
-    @pytest.mark.parametrize(
-        "name,url",
-        [("example-http-check", CABOUROTTE_URL), ("example-dns-check", CABOUROTTE_URL)],
+    results = results_from_json(json.dumps(data))
+
+    assert results == {
+        "example-api": Result.model_validate(data[0]),
+        "other-api": Result.model_validate(data[1]),
+    }
+
+
+def test_lean_results_match_validated_results():
+    """Lean results contain the same values as fully validated results."""
+    data = [example_result(), {**example_result(), "name": "other-api"}]
+
+    results = lean_results_from_json(json.dumps(data))
+
+    assert results == {
+        name: LeanResult.from_result(result)
+        for name, result in results_from_json(json.dumps(data)).items()
+    }
+
+
+def test_lean_result_falls_back_to_validation():
+    """Results in a deviating format are decoded using full validation."""
+    data = {**example_result(), "healthcheck-timestamp": "2023-09-25T13:22:41Z"}
+
+    result = LeanResult.from_json(json.dumps(data))
+
+    assert result.timestamp == datetime.datetime(
+        2023, 9, 25, 13, 22, 41, tzinfo=datetime.UTC
     )
-    async def test_get_made_to_correct_url(
-        self, name: str, url: str, mocker: MockerFixture
-    ):
-        """A GET request is made to the correct URL."""
-        result_url = url + f"/result/{name}"
-        mock_endpoint = respx.get(result_url)
-        mocker.patch("anycastd.healthcheck._cabourotte.result.Result.from_json")
 
-        await get_result(name, url=url)
 
-        request = mock_endpoint.calls.last.request
-        assert request.method == "GET"
-        assert request.url == result_url
+@pytest.mark.parametrize(
+    "data", [b"not json", b"[{}]", json.dumps([{**example_result(), "success": 2}])]
+)
+def test_invalid_lean_results_raise_validation_error(data):
+    """Invalid results raise the validation error of the full result."""
+    with pytest.raises(pydantic.ValidationError):
+        lean_results_from_json(data)
 
-    async def test_correct_result_returned(self, respx_mock):
-        """The correct result corresponding to API data is returned."""
-        json_data = json.dumps(example_result())
-        name = "example-api"
-        result_url = CABOUROTTE_URL + f"/result/{name}"
 
-        mock_endpoint = respx_mock.get(result_url)
-        mock_response = httpx.Response(status_code=200, content=json_data.encode())
-        mock_endpoint.return_value = mock_response
+class _Recipient:
+    """A recipient of results, storing all results it received."""
 
-        result = await get_result(name, url=CABOUROTTE_URL)
+    def __init__(self) -> None:
+        self.received: list[LeanResult] = []
 
-        assert result == Result.from_json(json_data)
+    def receive(self, result: LeanResult) -> None:
+        """Store the result."""
+        self.received.append(result)
 
-    @respx.mock
-    async def test_404_status_code_error_raises_check_not_found(self):
-        """A 404 status code error raises a CabourotteCheckNotFoundError."""
-        name = "example-api"
-        result_url = CABOUROTTE_URL + f"/result/{name}"
 
-        mock_response = httpx.Response(status_code=httpx.codes.NOT_FOUND)
-        respx.get(result_url).return_value = mock_response
+class TestGetBatchedResult:
+    """Test getting a result from the cabourotte API as part of a bulk request."""
+
+    async def test_concurrent_requests_share_single_request(self, respx_mock):
+        """Concurrent requests for results are made using a single request."""
+        data = [example_result(), {**example_result(), "name": "other-api"}]
+        mock_endpoint = respx_mock.get(CABOUROTTE_URL + "/result")
+        mock_endpoint.return_value = httpx.Response(status_code=200, json=data)
+
+        results = await asyncio.gather(
+            get_batched_result("example-api", url=CABOUROTTE_URL),
+            get_batched_result("other-api", url=CABOUROTTE_URL),
+        )
+
+        assert mock_endpoint.call_count == 1
+        assert [result.name for result in results] == ["example-api", "other-api"]
+
+    async def test_sequential_requests_not_shared(self, respx_mock):
+        """Requests made after a bulk request finished result in a new request."""
+        mock_endpoint = respx_mock.get(CABOUROTTE_URL + "/result")
+        mock_endpoint.return_value = httpx.Response(
+            status_code=200, json=[example_result()]
+        )
+
+        await get_batched_result("example-api", url=CABOUROTTE_URL)
+        await get_batched_result("example-api", url=CABOUROTTE_URL)
+
+        assert mock_endpoint.call_count == 2  # noqa: PLR2004
+
+    async def test_requests_take_tokens(self, mocker, respx_mock):
+        """Each request takes a token, regardless of the results it is shared by."""
+        mock_acquire = mocker.patch(
+            "anycastd.healthcheck._cabourotte.result.request_budget.acquire"
+        )
+        respx_mock.get(CABOUROTTE_URL + "/result").return_value = httpx.Response(
+            status_code=200,
+            json=[example_result(), {**example_result(), "name": "other-api"}],
+        )
+
+        await asyncio.gather(
+            get_batched_result("example-api", url=CABOUROTTE_URL),
+            get_batched_result("other-api", url=CABOUROTTE_URL),
+        )
+        await get_batched_result("example-api", url=CABOUROTTE_URL)
+
+        assert mock_acquire.await_count == 2  # noqa: PLR2004
+
+    async def test_results_handed_to_subscribed_recipients(self, respx_mock):
+        """The results of every request are handed to all subscribed recipients."""
+        respx_mock.get(CABOUROTTE_URL + "/result").return_value = httpx.Response(
+            status_code=200,
+            json=[example_result(), {**example_result(), "name": "other-api"}],
+        )
+        recipient = _Recipient()
+        subscribe_results("other-api", recipient.receive, url=CABOUROTTE_URL)
+
+        await get_batched_result("example-api", url=CABOUROTTE_URL)
+
+        assert [result.name for result in recipient.received] == ["other-api"]
+
+    async def test_missing_result_raises_check_not_found(self, respx_mock):
+        """A result missing from the bulk response raises a not found error."""
+        respx_mock.get(CABOUROTTE_URL + "/result").return_value = httpx.Response(
+            status_code=200, json=[example_result()]
+        )
+
+        with pytest.raises(CabourotteCheckNotFoundError):
+            await get_batched_result("missing-api", url=CABOUROTTE_URL)
+
+    async def test_request_error_raises_cabourotte_check_error(self, respx_mock):
+        """Request errors raise a CabourotteCheckError for each requested check."""
+        respx_mock.get(CABOUROTTE_URL + "/result").side_effect = httpx.ConnectError
 
         with pytest.raises(
-            CabourotteCheckNotFoundError,
-            match=f'An error occurred while requesting the check result for "{name}": '
-            "The check could not be found.",
+            CabourotteCheckError,
+            match='An error occurred while requesting the check result for "a".*',
         ):
-            await get_result(name, url=CABOUROTTE_URL)
+            await get_batched_result("a", url=CABOUROTTE_URL)
+
+    async def test_unreachable_api_fails_fast(self, respx_mock):
+        """Once the circuit opens, results fail fast without making a request."""
+        mock_endpoint = respx_mock.get(CABOUROTTE_URL + "/result")
+        mock_endpoint.side_effect = httpx.ConnectError
+
+        for _ in range(3):
+            with pytest.raises(CabourotteCheckError):
+                await get_batched_result("a", url=CABOUROTTE_URL)
+        with pytest.raises(CabourotteCircuitOpenError):
+            await get_batched_result("a", url=CABOUROTTE_URL)
+
+        assert mock_endpoint.call_count == 3  # noqa: PLR2004
+
+    async def test_status_errors_do_not_open_circuit(self, respx_mock):
+        """Error responses show the API is reachable and keep the circuit closed."""
+        mock_endpoint = respx_mock.get(CABOUROTTE_URL + "/result")
+        mock_endpoint.return_value = httpx.Response(status_code=500)
+
+        for _ in range(4):
+            with pytest.raises(CabourotteCheckError) as exc_info:
+                await get_batched_result("a", url=CABOUROTTE_URL)
+            assert not isinstance(exc_info.value, CabourotteCircuitOpenError)
+
+        assert mock_endpoint.call_count == 4  # noqa: PLR2004
 
     @respx.mock
+    @settings(deadline=None)  # The first request also creates the HTTP client.
     @given(http_error_code())
-    async def test_other_status_code_error_raises_cabourotte_check_error(
+    async def test_status_code_error_raises_cabourotte_check_error(
         self, status_code: httpx.codes
     ):
-        """Any other status code error raises a CabourotteCheckError."""
-        assume(status_code != httpx.codes.NOT_FOUND)
+        """Any status code error raises a CabourotteCheckError."""
         name = "example-api"
-        result_url = CABOUROTTE_URL + f"/result/{name}"
-
-        mock_response = httpx.Response(status_code=status_code)
-        respx.get(result_url).return_value = mock_response
+        respx.get(CABOUROTTE_URL + "/result").return_value = httpx.Response(
+            status_code=status_code
+        )
 
         with pytest.raises(
             CabourotteCheckError,
             match=rf'An error occurred while requesting the check result for "{name}": .*',  # noqa: E501
         ):
-            await get_result(name, url=CABOUROTTE_URL)
+            await get_batched_result(name, url=CABOUROTTE_URL)
 
-    @respx.mock
     @pytest.mark.parametrize(
         "side_effect",
         [
@@ -166,16 +280,14 @@ class TestGetResult:
         ],
     )
     async def test_other_request_error_raises_cabourotte_check_error(
-        self, side_effect: Exception
+        self, respx_mock, side_effect: Exception
     ):
         """Any other request error raises a CabourotteCheckError."""
         name = "example-api"
-        result_url = CABOUROTTE_URL + f"/result/{name}"
-
-        respx.get(result_url).side_effect = side_effect
+        respx_mock.get(CABOUROTTE_URL + "/result").side_effect = side_effect
 
         with pytest.raises(
             CabourotteCheckError,
             match=rf'An error occurred while requesting the check result for "{name}":.*',  # noqa: E501
         ):
-            await get_result(name, url=CABOUROTTE_URL)
+            await get_batched_result(name, url=CABOUROTTE_URL)
@@ -1,9 +1,17 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+import time
+from datetime import timedelta
 from unittest.mock import AsyncMock
 
 import pytest
+from structlog.testing import capture_logs
 
-from anycastd.healthcheck._common import interval_check
+from anycastd.healthcheck._common import (
+    Spread,
+    TokenBucket,
+    interval_check,
+    spread,
+)
 
 
 class TestIntervalCheck:
@@ -46,24 +54,12 @@ class TestIntervalCheck:
         )
         await checker()  # Will always await the check on the first time
 
-        datetime_interval_passed = datetime.now(timezone.utc) + timedelta(
-            seconds=interval
+        monotonic_interval_passed = time.monotonic() + interval
+        mocker.patch(
+            "anycastd.healthcheck._common.time.monotonic",
+            return_value=monotonic_interval_passed,
         )
 
-        class FakeDatetime(datetime):
-            """Test wrapper for datetime.datetime.
-            Required since datetime.datetime cannot be mocked directly.
-            """
-
-            def __new__(cls, *args, **kwargs):
-                return datetime.__new__(datetime, *args, **kwargs)
-
-            @classmethod
-            def now(cls, tz=None):
-                return datetime_interval_passed
-
-        mocker.patch("anycastd.healthcheck._common.datetime", FakeDatetime)
-
         second_await_result = await checker()
 
         assert internal_check.await_count == expected_await_count
@@ -87,3 +83,283 @@ class TestIntervalCheck:
 
         internal_check.assert_awaited_once()
         assert second_await_result == check_result
+
+    async def test_listeners_notified_when_result_changes(self, mocker):
+        """Subscribed listeners are called when the result changes."""
+        internal_check = mocker.AsyncMock(return_value=True)
+        listener = mocker.Mock()
+        checker = interval_check(timedelta(seconds=0), internal_check)
+        checker.subscribe(listener)
+
+        await checker()
+        await checker()
+
+        listener.assert_called_once_with()
+
+    def test_due_listeners_notified_on_update(self, mocker):
+        """Due listeners are called when a result may move the next due time."""
+        listener = mocker.Mock()
+        checker = interval_check(timedelta(seconds=5), mocker.AsyncMock())
+        checker.subscribe_due(listener)
+
+        checker.update(healthy=True)
+
+        listener.assert_called_once_with()
+
+    async def test_next_due_after_interval(self, mocker):
+        """The check is due again once the interval has passed."""
+        interval = timedelta(seconds=5)
+        checker = interval_check(interval, mocker.AsyncMock(return_value=True))
+        assert checker.next_due is None
+
+        await checker()
+
+        assert checker.next_due == checker.last_checked + interval.total_seconds()
+
+    async def test_concurrent_refreshes_share_evaluation(self, mocker):
+        """Concurrent refreshes share a single evaluation of the check."""
+        internal_check = mocker.AsyncMock(return_value=True)
+        checker = interval_check(timedelta(seconds=5), internal_check)
+
+        results = await asyncio.gather(checker.refresh(), checker.refresh())
+
+        internal_check.assert_awaited_once()
+        assert results == [True, True]
+
+    async def test_failed_evaluation_is_not_due_until_interval_passed(self, mocker):
+        """
+        A check raising an exception is considered unhealthy and is not due
+        again until the interval has passed.
+        """
+        internal_check = mocker.AsyncMock(side_effect=RuntimeError)
+        checker = interval_check(timedelta(seconds=5), internal_check)
+
+        with pytest.raises(RuntimeError):
+            await checker()
+        second_await_result = await checker()
+
+        internal_check.assert_awaited_once()
+        assert second_await_result is False
+
+    @staticmethod
+    async def _evaluate_results(checker, results: list[bool | None]) -> list[bool]:
+        """Evaluate a checker once for each of the given internal results."""
+        returned = []
+        for result in results:
+            checker._check.return_value = result
+            returned.append(await checker.refresh())
+        return returned
+
+    async def test_first_result_is_adopted_immediately(self, mocker):
+        """The first result determines the initial result, regardless of thresholds."""
+        checker = interval_check(
+            timedelta(seconds=5), mocker.AsyncMock(), rise=3, fall=3
+        )
+
+        assert await self._evaluate_results(checker, [True]) == [True]
+
+    async def test_fall_threshold(self, mocker):
+        """The result only becomes unhealthy after enough consecutive failures."""
+        checker = interval_check(timedelta(seconds=5), mocker.AsyncMock(), fall=3)
+
+        results = await self._evaluate_results(
+            checker, [True, False, False, True, False, False, False]
+        )
+
+        assert results == [True, True, True, True, True, True, False]
+        assert checker.failures == 3  # noqa: PLR2004
+
+    async def test_rise_threshold(self, mocker):
+        """The result only becomes healthy after enough consecutive successes."""
+        checker = interval_check(timedelta(seconds=5), mocker.AsyncMock(), rise=2)
+
+        results = await self._evaluate_results(
+            checker, [False, True, False, True, True]
+        )
+
+        assert results == [False, False, False, False, True]
+        assert checker.successes == 2  # noqa: PLR2004
+
+    async def test_evaluations_without_new_result_are_not_counted(self, mocker):
+        """Evaluations not producing a new result do not count towards thresholds."""
+        checker = interval_check(timedelta(seconds=5), mocker.AsyncMock(), fall=2)
+
+        results = await self._evaluate_results(checker, [True, False, None, None])
+
+        assert results == [True, True, True, True]
+        assert checker.failures == 1
+        assert checker.next_due == pytest.approx(time.monotonic() + 5, abs=1)
+
+    async def test_results_held_by_threshold_are_logged(self, mocker):
+        """Results held back by a threshold are logged with the consecutive counts."""
+        checker = interval_check(
+            timedelta(seconds=5), mocker.AsyncMock(), fall=3, key="check"
+        )
+        await self._evaluate_results(checker, [True])
+
+        with capture_logs() as logs:
+            await self._evaluate_results(checker, [False])
+
+        assert logs[0]["event"] == (
+            "Check evaluated unhealthy, 1 of 3 consecutive results until unhealthy."
+        )
+        assert (logs[0]["check"], logs[0]["failures"]) == ("check", 1)
+
+    async def test_exception_below_fall_threshold_keeps_result(self, mocker):
+        """A failed evaluation does not raise until the fall threshold is reached."""
+        internal_check = mocker.AsyncMock(return_value=True)
+        checker = interval_check(timedelta(seconds=5), internal_check, fall=2)
+        await checker.refresh()
+        internal_check.side_effect = RuntimeError
+
+        assert await checker.refresh() is True
+        with pytest.raises(RuntimeError):
+            await checker.refresh()
+
+    def test_invalid_thresholds_raise(self, mocker):
+        """Thresholds must be at least one."""
+        with pytest.raises(ValueError, match="at least one"):
+            interval_check(timedelta(seconds=5), mocker.AsyncMock(), rise=0)
+
+    async def test_cached_result_only_while_not_due(self, mocker):
+        """The cached result is only available while the check is not due."""
+        checker = interval_check(
+            timedelta(seconds=5), mocker.AsyncMock(return_value=True)
+        )
+        assert checker.cached is None
+
+        await checker()
+        assert checker.cached is True
+
+        mocker.patch("time.monotonic", return_value=checker.next_due)
+        assert checker.cached is None
+
+    async def test_adaptive_interval_backs_off_while_stable(self, mocker):
+        """The interval doubles while healthy, up to the maximum interval."""
+        checker = interval_check(
+            timedelta(seconds=5),
+            mocker.AsyncMock(),
+            max_interval=timedelta(seconds=15),
+        )
+
+        intervals = []
+        for _ in range(4):
+            checker.update(healthy=True)
+            intervals.append(checker.current_interval.total_seconds())
+
+        assert intervals == [5, 10, 15, 15]
+        assert checker.next_due == checker.last_checked + 15
+
+    @pytest.mark.parametrize(
+        "results", [[True, True, True, False], [True, True, False, True]]
+    )
+    async def test_adaptive_interval_snaps_back(self, mocker, results: list[bool]):
+        """The interval snaps back on a failure and after a change of the result."""
+        checker = interval_check(
+            timedelta(seconds=5),
+            mocker.AsyncMock(),
+            max_interval=timedelta(seconds=60),
+        )
+
+        for healthy in results:
+            checker.update(healthy=healthy)
+
+        assert checker.current_interval == timedelta(seconds=5)
+
+    def test_max_interval_below_interval_raises(self, mocker):
+        """The maximum interval must not be below the interval."""
+        with pytest.raises(ValueError, match="maximum interval"):
+            interval_check(
+                timedelta(seconds=5),
+                mocker.AsyncMock(),
+                max_interval=timedelta(seconds=1),
+            )
+
+    async def test_staggered_checks_due_at_phase_offset(self, mocker):
+        """Staggered checks with the same interval are due at different times."""
+        mocker.patch.object(spread, "stagger", new=True)
+        checkers = [
+            interval_check(
+                timedelta(seconds=10), mocker.AsyncMock(return_value=True), key=key
+            )
+            for key in ("a", "b")
+        ]
+
+        for checker in checkers:
+            await checker()
+
+        assert checkers[0].next_due != checkers[1].next_due
+        for checker in checkers:
+            assert 5 <= checker.next_due - checker.last_checked <= 15  # noqa: PLR2004
+
+    async def test_expected_result_overrides_stagger(self, mocker):
+        """Staggered checks expecting a result are due once it can exist."""
+        mocker.patch.object(spread, "stagger", new=True)
+        checker = interval_check(
+            timedelta(seconds=10), mocker.AsyncMock(return_value=True), key="a"
+        )
+        await checker()
+
+        checker.expect_result(time.monotonic() + 1)
+
+        assert checker.next_due == pytest.approx(time.monotonic() + 1, abs=0.5)
+
+
+class TestSpread:
+    """Test spreading evaluations across their interval."""
+
+    def test_not_staggered_by_default(self):
+        """Checks are due once the interval passed without staggering."""
+        assert Spread().due("a", 100.0, 10.0) == 110.0  # noqa: PLR2004
+
+    def test_staggered_due_times_stay_on_phase(self):
+        """Once staggered, checks are due exactly one interval apart."""
+        staggered = Spread(stagger=True)
+
+        first = staggered.due("a", 100.0, 10.0)
+        second = staggered.due("a", first, 10.0)
+
+        assert 105 <= first < 115  # noqa: PLR2004
+        assert second == pytest.approx(first + 10)
+
+    def test_phase_deterministic_per_key(self):
+        """The phase offset of a key is the same across instances."""
+        assert Spread(stagger=True).due("a", 0, 10) == Spread(stagger=True).due(
+            "a", 0, 10
+        )
+
+    def test_delay_within_jitter(self):
+        """Delays are within the configured fraction of the interval."""
+        jittered = Spread(jitter=0.1)
+
+        delays = [jittered.delay(10.0) for _ in range(100)]
+
+        assert all(0 <= delay <= 1 for delay in delays)
+        assert Spread().delay(10.0) == 0
+
+    def test_invalid_jitter_raises(self):
+        """Jitter above half the interval raises a ValueError."""
+        with pytest.raises(ValueError, match="Jitter"):
+            Spread().configure(stagger=True, jitter=0.6)
+
+
+class TestTokenBucket:
+    """Test capping the rate of health check requests."""
+
+    async def test_unlimited_by_default(self):
+        """Tokens are acquired immediately without a rate."""
+        bucket = TokenBucket()
+
+        async with asyncio.timeout(0.1):
+            await asyncio.gather(*(bucket.acquire() for _ in range(100)))
+
+    async def test_rate_limits_acquisitions(self):
+        """Acquisitions beyond the burst wait for tokens to be refilled."""
+        bucket = TokenBucket()
+        bucket.configure(rate=50, burst=2)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+        # Two tokens are available at once, three are refilled at 50 per second.
+        assert time.monotonic() - start >= 0.05  # noqa: PLR2004
@@ -11,6 +11,9 @@ import stamina
 from testcontainers.core.container import DockerContainer
 
 from anycastd.prefix import VRF
+from anycastd.prefix._frrouting.gate import gates
+from anycastd.prefix._frrouting.main import _gated, _local_asns, _provisioned
+from anycastd.prefix._frrouting.snapshot import snapshots
 from tests.conftest import _IP_Prefix
 
 FRR_DOCKER_IMAGE = "quay.io/frrouting/frr:{}".format(
@@ -135,6 +138,17 @@ def wait_for_frr_daemons(vtysh) -> None:
             )
 
 
+@pytest.fixture(autouse=True)
+def clear_shared_state():
+    """Clear state shared by all prefixes after each test."""
+    yield
+    _local_asns.clear()
+    _provisioned.clear()
+    _gated.clear()
+    gates.clear()
+    snapshots.clear()
+
+
 @pytest.fixture(scope="module")
 def frr_container_name() -> str:
     return "frrouting-integration-tests"
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from anycastd.prefix._frrouting.coalescing import CommandCoalescer
+
+CONTEXT = "address-family ipv6 unicast"
+
+
+class FakeRunner:
+    """Records commands it has run, failing for commands containing "fail"."""
+
+    def __init__(self) -> None:
+        self.runs: list[tuple[str, ...]] = []
+
+    async def __call__(self, *commands: str) -> str:
+        self.runs.append(commands)
+        if any("fail" in command for command in commands):
+            raise RuntimeError(f"Failed to run {commands}")
+        return ""
+
+
+async def test_commands_within_window_run_as_single_batch():
+    """Commands with the same key and context are run in a single batch."""
+    coalescer = CommandCoalescer()
+    run = FakeRunner()
+
+    await asyncio.gather(
+        coalescer.submit("vrf", run, CONTEXT, "network 2001:db8::/48"),
+        coalescer.submit("vrf", run, CONTEXT, "network 2001:db8:1::/48"),
+    )
+
+    assert run.runs == [
+        (CONTEXT, "network 2001:db8::/48", "network 2001:db8:1::/48"),
+    ]
+
+
+async def test_commands_with_different_keys_run_separately():
+    """Commands with a different key are run in separate batches."""
+    coalescer = CommandCoalescer()
+    run = FakeRunner()
+
+    await asyncio.gather(
+        coalescer.submit("vrf a", run, CONTEXT, "network 2001:db8::/48"),
+        coalescer.submit("vrf b", run, CONTEXT, "network 2001:db8:1::/48"),
+        coalescer.submit("vrf a", run, "address-family ipv4", "network 192.0.2.0/24"),
+    )
+
+    assert len(run.runs) == 3  # noqa: PLR2004
+
+
+async def test_failed_batch_reports_failures_per_command():
+    """If a batch fails, only submissions of failing commands raise."""
+    coalescer = CommandCoalescer()
+    run = FakeRunner()
+
+    results = await asyncio.gather(
+        coalescer.submit("vrf", run, CONTEXT, "network 2001:db8::/48"),
+        coalescer.submit("vrf", run, CONTEXT, "network fail"),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], RuntimeError)
+    assert (CONTEXT, "network 2001:db8::/48") in run.runs
+
+
+async def test_single_failing_command_not_run_again():
+    """A failing batch consisting of a single command is not run again."""
+    coalescer = CommandCoalescer()
+    run = FakeRunner()
+
+    with pytest.raises(RuntimeError):
+        await coalescer.submit("vrf", run, CONTEXT, "network fail")
+
+    assert run.runs == [(CONTEXT, "network fail")]
+
+
+async def test_cancelled_submission_not_run():
+    """Commands whose submission was cancelled before the batch ran are skipped."""
+    coalescer = CommandCoalescer(window=0.05)
+    run = FakeRunner()
+
+    cancelled = asyncio.create_task(
+        coalescer.submit("vrf", run, CONTEXT, "network 2001:db8::/48")
+    )
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await coalescer.submit("vrf", run, CONTEXT, "network 2001:db8:1::/48")
+
+    assert run.runs == [(CONTEXT, "network 2001:db8:1::/48")]
@@ -1,12 +1,22 @@
 import asyncio
+import json
 from ipaddress import IPv6Network
 from pathlib import Path
+from unittest.mock import AsyncMock
 
+import pytest
 from structlog.testing import capture_logs
 
 from anycastd._executor import LocalExecutor
-from anycastd.prefix._frrouting.exceptions import FRRCommandError
+from anycastd.prefix._frrouting.exceptions import (
+    FRRCommandError,
+    FRRInvalidVRFError,
+    FRRInvalidVTYSocketError,
+    FRRNoBGPError,
+)
 from anycastd.prefix._frrouting.main import FRRoutingPrefix
+from anycastd.prefix._frrouting.vty import VtySocketSession
+from anycastd.prefix._frrouting.vtysh import VtyshSession
 
 
 def test_repr(example_networks, example_vrfs):
@@ -21,7 +31,7 @@ def test_repr(example_networks, example_vrfs):
     )
     assert repr(prefix) == (
         f"FRRoutingPrefix(prefix={example_networks!r}, vrf={example_vrfs!r}, "
-        f"vtysh={vtysh!r}, executor={executor!r})"
+        f"vtysh={vtysh!r}, vty_socket=None, route_map=None, executor={executor!r})"
     )
 
 
@@ -73,28 +83,26 @@ async def test_denouncing_non_announced_logs_warning(mocker):
 async def test_running_vtysh_commands_creates_debug_log(mocker):
     """
     Running vtysh commands creates a debug log containing the commands that were run
-    and the result of the vtysh subprocess used to run them.
+    and the result of the vtysh session used to run them.
     """
     commands = ["show", "ip", "bgp", "detail"]
-    proc_pid = 42
-    proc_returncode = 0
-    proc_stdout = b"example stdout"
-    proc_stderr = b""
-
-    mock_proc = mocker.create_autospec(asyncio.subprocess.Process)
-    mock_proc.pid = proc_pid
-    mock_proc.returncode = proc_returncode
-    mock_proc.communicate.return_value = (proc_stdout, proc_stderr)
-
-    mock_executor = mocker.create_autospec(LocalExecutor)
-    mock_executor.create_subprocess_exec.return_value = mock_proc
+    session_pid = 42
+    session_stdout = "example stdout"
+    session_stderr = ""
+
+    mock_session = mocker.create_autospec(VtyshSession, instance=True)
+    mock_session.pid = session_pid
+    mock_session.run.return_value = (session_stdout, session_stderr)
+    mock_pool = mocker.patch("anycastd.prefix._frrouting.main.vtysh_session_pool")
+    mock_pool.get.return_value = mock_session
     prefix = FRRoutingPrefix(
-        prefix=IPv6Network("2001:db8::/32"), executor=mock_executor
+        prefix=IPv6Network("2001:db8::/32"), executor=LocalExecutor()
     )
 
     with capture_logs() as logs:
         await prefix._run_vtysh_commands(*commands)
 
+    mock_pool.get.assert_called_once_with(prefix.executor, prefix.vtysh)
     assert logs[0]["event"] == "Ran vtysh commands."
     assert logs[0]["log_level"] == "debug"
     assert logs[0]["prefix"] == str(prefix.prefix)
@@ -102,7 +110,417 @@ async def test_running_vtysh_commands_creates_debug_log(mocker):
     assert logs[0]["prefix_vrf"] == prefix.vrf
     assert logs[0]["vtysh_path"] == str(prefix.vtysh)
     assert logs[0]["vtysh_commands"] == commands
-    assert logs[0]["vtysh_pid"] == proc_pid
-    assert logs[0]["vtysh_returncode"] == proc_returncode
-    assert logs[0]["vtysh_stdout"] == proc_stdout.decode("utf-8")
+    assert logs[0]["vtysh_pid"] == session_pid
+    assert logs[0]["vtysh_stdout"] == session_stdout
     assert logs[0]["vtysh_stderr"] is None
+
+
+async def test_vty_socket_used_instead_of_vtysh(mocker):
+    """Commands are sent through the VTY socket if one is configured."""
+    mock_session = mocker.create_autospec(VtySocketSession, instance=True)
+    mock_session.run.return_value = ("example stdout", "")
+    mock_vty_pool = mocker.patch("anycastd.prefix._frrouting.main.vty_session_pool")
+    mock_vty_pool.get.return_value = mock_session
+    mock_vtysh_pool = mocker.patch("anycastd.prefix._frrouting.main.vtysh_session_pool")
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"),
+        vty_socket=Path("/var/run/frr/bgpd.vty"),
+        executor=LocalExecutor(),
+    )
+
+    assert await prefix._run_vtysh_commands("show bgp") == "example stdout"
+    mock_vty_pool.get.assert_called_once_with(Path("/var/run/frr/bgpd.vty"))
+    mock_vtysh_pool.get.assert_not_called()
+
+
+async def test_validate_non_socket_vty_socket_raises(tmp_path):
+    """Validating a prefix with a VTY socket that is not a socket raises."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"),
+        vty_socket=tmp_path / "bgpd.vty",
+        executor=LocalExecutor(),
+    )
+
+    with pytest.raises(FRRInvalidVTYSocketError):
+        await prefix.validate()
+
+
+@pytest.mark.parametrize(
+    ("vrf", "stdout", "error"),
+    [
+        (None, "% BGP instance not found\n", FRRNoBGPError),
+        ("42", "% View/Vrf 42 is unknown\n", FRRInvalidVRFError),
+    ],
+)
+async def test_validate_translates_missing_bgp_errors(
+    mocker, tmp_path: Path, vrf, stdout: str, error: type[Exception]
+):
+    """Errors reporting a missing VRF or BGP instance raise configuration errors."""
+    vtysh = tmp_path / "vtysh"
+    vtysh.touch()
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"),
+        vrf=vrf,
+        vtysh=vtysh,
+        executor=LocalExecutor(),
+    )
+    mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        side_effect=FRRCommandError(["show bgp"], None, stdout=stdout, stderr=None),
+    )
+
+    with pytest.raises(error):
+        await prefix.validate()
+
+
+async def test_validate_raises_other_command_errors(mocker, tmp_path: Path):
+    """Errors other than a missing VRF or BGP instance are raised as they are."""
+    vtysh = tmp_path / "vtysh"
+    vtysh.touch()
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), vtysh=vtysh, executor=LocalExecutor()
+    )
+    mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        side_effect=FRRCommandError(
+            ["show bgp"], None, stdout="% Unknown command\n", stderr=None
+        ),
+    )
+
+    with pytest.raises(FRRCommandError):
+        await prefix.validate()
+
+
+def _bgp_summary(asn: int) -> str:
+    """The output of show bgp summary json for a given local ASN."""
+    return json.dumps({"ipv6Unicast": {"routerId": "192.0.2.1", "as": asn}})
+
+
+async def test_local_asn_shared_by_prefixes_in_vrf(mocker):
+    """The local ASN is only resolved once for all prefixes in the same VRF."""
+    mock_run = mocker.AsyncMock(return_value=_bgp_summary(65536))
+    prefixes = [
+        FRRoutingPrefix(prefix=IPv6Network(network), vrf="42", executor=LocalExecutor())
+        for network in ("2001:db8::/48", "2001:db8:1::/48")
+    ]
+    for prefix in prefixes:
+        mocker.patch.object(prefix, "_run_vtysh_commands", mock_run)
+
+    asns = [await prefix._get_local_asn() for prefix in prefixes]
+
+    assert asns == [65536, 65536]
+    mock_run.assert_awaited_once_with("show bgp vrf 42 summary json")
+
+
+async def test_local_asn_taken_from_details_without_neighbors(mocker):
+    """The local ASN is taken from the BGP details if the summary is empty."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), executor=LocalExecutor()
+    )
+    mock_run = mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        side_effect=["{}", json.dumps({"localAS": 65536})],
+    )
+
+    assert await prefix._get_local_asn() == 65536  # noqa: PLR2004
+    assert mock_run.await_args_list[-1].args == ("show bgp detail json",)
+
+
+async def test_local_asn_warning_raises(mocker):
+    """A warning instead of the BGP summary raises a RuntimeError."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), vrf="42", executor=LocalExecutor()
+    )
+    mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        return_value=json.dumps({"warning": "BGP instance not found"}),
+    )
+
+    with pytest.raises(RuntimeError, match="BGP instance not found"):
+        await prefix._get_local_asn()
+
+
+async def test_local_asn_resolved_per_vrf(mocker):
+    """The local ASN is resolved separately for each VRF."""
+    mock_run = mocker.AsyncMock(return_value=_bgp_summary(65536))
+    for vrf in ("42", "43"):
+        prefix = FRRoutingPrefix(
+            prefix=IPv6Network("2001:db8::/32"), vrf=vrf, executor=LocalExecutor()
+        )
+        mocker.patch.object(prefix, "_run_vtysh_commands", mock_run)
+        await prefix._get_local_asn()
+
+    assert mock_run.await_count == 2  # noqa: PLR2004
+
+
+async def test_outdated_local_asn_resolved_again(mocker):
+    """Commands are retried using a newly resolved ASN if it is outdated."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), executor=LocalExecutor()
+    )
+    mismatch = FRRCommandError(
+        ["router bgp 65536"],
+        None,
+        stdout="% BGP is already running; AS is 65537",
+        stderr=None,
+    )
+    mock_run = mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        side_effect=[_bgp_summary(65536), mismatch, _bgp_summary(65537), ""],
+    )
+
+    await prefix.announce()
+
+    assert mock_run.await_args_list[-1].args == (
+        "configure terminal",
+        "router bgp 65537",
+        "address-family ipv6 unicast",
+        "network 2001:db8::/32",
+    )
+    assert await prefix._get_local_asn() == 65537  # noqa: PLR2004
+
+
+async def test_other_errors_not_retried(mocker):
+    """Errors unrelated to the local ASN are raised without retrying."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), executor=LocalExecutor()
+    )
+    exc = FRRCommandError(["network"], None, stdout="% Unknown command", stderr=None)
+    mock_run = mocker.patch.object(
+        prefix, "_run_vtysh_commands", side_effect=[_bgp_summary(65536), exc]
+    )
+
+    with pytest.raises(FRRCommandError):
+        await prefix.announce()
+
+    assert mock_run.await_count == 2  # noqa: PLR2004
+
+
+async def test_local_asn_resolved_again_after_failure(mocker):
+    """
+    After commands failed, the local ASN is resolved again before running the
+    next ones, failing instead of creating a BGP instance that no longer exists.
+    """
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), vrf="42", executor=LocalExecutor()
+    )
+    exc = FRRCommandError(["network"], None, stdout="% Unknown command", stderr=None)
+    mock_run = mocker.patch.object(
+        prefix,
+        "_run_vtysh_commands",
+        side_effect=[_bgp_summary(65536), exc, "{}", "{}"],
+    )
+    with pytest.raises(FRRCommandError):
+        await prefix.announce()
+
+    with pytest.raises(RuntimeError, match="No BGP instance vrf 42"):
+        await prefix.announce()
+
+    assert not any(
+        "router bgp" in command
+        for call in mock_run.await_args_list[2:]
+        for command in call.args
+    )
+
+
+async def test_local_asn_resolved_again_once_session_replaced(mocker):
+    """The local ASN is resolved again once the session to FRRouting was replaced."""
+    prefix = FRRoutingPrefix(
+        prefix=IPv6Network("2001:db8::/32"), executor=LocalExecutor()
+    )
+    mock_run = mocker.patch.object(
+        prefix, "_run_vtysh_commands", return_value=_bgp_summary(65536)
+    )
+    await prefix._get_local_asn()
+    await prefix._get_local_asn()
+    assert mock_run.await_count == 1
+
+    prefix._session.generation += 1
+    await prefix._get_local_asn()
+
+    assert mock_run.await_count == 2  # noqa: PLR2004
+
+
+async def test_concurrent_announcements_coalesced(mocker):
+    """Prefixes in the same VRF announced together share a single transaction."""
+    mock_run = mocker.AsyncMock(return_value=_bgp_summary(65536))
+    prefixes = [
+        FRRoutingPrefix(prefix=IPv6Network(network), executor=LocalExecutor())
+        for network in ("2001:db8::/48", "2001:db8:1::/48")
+    ]
+    for prefix in prefixes:
+        mocker.patch.object(prefix, "_run_vtysh_commands", mock_run)
+
+    await asyncio.gather(*(prefix.announce() for prefix in prefixes))
+
+    mock_run.assert_awaited_with(
+        "configure terminal",
+        "router bgp 65536",
+        "address-family ipv6 unicast",
+        "network 2001:db8::/48",
+        "network 2001:db8:1::/48",
+    )
+    assert mock_run.await_count == 2  # noqa: PLR2004
+
+
+async def test_is_announced_shares_snapshot(mocker):
+    """Prefixes in the same VRF and AFI are checked using a single snapshot."""
+    output = json.dumps(
+        {"routes": {"2001:db8::/48": [{"origin": "IGP", "weight": 32768}]}}
+    )
+    mock_run = mocker.AsyncMock(return_value=output)
+    prefixes = [
+        FRRoutingPrefix(prefix=IPv6Network(network), vrf="42", executor=LocalExecutor())
+        for network in ("2001:db8::/48", "2001:db8:1::/48")
+    ]
+    for prefix in prefixes:
+        mocker.patch.object(prefix, "_run_vtysh_commands", mock_run)
+
+    announced = await asyncio.gather(*(prefix.is_announced() for prefix in prefixes))
+
+    assert announced == [True, False]
+    mock_run.assert_awaited_once_with(
+        "show bgp vrf 42 ipv6 unicast self-originate json"
+    )
+
+
+def _gated_prefixes(mocker, count: int) -> tuple[list[FRRoutingPrefix], AsyncMock]:
+    """Prefixes bound to the same route-map, sharing a mocked vtysh."""
+    mock_run = mocker.AsyncMock(return_value=_bgp_summary(65536))
+    prefixes = [
+        FRRoutingPrefix(
+            prefix=IPv6Network(f"2001:db8:{num}::/48"),
+            route_map="ANYCAST-DNS",
+            executor=LocalExecutor(),
+        )
+        for num in range(count)
+    ]
+    for prefix in prefixes:
+        mocker.patch.object(prefix, "_run_vtysh_commands", mock_run)
+    return prefixes, mock_run
+
+
+async def _announce_and_denounce_all(prefixes: list[FRRoutingPrefix]) -> None:
+    """Announce and then denounce all prefixes concurrently."""
+    async with asyncio.TaskGroup() as tg:
+        for prefix in prefixes:
+            tg.create_task(prefix.announce())
+    async with asyncio.TaskGroup() as tg:
+        for prefix in prefixes:
+            tg.create_task(prefix.denounce())
+
+
+async def test_gated_prefixes_flip_route_map_once(mocker):
+    """Prefixes bound to the same route-map flip it once for all of them."""
+    prefixes, mock_run = _gated_prefixes(mocker, 5)
+
+    await _announce_and_denounce_all(prefixes)
+
+    route_map_commands = [
+        call.args[1]
+        for call in mock_run.await_args_list
+        if len(call.args) == 2 and call.args[1].startswith("route-map")  # noqa: PLR2004
+    ]
+    assert route_map_commands == [
+        "route-map ANYCAST-DNS permit 10",
+        "route-map ANYCAST-DNS deny 10",
+    ]
+
+
+async def test_gated_prefixes_provisioned_once(mocker):
+    """Network statements of gated prefixes are bound to the route-map once."""
+    prefixes, mock_run = _gated_prefixes(mocker, 3)
+
+    await _announce_and_denounce_all(prefixes)
+
+    network_commands = [
+        command
+        for call in mock_run.await_args_list
+        for command in call.args
+        if command.startswith(("network", "no network"))
+    ]
+    assert sorted(network_commands) == sorted(
+        f"network {prefix.prefix} route-map ANYCAST-DNS" for prefix in prefixes
+    )
+
+
+def _network_commands(mock_run: AsyncMock) -> list[str]:
+    """The network commands run using a mocked vtysh."""
+    return [
+        command
+        for call in mock_run.await_args_list
+        for command in call.args
+        if command.startswith(("network", "no network"))
+    ]
+
+
+async def test_gated_prefixes_provisioned_up_front(mocker):
+    """All prefixes bound to a route-map are provisioned before it is flipped."""
+    prefixes, mock_run = _gated_prefixes(mocker, 3)
+
+    await prefixes[0].announce()
+
+    assert sorted(_network_commands(mock_run)) == sorted(
+        f"network {prefix.prefix} route-map ANYCAST-DNS" for prefix in prefixes
+    )
+    assert mock_run.await_args.args[1] == "route-map ANYCAST-DNS permit 10"
+
+
+async def test_failed_command_provisions_gated_prefixes_again(mocker):
+    """Network statements are provisioned again after a command failed."""
+    (prefix,), mock_run = _gated_prefixes(mocker, 1)
+    failures = [FRRCommandError(["route-map"], 1, stdout=None, stderr=None)]
+
+    async def run(*commands: str) -> str:
+        if commands[-1].startswith("route-map") and failures:
+            raise failures.pop()
+        return _bgp_summary(65536)
+
+    mock_run.side_effect = run
+
+    with pytest.raises(FRRCommandError):
+        await prefix.announce()
+    await prefix.announce()
+
+    assert (
+        _network_commands(mock_run)
+        == [f"network {prefix.prefix} route-map ANYCAST-DNS"] * 2
+    )
+
+
+async def test_contradicting_snapshot_provisions_gated_prefixes_again(mocker):
+    """Network statements are provisioned again if the route-map state is stale."""
+    (prefix,), mock_run = _gated_prefixes(mocker, 1)
+    await prefix.announce()
+
+    mock_run.return_value = json.dumps({"routes": {}})
+    assert not await prefix.is_announced()
+    mock_run.return_value = _bgp_summary(65536)
+    await prefix.announce()
+
+    assert (
+        _network_commands(mock_run)
+        == [f"network {prefix.prefix} route-map ANYCAST-DNS"] * 2
+    )
+    assert mock_run.await_args.args[1] == "route-map ANYCAST-DNS permit 10"
+
+
+async def test_failed_route_map_flip_is_retried(mocker):
+    """The route-map is flipped again if flipping it failed before."""
+    (prefix,), mock_run = _gated_prefixes(mocker, 1)
+    flip = mocker.patch.object(
+        prefix,
+        "_flip_route_map",
+        side_effect=[FRRCommandError(["route-map"], 1, stdout=None, stderr=None), ""],
+    )
+
+    with pytest.raises(FRRCommandError):
+        await prefix.announce()
+    await prefix.announce()
+
+    assert flip.await_count == 2  # noqa: PLR2004
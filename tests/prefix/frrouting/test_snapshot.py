@@ -0,0 +1,99 @@
+import asyncio
+import json
+from ipaddress import IPv4Network, IPv6Network
+
+from anycastd.prefix._frrouting.snapshot import RIBSnapshot, RIBSnapshotCache
+
+SELF_ORIGINATED = json.dumps(
+    {
+        "vrfId": 0,
+        "vrfName": "default",
+        "routes": {
+            "2001:db8::/48": [{"origin": "IGP", "valid": True, "weight": 32768}],
+            "2001:db8:1::/48": [{"origin": "incomplete", "valid": True}],
+        },
+    }
+)
+
+
+class FakeFetch:
+    """Returns self-originated routes, counting how often it was awaited."""
+
+    def __init__(self, output: str = SELF_ORIGINATED) -> None:
+        self.output = output
+        self.count = 0
+
+    async def __call__(self) -> str:
+        self.count += 1
+        await asyncio.sleep(0)
+        return self.output
+
+
+def test_snapshot_contains_igp_originated_networks():
+    """Snapshots contain networks with a locally originated IGP path."""
+    snapshot = RIBSnapshot.from_json(SELF_ORIGINATED, taken=0)
+
+    assert IPv6Network("2001:db8::/48") in snapshot
+    assert IPv6Network("2001:db8:1::/48") not in snapshot
+    assert IPv4Network("192.0.2.0/24") not in snapshot
+
+
+def test_snapshot_without_routes_is_empty():
+    """Snapshots of output without routes, e.g. an empty table, are empty."""
+    assert RIBSnapshot.from_json("{}", taken=0).networks == frozenset()
+
+
+async def test_concurrent_requests_share_single_fetch():
+    """Concurrent requests for a snapshot share a single fetch."""
+    cache = RIBSnapshotCache()
+    fetch = FakeFetch()
+
+    snapshots = await asyncio.gather(*(cache.get("key", fetch) for _ in range(10)))
+
+    assert fetch.count == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+async def test_snapshot_reused_within_ttl():
+    """Snapshots are reused until they are older than the TTL."""
+    cache = RIBSnapshotCache(ttl=60)
+    fetch = FakeFetch()
+
+    await cache.get("key", fetch)
+    await cache.get("key", fetch)
+
+    assert fetch.count == 1
+
+
+async def test_outdated_snapshot_refreshed():
+    """Snapshots older than the TTL are refreshed."""
+    cache = RIBSnapshotCache(ttl=0)
+    fetch = FakeFetch()
+
+    await cache.get("key", fetch)
+    await cache.get("key", fetch)
+
+    assert fetch.count == 2  # noqa: PLR2004
+
+
+async def test_invalidated_snapshot_refreshed():
+    """Invalidated snapshots are refreshed on the next request."""
+    cache = RIBSnapshotCache(ttl=60)
+    fetch = FakeFetch()
+
+    await cache.get("key", fetch)
+    cache.invalidate("key")
+    await cache.get("key", fetch)
+
+    assert fetch.count == 2  # noqa: PLR2004
+
+
+async def test_snapshots_separated_by_key():
+    """Snapshots of different keys are fetched separately."""
+    cache = RIBSnapshotCache(ttl=60)
+    fetch = FakeFetch()
+
+    await cache.get("vrf a", fetch)
+    await cache.get("vrf b", fetch)
+
+    assert fetch.count == 2  # noqa: PLR2004
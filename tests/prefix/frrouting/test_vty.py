@@ -0,0 +1,195 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from anycastd.prefix._frrouting.exceptions import FRRCommandError
+from anycastd.prefix._frrouting.vty import VtySocketSession, VtySocketSessionPool
+
+CMD_SUCCESS = b"\0\0\0\0"
+CMD_WARNING = b"\0\0\0\x01"
+
+
+class FakeVty:
+    """A stand-in for the VTY socket of a FRRouting daemon.
+
+    Speaks the same framing as FRRouting daemons, replying to null terminated
+    commands with their output followed by three null bytes and a status byte.
+    """
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.commands: list[str] = []
+        self.crash_once = False
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        node = "view"
+        while True:
+            try:
+                data = await reader.readuntil(b"\0")
+            except asyncio.IncompleteReadError:
+                return
+            command = data.removesuffix(b"\0").decode()
+            self.commands.append(command)
+            if command == "show crash" and self.crash_once:
+                self.crash_once = False
+                writer.close()
+                return
+
+            reply, status = b"", CMD_SUCCESS
+            match command:
+                case "enable":
+                    node = "enable"
+                case "configure terminal" if node == "enable":
+                    node = "config"
+                case "end":
+                    node = "enable"
+                case "hang" | "slow":
+                    await asyncio.sleep(60 if command == "hang" else 0.3)
+                case _ if command.startswith("show "):
+                    reply = f"output of {command} in {node}\n".encode()
+                case _ if node == "config" and command != "fail":
+                    pass
+                case _:
+                    reply, status = b"% Unknown command\n", CMD_WARNING
+            writer.write(reply + status)
+            await writer.drain()
+
+
+@pytest.fixture
+def fake_vty() -> FakeVty:
+    return FakeVty()
+
+
+@pytest.fixture
+async def vty_socket(tmp_path: Path, fake_vty: FakeVty):
+    """The path of a VTY socket served by the fake daemon."""
+    path = tmp_path / "bgpd.vty"
+    server = await asyncio.start_unix_server(fake_vty.handle, path)
+    async with server:
+        yield path
+
+
+@pytest.fixture
+async def session(vty_socket: Path):
+    session = VtySocketSession(vty_socket)
+    yield session
+    await session.aclose()
+
+
+async def test_run_returns_output_of_commands(session: VtySocketSession):
+    """The output of all commands is returned."""
+    stdout, stderr = await session.run("show bgp", "show bgp detail json")
+
+    assert stdout == (
+        "output of show bgp in enable\noutput of show bgp detail json in enable\n"
+    )
+    assert stderr == ""
+
+
+async def test_connection_reused_between_runs(
+    session: VtySocketSession, fake_vty: FakeVty
+):
+    """Subsequent commands are sent using the same connection."""
+    await session.run("show bgp")
+    await session.run("show bgp")
+
+    assert fake_vty.connections == 1
+    assert fake_vty.commands == ["enable", "show bgp", "show bgp"]
+
+
+async def test_error_raises_command_error(session: VtySocketSession):
+    """A command replying with a non-zero status raises a FRRCommandError."""
+    with pytest.raises(FRRCommandError) as exc_info:
+        await session.run("show bgp", "fail", "show bgp")
+
+    assert exc_info.value.exit_code == 1
+    assert exc_info.value.stdout == (
+        "output of show bgp in enable\n% Unknown command\n"
+    )
+
+
+async def test_configure_terminal_returns_to_enable_node(
+    session: VtySocketSession, fake_vty: FakeVty
+):
+    """Configuration commands are followed by returning to the enable node."""
+    with pytest.raises(FRRCommandError):
+        await session.run("configure terminal", "router bgp 65536", "fail")
+
+    stdout, _ = await session.run("show bgp")
+
+    assert "end" in fake_vty.commands
+    assert stdout == "output of show bgp in enable\n"
+
+
+async def test_closed_connection_replaced(session: VtySocketSession, fake_vty: FakeVty):
+    """Commands are sent again using a new connection if the daemon disconnects."""
+    fake_vty.crash_once = True
+
+    stdout, _ = await session.run("show crash")
+
+    assert fake_vty.connections == 2  # noqa: PLR2004
+    assert stdout == "output of show crash in enable\n"
+
+
+async def test_missing_socket_raises_command_error(tmp_path: Path):
+    """A FRRCommandError is raised if the socket can not be connected to."""
+    session = VtySocketSession(tmp_path / "missing.vty")
+
+    with pytest.raises(FRRCommandError):
+        await session.run("show bgp")
+
+
+async def test_interrupted_run_discards_connection(
+    session: VtySocketSession, fake_vty: FakeVty
+):
+    """The connection is replaced if reading a reply is interrupted."""
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.1):
+            await session.run("hang")
+
+    stdout, _ = await session.run("show bgp")
+
+    assert fake_vty.connections == 2  # noqa: PLR2004
+    assert stdout == "output of show bgp in enable\n"
+
+
+async def test_oversized_reply_discards_connection(
+    session: VtySocketSession, fake_vty: FakeVty, monkeypatch: pytest.MonkeyPatch
+):
+    """The connection is replaced if a reply exceeds the size limit."""
+    monkeypatch.setattr("anycastd.prefix._frrouting.vty._REPLY_LIMIT", 16)
+    with pytest.raises(FRRCommandError):
+        await session.run("show bgp detail json")
+    monkeypatch.undo()
+
+    stdout, _ = await session.run("show bgp")
+
+    assert fake_vty.connections == 2  # noqa: PLR2004
+    assert stdout == "output of show bgp in enable\n"
+
+
+async def test_timeout_excludes_waiting_for_other_commands(
+    session: VtySocketSession,
+):
+    """The timeout only applies once commands run, not while waiting for others."""
+    slow = asyncio.create_task(session.run("configure terminal", "slow"))
+    await asyncio.sleep(0)
+
+    stdout, _ = await session.run("show bgp", timeout=0.2)
+
+    await slow
+    assert stdout == "output of show bgp in enable\n"
+
+
+def test_pool_shares_session_for_same_socket():
+    """The same session is returned for the same VTY socket."""
+    pool = VtySocketSessionPool()
+
+    session = pool.get(Path("/var/run/frr/bgpd.vty"))
+
+    assert pool.get(Path("/var/run/frr/bgpd.vty")) is session
+    assert pool.get(Path("/run/frr/bgpd.vty")) is not session
@@ -0,0 +1,176 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from anycastd._executor import LocalExecutor
+from anycastd.prefix._frrouting.exceptions import FRRCommandError
+from anycastd.prefix._frrouting.vtysh import VtyshSession, VtyshSessionPool
+
+# A minimal stand-in for the vtysh, echoing commands along with a prompt
+# like the vtysh does when reading commands from stdin.
+FAKE_VTYSH = f"""#!{sys.executable}
+import sys
+import time
+from pathlib import Path
+
+print("Hello, this is FRRouting (fake).", flush=True)
+for line in sys.stdin:
+    command = line.strip()
+    print(f"frr# {{command}}", flush=True)
+    if command.startswith("echo "):
+        print(command.removeprefix("echo "), flush=True)
+    elif command.startswith("show "):
+        print(f"output of {{command}}", flush=True)
+    elif command == "long":
+        print("x" * 2**17, flush=True)
+    elif command == "fail":
+        print("% Unknown command: fail", flush=True)
+    elif command == "warn":
+        print("% Warning: something happened", file=sys.stderr, flush=True)
+    elif command == "slow":
+        time.sleep(0.3)
+    elif command == "hang":
+        sys.stdin.readline()
+    elif command.startswith("crash-once "):
+        marker = Path(command.removeprefix("crash-once "))
+        if not marker.exists():
+            marker.touch()
+            sys.exit(1)
+    elif command == "crash":
+        sys.exit(1)
+"""
+
+
+@pytest.fixture
+def vtysh(tmp_path: Path) -> Path:
+    """The path to a fake vtysh."""
+    path = tmp_path / "vtysh"
+    path.write_text(FAKE_VTYSH)
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+async def session(vtysh: Path):
+    session = VtyshSession(vtysh, LocalExecutor())
+    yield session
+    await session.aclose()
+
+
+async def test_run_returns_output_of_commands(session: VtyshSession):
+    """Only the output of the commands is returned, without echoed commands."""
+    stdout, stderr = await session.run("show bgp", "show bgp detail json")
+
+    assert stdout == "output of show bgp\noutput of show bgp detail json\n"
+    assert stderr == ""
+
+
+async def test_process_reused_between_runs(session: VtyshSession):
+    """Subsequent commands are run using the same vtysh process."""
+    await session.run("show bgp")
+    pid = session.pid
+
+    stdout, _ = await session.run("show version")
+
+    assert session.pid == pid
+    assert stdout == "output of show version\n"
+
+
+async def test_error_raises_command_error(session: VtyshSession):
+    """Commands resulting in an error message raise a FRRCommandError."""
+    with pytest.raises(FRRCommandError) as exc_info:
+        await session.run("show bgp", "fail")
+
+    assert exc_info.value.stdout == ("output of show bgp\n% Unknown command: fail\n")
+
+
+async def test_stderr_error_raises_command_error(session: VtyshSession):
+    """Commands writing errors to stderr raise a FRRCommandError."""
+    with pytest.raises(FRRCommandError) as exc_info:
+        await session.run("warn")
+
+    assert exc_info.value.stdout == "% Warning: something happened\n"
+
+
+async def test_stderr_not_attributed_to_later_commands(session: VtyshSession):
+    """Errors written to stderr do not fail subsequent commands."""
+    with pytest.raises(FRRCommandError):
+        await session.run("warn")
+
+    stdout, stderr = await session.run("show bgp")
+
+    assert stdout == "output of show bgp\n"
+    assert stderr == ""
+
+
+async def test_output_exceeding_buffer_limit_returned(session: VtyshSession):
+    """Lines exceeding the buffer limit of the stream are returned in full."""
+    stdout, _ = await session.run("long", "show bgp")
+
+    assert stdout == "x" * 2**17 + "\noutput of show bgp\n"
+
+
+async def test_configure_terminal_returns_to_enable_node(session: VtyshSession):
+    """Configuration commands are followed by returning to the enable node."""
+    stdout, _ = await session.run("configure terminal", "router bgp 65536")
+
+    assert stdout == ""
+
+
+async def test_exited_process_replaced(session: VtyshSession, tmp_path: Path):
+    """Commands are run again using a new process if the vtysh exits."""
+    await session.run("show bgp")
+    pid = session.pid
+
+    stdout, _ = await session.run(f"crash-once {tmp_path / 'crashed'}", "show bgp")
+
+    assert session.pid != pid
+    assert stdout == "output of show bgp\n"
+
+
+async def test_repeatedly_exiting_process_raises_command_error(
+    session: VtyshSession,
+):
+    """A FRRCommandError is raised if the vtysh exits again after retrying."""
+    with pytest.raises(FRRCommandError):
+        await session.run("crash")
+
+
+async def test_interrupted_run_discards_process(session: VtyshSession):
+    """The process is replaced if reading the output of commands is interrupted."""
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.5):
+            await session.run("hang")
+
+    assert session.pid is None
+    stdout, _ = await session.run("show bgp")
+    assert stdout == "output of show bgp\n"
+
+
+async def test_timeout_excludes_waiting_for_other_commands(session: VtyshSession):
+    """The timeout only applies once commands run, not while waiting for others."""
+    slow = asyncio.create_task(session.run("slow"))
+    await asyncio.sleep(0)
+
+    stdout, _ = await session.run("show bgp", timeout=0.2)
+
+    await slow
+    assert stdout == "output of show bgp\n"
+
+
+async def test_timeout_exceeded_raises_timeout_error(session: VtyshSession):
+    """Commands not completing within the timeout raise a TimeoutError."""
+    with pytest.raises(TimeoutError):
+        await session.run("slow", timeout=0.1)
+
+
+def test_pool_shares_session_for_same_executor_and_vtysh():
+    """The same session is returned for the same executor and vtysh."""
+    pool = VtyshSessionPool()
+
+    session = pool.get(LocalExecutor(), Path("/usr/bin/vtysh"))
+
+    assert pool.get(LocalExecutor(), Path("/usr/bin/vtysh")) is session
+    assert pool.get(LocalExecutor(), Path("/usr/local/bin/vtysh")) is not session
@@ -46,3 +46,19 @@ async def test_await_process_communicate_returns_stderr():
 
     assert stdout == b""
     assert stderr == to_echo.encode() + b"\n"
+
+
+async def test_merged_stderr_returned_as_stdout():
+    """Stderr is returned as part of stdout if merged."""
+    executor = LocalExecutor()
+
+    process = await executor.create_subprocess_exec(
+        "python3",
+        "-c",
+        "import sys; print('out', flush=True); print('err', file=sys.stderr)",
+        merge_stderr=True,
+    )
+    stdout, stderr = await process.communicate()
+
+    assert stdout == b"out\nerr\n"
+    assert stderr is None
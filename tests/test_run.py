@@ -1,11 +1,35 @@
 import asyncio
+import dataclasses
+import datetime
 import signal
+import socket
 
 import pytest
 from structlog.testing import capture_logs
 
-from anycastd.core._run import run_services, signal_handler
+from anycastd._configuration import HoldOnRestartConfiguration, MainConfiguration
+from anycastd._configuration.healthcheck import (
+    CabourotteConfiguration,
+    CabourotteReceiverConfiguration,
+)
+from anycastd.core._exit import ExitCode
+from anycastd.core._run import (
+    expire_held_state,
+    resume_held_state,
+    run_from_configuration,
+    run_services,
+    signal_handler,
+    withdraw_prefixes,
+)
 from anycastd.core._service import Service
+from anycastd.core._state import (
+    HeldState,
+    ServiceState,
+    write_held_state,
+)
+from anycastd.healthcheck import cabourotte_client_pool
+from anycastd.prefix import vty_session_pool, vtysh_session_pool
+from tests.dummy import DummyPrefix
 
 
 @pytest.fixture
@@ -48,38 +72,135 @@ async def test_run_services_installs_signal_handlers(
     )
 
 
-def test_signal_handler_logs_signal(mocker):
+def test_signal_handler_logs_signal():
     """The signal handler logs the received signal."""
-    mocker.patch("anycastd.core._run.asyncio")
-    mocker.patch("anycastd.core._run.sys")
-
     with capture_logs() as logs:
-        signal_handler(signal.SIGTERM)
+        signal_handler(signal.SIGTERM, asyncio.Event())
 
     assert logs[0]["event"] == "Received SIGTERM, terminating."
     assert logs[0]["log_level"] == "info"
 
 
-def test_signal_handler_cancels_all_tasks(mocker):
-    """The signal handler cancels all tasks."""
-    tasks = [mocker.create_autospec(asyncio.Task) for _ in range(3)]
-    mocker.patch("anycastd.core._run.asyncio.all_tasks", return_value=tasks)
-    mocker.patch("anycastd.core._run.sys")
+def test_signal_handler_requests_shutdown():
+    """The signal handler requests shutdown instead of exiting right away."""
+    shutdown = asyncio.Event()
+
+    signal_handler(signal.SIGTERM, shutdown)
+
+    assert shutdown.is_set()
+
+
+@pytest.fixture
+def running_services(mocker, ipv4_example_network, ipv6_example_network):
+    """Services that run until cancelled, with mocked prefixes announced."""
+    services = []
+    for num, network in enumerate((ipv4_example_network, ipv6_example_network)):
+        service = Service(
+            f"Service {num + 1}",
+            (mocker.create_autospec(DummyPrefix(network), spec_set=True),),
+            (),
+        )
+        service.prefixes[0].is_announced.return_value = False
+        mocker.patch.object(service, "all_checks_healthy", return_value=True)
+        services.append(service)
+    return services
+
+
+async def _shut_down(services, **kwargs) -> None:
+    """Run services, requesting shutdown once they are running."""
+    mock_loop = asyncio.get_running_loop()
+    handlers = {}
+
+    def add_signal_handler(sig, callback):
+        handlers[sig] = callback
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(mock_loop, "add_signal_handler", add_signal_handler)
+        run = asyncio.create_task(run_services(services, **kwargs))
+        await asyncio.sleep(0.1)
+        handlers[signal.SIGTERM]()
+        await run
+
+
+async def test_shutdown_withdraws_announced_prefixes(mock_sys, running_services):
+    """On shutdown, announced prefixes are withdrawn before exiting with zero."""
+    await _shut_down(running_services)
+
+    for service in running_services:
+        service.prefixes[0].denounce.assert_awaited_once()
+    mock_sys.exit.assert_called_once_with(ExitCode.OK)
+
+
+async def test_shutdown_holds_prefixes_on_terminate(
+    mock_sys, running_services, tmp_path
+):
+    """On shutdown, prefixes are not withdrawn when holding them."""
+    state_file = tmp_path / "held.json"
 
-    signal_handler(signal.SIGTERM)
+    await _shut_down(running_services, hold_state_file=state_file)
+
+    for service in running_services:
+        service.prefixes[0].denounce.assert_not_awaited()
+    assert state_file.exists()
+    mock_sys.exit.assert_called_once_with(ExitCode.OK)
+
+
+async def test_shutdown_withdraws_prefixes_if_holding_fails(
+    mock_sys, running_services, tmp_path
+):
+    """On shutdown, prefixes are withdrawn if their state cannot be written."""
+    (tmp_path / "file").touch()
+
+    with capture_logs() as logs:
+        await _shut_down(running_services, hold_state_file=tmp_path / "file" / "held")
 
-    for task in tasks:
-        task.cancel.assert_called_once_with("Received SIGTERM, terminating.")
+    for service in running_services:
+        service.prefixes[0].denounce.assert_awaited_once()
+    assert any(log["log_level"] == "error" for log in logs)
+    mock_sys.exit.assert_called_once_with(ExitCode.OK)
+
+
+async def test_shutdown_exits_unavailable_when_withdrawing_fails(
+    mock_sys, running_services
+):
+    """Shutdown exits with unavailable(69) if prefixes could not be withdrawn."""
+    running_services[0].prefixes[0].denounce.side_effect = RuntimeError("FRR is down.")
+
+    await _shut_down(running_services)
+
+    mock_sys.exit.assert_called_once_with(ExitCode.UNAVAILABLE)
+
+
+async def test_withdraw_prefixes_reports_prefixes_exceeding_timeout(
+    running_services,
+):
+    """Prefixes that could not be withdrawn within the timeout are returned."""
+    for service in running_services:
+        service.healthy = True
+
+    async def never_completes() -> None:
+        await asyncio.sleep(60)
+
+    slow = running_services[1].prefixes[0]
+    slow.denounce.side_effect = never_completes
+
+    with capture_logs() as logs:
+        remaining = await withdraw_prefixes(running_services, timeout=0.05)
 
+    assert remaining == (slow,)
+    assert logs[-1]["log_level"] == "error"
+    assert logs[-1]["prefixes"] == [str(slow.prefix)]
 
-def test_signal_handler_exits_with_zero(mocker):
-    """The signal handler exits with returncode zero."""
-    mocker.patch("anycastd.core._run.asyncio")
-    mock_sys = mocker.patch("anycastd.core._run.sys")
 
-    signal_handler(signal.SIGTERM)
+async def test_withdraw_prefixes_skips_prefixes_not_announced(running_services):
+    """Only prefixes of services that announced them are withdrawn."""
+    running_services[0].healthy = True
 
-    mock_sys.exit.assert_called_once_with(0)
+    remaining = await withdraw_prefixes(running_services, timeout=1)
+
+    assert remaining == ()
+    running_services[0].prefixes[0].denounce.assert_awaited_once()
+    running_services[1].prefixes[0].denounce.assert_not_awaited()
 
 
 async def test_unexpected_service_error_exits_with_software_rc(mock_sys, mock_services):
@@ -133,3 +254,223 @@ async def test_unexpected_service_error_logs_error(mocker, mock_sys, mock_servic
         "possibly leaving prefixes in an unwanted state. Please remediate manually."
     )
     assert logs[2]["log_level"] == "error"
+
+
+async def test_announced_prefixes_adopted_before_running(mock_services):
+    """Announced prefixes of all services are adopted before running them."""
+    await run_services(mock_services)
+
+    for mock_service in mock_services:
+        mock_service.adopt_announced_prefixes.assert_awaited_once()
+
+
+async def test_services_do_not_denounce_on_terminate(mocker, mock_services):
+    """Services leave withdrawing their prefixes to the shutdown path."""
+    await run_services(mock_services)
+
+    for mock_service in mock_services:
+        mock_service.run.assert_awaited_once_with(
+            scheduler=mocker.ANY, denounce_on_terminate=False
+        )
+
+
+@pytest.fixture
+def hold_on_restart(tmp_path) -> HoldOnRestartConfiguration:
+    """A configuration holding prefixes in a temporary state file."""
+    return HoldOnRestartConfiguration(
+        state_file=tmp_path / "state.json", grace_period=datetime.timedelta(seconds=1)
+    )
+
+
+def _held_state(services, *, age: float = 0) -> HeldState:
+    """A held state of services, captured the given number of seconds ago."""
+    state = HeldState.from_services(services)
+    return dataclasses.replace(
+        state, timestamp=state.timestamp - datetime.timedelta(seconds=age)
+    )
+
+
+def test_resume_held_state_consumes_state_file(
+    mocker, hold_on_restart, ipv4_example_network
+):
+    """A held state is resumed by matching services and the state file removed."""
+    service = Service("dns", (DummyPrefix(ipv4_example_network),), ())
+    write_held_state(
+        hold_on_restart.state_file,
+        HeldState(
+            timestamp=datetime.datetime.now(tz=datetime.UTC),
+            services={"dns": ServiceState.from_service(service)},
+        ),
+    )
+    mock_resume = mocker.patch.object(service, "resume_held_state")
+
+    resume_held_state(hold_on_restart, [service])
+
+    mock_resume.assert_called_once_with(healthy=False, grace_period=mocker.ANY)
+    assert not hold_on_restart.state_file.exists()
+
+
+def test_expired_held_state_is_not_resumed(
+    mocker, hold_on_restart, ipv4_example_network
+):
+    """A held state whose grace period expired is ignored."""
+    service = Service("dns", (DummyPrefix(ipv4_example_network),), ())
+    write_held_state(hold_on_restart.state_file, _held_state([service], age=5))
+    mock_resume = mocker.patch.object(service, "resume_held_state")
+
+    resume_held_state(hold_on_restart, [service])
+
+    mock_resume.assert_not_called()
+
+
+async def test_expire_held_state_denounces_prefixes(
+    mocker, hold_on_restart, ipv4_example_network
+):
+    """Held prefixes are denounced when no process took them over in time."""
+    service = Service("dns", (DummyPrefix(ipv4_example_network),), ())
+    write_held_state(hold_on_restart.state_file, _held_state([service], age=5))
+    mocker.patch("anycastd.core._run.configs_to_services", return_value=(service,))
+    mock_denounce = mocker.patch.object(service, "denounce_all_prefixes")
+    configuration = MainConfiguration(services=(), hold_on_restart=hold_on_restart)
+
+    await expire_held_state(configuration)
+
+    mock_denounce.assert_awaited_once()
+    assert not hold_on_restart.state_file.exists()
+
+
+async def test_expire_held_state_skips_state_taken_over(
+    mocker, hold_on_restart, ipv4_example_network
+):
+    """Held prefixes are left alone once a new process consumed the state."""
+    service = Service("dns", (DummyPrefix(ipv4_example_network),), ())
+    write_held_state(hold_on_restart.state_file, _held_state([service]))
+    mock_configs_to_services = mocker.patch("anycastd.core._run.configs_to_services")
+    configuration = MainConfiguration(services=(), hold_on_restart=hold_on_restart)
+
+    expiry = asyncio.create_task(expire_held_state(configuration))
+    await asyncio.sleep(0.1)
+    resume_held_state(hold_on_restart, [service])
+    await expiry
+
+    mock_configs_to_services.assert_not_called()
+
+
+async def test_new_process_takes_over_while_watchdog_waits(
+    mocker, hold_on_restart, ipv4_example_network, mock_run_services, mock_pool_closes
+):
+    """
+    A new process started while the watchdog waits takes over the held prefixes,
+    after which the watchdog exits without waiting for the grace period.
+    """
+    service = Service("dns", (DummyPrefix(ipv4_example_network),), ())
+    write_held_state(hold_on_restart.state_file, _held_state([service]))
+    mocker.patch("anycastd.core._run.configs_to_services", return_value=(service,))
+    mocker.patch("anycastd.core._run.WATCHDOG_POLL_INTERVAL", 0.05)
+    mock_denounce = mocker.patch.object(service, "denounce_all_prefixes")
+    configuration = MainConfiguration(services=(), hold_on_restart=hold_on_restart)
+
+    watchdog = asyncio.create_task(expire_held_state(configuration))
+    await asyncio.sleep(0.1)
+    await run_from_configuration(configuration)
+    async with asyncio.timeout(0.5):
+        await watchdog
+
+    mock_run_services.assert_awaited_once()
+    assert service._grace_deadline is not None
+    mock_denounce.assert_not_awaited()
+
+
+@pytest.fixture
+def mock_run_services(mocker):
+    """A mock of running services, returning immediately."""
+    return mocker.patch("anycastd.core._run.run_services", autospec=True)
+
+
+@pytest.fixture
+def mock_pool_closes(mocker):
+    """Mocks of closing the shared client and session pools."""
+    return [
+        mocker.patch.object(pool, "aclose")
+        for pool in (cabourotte_client_pool, vtysh_session_pool, vty_session_pool)
+    ]
+
+
+def _receiving_on(port: int) -> MainConfiguration:
+    """A configuration receiving pushed cabourotte results on a port."""
+    return MainConfiguration(
+        services=(),
+        cabourotte=CabourotteConfiguration(
+            receiver=CabourotteReceiverConfiguration(port=port)
+        ),
+    )
+
+
+async def test_run_from_configuration_closes_pools(mock_run_services, mock_pool_closes):
+    """Services are run, after which all shared pools are closed."""
+    await run_from_configuration(_receiving_on(0))
+
+    mock_run_services.assert_awaited_once()
+    for mock_close in mock_pool_closes:
+        mock_close.assert_awaited_once()
+
+
+async def test_receiver_failing_to_listen_fails_startup(
+    mock_run_services, mock_pool_closes
+):
+    """Failing to listen for pushed results exits before running services."""
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+
+        with capture_logs() as logs, pytest.raises(SystemExit) as exc_info:
+            await run_from_configuration(_receiving_on(port))
+
+    assert exc_info.value.code == ExitCode.UNAVAILABLE
+    assert logs[-1]["log_level"] == "error"
+    mock_run_services.assert_not_awaited()
+
+
+async def test_receiver_failure_does_not_mask_exit_code(
+    mocker, mock_run_services, mock_pool_closes
+):
+    """A failed receiver is logged without replacing the exit code on shutdown."""
+    mock_server = mocker.AsyncMock(spec=asyncio.Server)
+    mock_server.serve_forever.side_effect = OSError("Receiver failed.")
+    mocker.patch(
+        "anycastd.healthcheck._cabourotte.receiver.ResultReceiver.start",
+        return_value=mock_server,
+    )
+
+    async def exits(*args, **kwargs) -> None:
+        await asyncio.sleep(0.01)
+        raise SystemExit(ExitCode.OK)
+
+    mock_run_services.side_effect = exits
+
+    with capture_logs() as logs, pytest.raises(SystemExit) as exc_info:
+        await run_from_configuration(_receiving_on(0))
+
+    assert exc_info.value.code == ExitCode.OK
+    assert any(
+        log["log_level"] == "error" and log.get("exc_info") is not None for log in logs
+    )
+    for mock_close in mock_pool_closes:
+        mock_close.assert_awaited_once()
+
+
+async def test_held_state_not_written_on_panic(
+    mock_run_services, mock_pool_closes, tmp_path
+):
+    """The held state is not written if running services panicked."""
+    hold_on_restart = HoldOnRestartConfiguration(state_file=tmp_path / "held.json")
+    configuration = MainConfiguration(services=(), hold_on_restart=hold_on_restart)
+    mock_run_services.side_effect = SystemExit(ExitCode.SOFTWARE)
+
+    with pytest.raises(SystemExit):
+        await run_from_configuration(configuration)
+
+    assert not hold_on_restart.state_file.exists()
+    for mock_close in mock_pool_closes:
+        mock_close.assert_awaited_once()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+from structlog.testing import capture_logs
+
+from anycastd.core._scheduler import HealthcheckScheduler
+from tests.dummy import DummyObservableHealthcheck
+
+
+@pytest.fixture
+async def running_scheduler():
+    """A scheduler running in the background for the duration of a test."""
+    scheduler = HealthcheckScheduler()
+    task = asyncio.create_task(scheduler.run())
+    yield scheduler
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def test_checks_due_are_evaluated(running_scheduler):
+    """A check that was never evaluated is evaluated once scheduled."""
+    check = DummyObservableHealthcheck("dummy", interval=60)
+
+    running_scheduler.schedule(check)
+    await asyncio.sleep(0.05)
+
+    assert check.refresh_count == 1
+
+
+async def test_checks_evaluated_again_after_sub_second_interval(running_scheduler):
+    """Checks are evaluated again after their interval, even below one second."""
+    check = DummyObservableHealthcheck("dummy", interval=0.05)
+
+    running_scheduler.schedule(check)
+    await asyncio.sleep(0.22)
+
+    assert 4 <= check.refresh_count <= 5  # noqa: PLR2004
+
+
+async def test_checks_not_evaluated_before_due(running_scheduler):
+    """Checks are not evaluated before they are due."""
+    check = DummyObservableHealthcheck("dummy", next_due=time.monotonic() + 60)
+
+    running_scheduler.schedule(check)
+    await asyncio.sleep(0.05)
+
+    assert check.refresh_count == 0
+
+
+async def test_earlier_check_scheduled_while_waiting(running_scheduler):
+    """A check scheduled while waiting for a later one is evaluated on time."""
+    late = DummyObservableHealthcheck("late", next_due=time.monotonic() + 60)
+    early = DummyObservableHealthcheck("early", interval=60)
+
+    running_scheduler.schedule(late)
+    await asyncio.sleep(0.01)
+    running_scheduler.schedule(early)
+    await asyncio.sleep(0.05)
+
+    assert early.refresh_count == 1
+    assert late.refresh_count == 0
+
+
+async def test_check_scheduled_once(running_scheduler):
+    """Scheduling the same check multiple times evaluates it only once."""
+    check = DummyObservableHealthcheck("dummy", interval=60)
+
+    running_scheduler.schedule(check)
+    running_scheduler.schedule(check)
+    await asyncio.sleep(0.05)
+
+    assert check.refresh_count == 1
+
+
+async def test_check_evaluated_elsewhere_is_not_evaluated(running_scheduler):
+    """A check evaluated since it was queued is queued again instead."""
+    check = DummyObservableHealthcheck("dummy", next_due=time.monotonic() + 0.02)
+    running_scheduler.schedule(check)
+
+    check.next_due = time.monotonic() + 60
+    await asyncio.sleep(0.05)
+
+    assert check.refresh_count == 0
+
+
+async def test_check_due_earlier_is_evaluated(running_scheduler):
+    """A check whose due time moves earlier is evaluated at the new time."""
+    check = DummyObservableHealthcheck("dummy", next_due=time.monotonic() + 60)
+    running_scheduler.schedule(check)
+    await asyncio.sleep(0.01)
+
+    check.next_due = time.monotonic()
+    for listener in check.due_listeners:
+        listener()
+    await asyncio.sleep(0.05)
+
+    assert check.refresh_count == 1
+
+
+async def test_check_exception_is_logged(mocker, running_scheduler):
+    """Exceptions raised while evaluating a check are logged."""
+    check = DummyObservableHealthcheck("dummy")
+    exc = RuntimeError("An error occurred while executing the health check.")
+
+    async def _refresh() -> bool:
+        check.next_due = time.monotonic() + 60
+        raise exc
+
+    mocker.patch.object(check, "refresh", side_effect=_refresh)
+
+    with capture_logs() as logs:
+        running_scheduler.schedule(check)
+        await asyncio.sleep(0.05)
+
+    error = next(log for log in logs if log["log_level"] == "error")
+    assert (
+        error["event"]
+        == 'An unhandled exception occurred while running health check "dummy".'
+    )
+    assert error["health_check"] == "dummy"
+    assert error["exc_info"] == exc
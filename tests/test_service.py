@@ -1,11 +1,19 @@
 import asyncio
+import time
 
 import pytest
 from pytest_mock import MockerFixture
 from structlog.testing import capture_logs
 
 from anycastd.core import Service
-from tests.dummy import DummyHealthcheck, DummyPrefix
+from anycastd.core._scheduler import HealthcheckScheduler
+from anycastd.core._service import POLL_INTERVAL
+from tests.dummy import (
+    DummyCachedHealthcheck,
+    DummyHealthcheck,
+    DummyObservableHealthcheck,
+    DummyPrefix,
+)
 
 
 @pytest.fixture
@@ -38,20 +46,20 @@ def example_service_w_mock_checks(mocker: MockerFixture, example_service) -> Ser
 
 
 @pytest.fixture
-def patch_asyncio_sleep_to_raise(mocker: MockerFixture) -> None:
-    """Patch the asyncio.sleep function to raise an exception.
+def patch_wait_to_raise(mocker: MockerFixture) -> None:
+    """Patch waiting for the next evaluation to raise an exception.
 
     This is useful to terminate the services run loop at the end of the first execution
     in tests, instead of running it indefinitely.
     """
     mocker.patch(
-        "anycastd.core._service.asyncio.sleep",
+        "anycastd.core._service.Service._wait_for_next_evaluation",
         side_effect=RuntimeError("Exit loop"),
     )
 
 
 async def test_run_awaits_all_checks(
-    mocker: MockerFixture, patch_asyncio_sleep_to_raise, example_service
+    mocker: MockerFixture, patch_wait_to_raise, example_service
 ):
     """When run, the service awaits the status of all its health checks."""
     mock_all_checks_healthy = mocker.patch.object(example_service, "all_checks_healthy")
@@ -65,7 +73,7 @@ async def test_run_awaits_all_checks(
 @pytest.mark.parametrize("was_healthy", [True, False])
 async def test_run_announces_all_when_health_state_changes_to_healthy(
     mocker: MockerFixture,
-    patch_asyncio_sleep_to_raise,
+    patch_wait_to_raise,
     example_service_w_mock_prefixes,
     was_healthy: bool,
 ):
@@ -94,7 +102,7 @@ async def test_run_announces_all_when_health_state_changes_to_healthy(
 @pytest.mark.parametrize("was_healthy", [True, False])
 async def test_run_denounces_all_when_health_state_changes_to_unhealthy(
     mocker: MockerFixture,
-    patch_asyncio_sleep_to_raise,
+    patch_wait_to_raise,
     example_service_w_mock_prefixes,
     was_healthy: bool,
 ):
@@ -121,7 +129,7 @@ async def test_run_denounces_all_when_health_state_changes_to_unhealthy(
 
 
 async def test_run_updates_health_state_when_changed(
-    mocker: MockerFixture, patch_asyncio_sleep_to_raise, example_service_w_mock_prefixes
+    mocker: MockerFixture, patch_wait_to_raise, example_service_w_mock_prefixes
 ):
     """
     When run, the service's health state is updated when the result of the
@@ -138,6 +146,102 @@ async def test_run_updates_health_state_when_changed(
     assert example_service_w_mock_prefixes.healthy is True
 
 
+async def test_run_wakes_up_when_check_signals_change(
+    mocker: MockerFixture, ipv4_example_network
+):
+    """
+    When run, the service sleeps until a health check signals a changed result
+    instead of polling checks that are not due.
+    """
+    check = DummyObservableHealthcheck("observable", next_due=time.monotonic() + 3600)
+    service = Service(
+        name="Example Service",
+        prefixes=(DummyPrefix(ipv4_example_network),),
+        health_checks=(check,),
+    )
+    mock_all_checks_healthy = mocker.patch.object(
+        service, "all_checks_healthy", return_value=True
+    )
+    mocker.patch.object(service, "terminate")
+
+    run_task = asyncio.create_task(service.run())
+    await asyncio.sleep(0.2)
+    mock_all_checks_healthy.assert_awaited_once()
+
+    for listener in check.listeners:
+        listener()
+    await asyncio.sleep(0.05)
+
+    assert mock_all_checks_healthy.await_count == 2  # noqa: PLR2004
+    run_task.cancel()
+    await asyncio.sleep(0)
+
+
+def test_next_evaluation_when_earliest_check_due(ipv4_example_network):
+    """The service is evaluated again once the earliest of its checks is due."""
+    now = time.monotonic()
+    service = Service(
+        name="Example Service",
+        prefixes=(DummyPrefix(ipv4_example_network),),
+        health_checks=(
+            DummyObservableHealthcheck("late", next_due=now + 30),
+            DummyObservableHealthcheck("early", next_due=now + 10),
+        ),
+    )
+
+    result = service._seconds_until_next_evaluation()
+
+    assert result is not None
+    assert 9 < result <= 10  # noqa: PLR2004
+
+
+def test_next_evaluation_polls_checks_that_do_not_signal(example_service):
+    """Health checks that cannot signal changes are polled."""
+    result = example_service._seconds_until_next_evaluation()
+    assert result == POLL_INTERVAL
+
+
+def test_next_evaluation_polls_checks_that_are_still_due(ipv4_example_network):
+    """
+    Health checks that are still due after an evaluation are polled instead of
+    being evaluated in a busy loop.
+    """
+    service = Service(
+        name="Example Service",
+        prefixes=(DummyPrefix(ipv4_example_network),),
+        health_checks=(
+            DummyObservableHealthcheck("failing", next_due=time.monotonic() - 1),
+        ),
+    )
+
+    result = service._seconds_until_next_evaluation()
+
+    assert result == POLL_INTERVAL
+
+
+async def test_run_schedules_observable_checks(
+    mocker: MockerFixture, ipv4_example_network
+):
+    """
+    When run with a scheduler, observable health checks are scheduled and the
+    service waits for their results instead of evaluating them when due.
+    """
+    scheduler = HealthcheckScheduler()
+    check = DummyObservableHealthcheck("observable", next_due=time.monotonic() + 1)
+    service = Service(
+        name="Example Service",
+        prefixes=(DummyPrefix(ipv4_example_network),),
+        health_checks=(check,),
+    )
+    mocker.patch.object(service, "_wait_for_next_evaluation", side_effect=RuntimeError)
+
+    with pytest.raises(RuntimeError):
+        await service.run(scheduler=scheduler)
+
+    assert scheduler.is_scheduled(check)
+    assert service._seconds_until_next_evaluation() is None
+
+
 async def test_run_logs_info_event(example_service):
     """When run, an info event is logged."""
     example_service._terminate = True
@@ -196,6 +300,48 @@ async def test_all_checks_healthy_false_when_all_checks_unhealthy(
     assert result is False
 
 
+async def test_all_checks_healthy_does_not_wait_for_slow_checks_when_unhealthy(
+    example_service_w_mock_checks,
+):
+    """An unhealthy check resolves the evaluation, cancelling slower checks."""
+    slow_check_cancelled = asyncio.Event()
+
+    async def slow_check() -> bool:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            slow_check_cancelled.set()
+            raise
+        return True
+
+    slow, unhealthy = example_service_w_mock_checks.health_checks
+    slow.is_healthy.side_effect = slow_check
+    unhealthy.is_healthy.return_value = False
+
+    async with asyncio.timeout(1):
+        result = await example_service_w_mock_checks.all_checks_healthy()
+
+    assert result is False
+    assert slow_check_cancelled.is_set()
+
+
+async def test_all_checks_healthy_waits_for_all_checks_when_healthy(
+    example_service_w_mock_checks,
+):
+    """The evaluation only resolves as healthy once all checks have passed."""
+
+    async def slow_check() -> bool:
+        await asyncio.sleep(0.1)
+        return True
+
+    slow, healthy = example_service_w_mock_checks.health_checks
+    slow.is_healthy.side_effect = slow_check
+    healthy.is_healthy.return_value = True
+
+    assert await example_service_w_mock_checks.all_checks_healthy() is True
+    slow.is_healthy.assert_awaited_once()
+
+
 async def test_all_checks_healthy_false_when_check_raises(
     example_service_w_mock_checks,
 ):
@@ -356,3 +502,290 @@ async def test_run_coro_cancellation_awaits_termination(example_service, mocker)
     await asyncio.sleep(0.2)
 
     mock_terminate.assert_awaited_once()
+
+
+@pytest.mark.parametrize("announced", [(True, True), (True, False), (False, False)])
+async def test_adopt_announced_prefixes_sets_health(
+    example_service_w_mock_prefixes, announced: tuple[bool, bool]
+):
+    """Services are considered healthy when all of their prefixes are announced."""
+    for prefix, is_announced in zip(
+        example_service_w_mock_prefixes.prefixes, announced, strict=True
+    ):
+        prefix.is_announced.return_value = is_announced
+
+    await example_service_w_mock_prefixes.adopt_announced_prefixes()
+
+    assert example_service_w_mock_prefixes.healthy is all(announced)
+
+
+@pytest.mark.parametrize("checks_healthy", [True, False])
+@pytest.mark.parametrize("announced", [(True, True), (True, False), (False, False)])
+async def test_first_evaluation_only_changes_differing_prefixes(
+    mocker: MockerFixture,
+    patch_wait_to_raise,
+    example_service_w_mock_prefixes,
+    announced: tuple[bool, bool],
+    checks_healthy: bool,
+):
+    """After adoption, only prefixes whose state differs are announced/denounced."""
+    service = example_service_w_mock_prefixes
+    for prefix, is_announced in zip(service.prefixes, announced, strict=True):
+        prefix.is_announced.return_value = is_announced
+    mocker.patch.object(service, "all_checks_healthy", return_value=checks_healthy)
+
+    await service.adopt_announced_prefixes()
+    with pytest.raises(RuntimeError, match="Exit loop"):
+        await service.run()
+
+    assert service.healthy is checks_healthy
+    for prefix, is_announced in zip(service.prefixes, announced, strict=True):
+        changed = prefix.announce if checks_healthy else prefix.denounce
+        unchanged = prefix.denounce if checks_healthy else prefix.announce
+        assert changed.await_count == int(is_announced is not checks_healthy)
+        unchanged.assert_not_awaited()
+
+
+async def test_failed_adoption_logs_warning(example_service_w_mock_prefixes):
+    """Failing to determine whether prefixes are announced logs a warning."""
+    service = example_service_w_mock_prefixes
+    service.prefixes[0].is_announced.side_effect = RuntimeError("FRR is down.")
+
+    with capture_logs() as logs:
+        await service.adopt_announced_prefixes()
+
+    assert logs[0]["event"] == (
+        f'Failed to adopt announced prefixes of service "{service.name}".'
+    )
+    assert logs[0]["log_level"] == "warning"
+    assert service._adopted is None
+
+
+async def test_run_coro_cancellation_without_denouncing(example_service, mocker):
+    """Cancelling the service can leave its prefixes in their current state."""
+    mock_terminate = mocker.patch.object(example_service, "terminate")
+    mocker.patch.object(example_service, "all_checks_healthy", return_value=True)
+    run_task = asyncio.create_task(example_service.run(denounce_on_terminate=False))
+    await asyncio.sleep(0.1)
+
+    run_task.cancel()
+    await asyncio.sleep(0.1)
+
+    mock_terminate.assert_not_awaited()
+    assert example_service.healthy is True
+
+
+@pytest.mark.parametrize("healthy", [True, False])
+def test_resume_held_state_sets_health(example_service, healthy: bool):
+    """Resuming a held state assumes the health of the service at that time."""
+    example_service.resume_held_state(healthy=healthy, grace_period=10)
+
+    assert example_service.healthy is healthy
+    assert example_service._adopted == (healthy, healthy)
+
+
+async def test_resumed_healthy_state_is_kept_when_checks_pass(
+    mocker: MockerFixture, patch_wait_to_raise, example_service_w_mock_prefixes
+):
+    """A resumed healthy state does not change prefixes when checks pass."""
+    service = example_service_w_mock_prefixes
+    mocker.patch.object(service, "all_checks_healthy", return_value=True)
+
+    service.resume_held_state(healthy=True, grace_period=10)
+    with pytest.raises(RuntimeError, match="Exit loop"):
+        await service.run()
+
+    assert service.healthy is True
+    for prefix in service.prefixes:
+        prefix.announce.assert_not_awaited()
+        prefix.denounce.assert_not_awaited()
+
+
+async def test_checks_exceeding_grace_period_denounce_held_prefixes(
+    mocker: MockerFixture, patch_wait_to_raise, example_service_w_mock_prefixes
+):
+    """Prefixes are denounced if checks do not complete within the grace period."""
+    service = example_service_w_mock_prefixes
+
+    async def never_completes() -> bool:
+        await asyncio.sleep(60)
+        return True
+
+    mocker.patch.object(service, "all_checks_healthy", side_effect=never_completes)
+
+    service.resume_held_state(healthy=True, grace_period=0.01)
+    with capture_logs() as logs, pytest.raises(RuntimeError, match="Exit loop"):
+        await service.run()
+
+    assert service.healthy is False
+    for prefix in service.prefixes:
+        prefix.denounce.assert_awaited_once()
+    assert any(log["log_level"] == "warning" for log in logs)
+
+
+@pytest.mark.parametrize(
+    "healthy, adopted, expected",
+    [
+        (True, None, (0, 1)),
+        (False, None, ()),
+        (True, (False, True), (1,)),
+    ],
+)
+def test_announced_prefixes(
+    example_service,
+    healthy: bool,
+    adopted: tuple[bool, ...] | None,
+    expected: tuple[int, ...],
+):
+    """Prefixes are assumed announced when healthy, or as adopted if pending."""
+    example_service._healthy = healthy
+    example_service._adopted = adopted
+
+    assert example_service.announced_prefixes == tuple(
+        example_service.prefixes[index] for index in expected
+    )
+
+
+@pytest.mark.parametrize(
+    "cached, expected",
+    [((True, True), True), ((True, False), False), ((False, None), False)],
+)
+async def test_all_checks_healthy_reads_cached_results_without_tasks(
+    mocker: MockerFixture,
+    ipv4_example_network,
+    cached: tuple[bool | None, ...],
+    expected: bool,
+):
+    """Cached results are read without evaluating checks or creating tasks."""
+    checks = tuple(
+        DummyCachedHealthcheck(f"cached{num}", cached_status=status)
+        for num, status in enumerate(cached)
+    )
+    service = Service("cached", (DummyPrefix(ipv4_example_network),), checks)
+    mock_task_group = mocker.patch("anycastd.core._service.asyncio.TaskGroup")
+
+    assert await service.all_checks_healthy() is expected
+
+    mock_task_group.assert_not_called()
+    assert all(check.evaluations == 0 for check in checks)
+
+
+async def test_all_checks_healthy_only_evaluates_due_checks(ipv4_example_network):
+    """Only checks without a cached result are evaluated."""
+    cached = DummyCachedHealthcheck("cached", cached_status=True)
+    due = DummyCachedHealthcheck("due", cached_status=None)
+    service = Service("cached", (DummyPrefix(ipv4_example_network),), (cached, due))
+
+    assert await service.all_checks_healthy() is True
+
+    assert (cached.evaluations, due.evaluations) == (0, 1)
+
+
+@pytest.fixture
+def hanging_service(ipv4_example_network) -> Service:
+    """A service whose checks exceed its evaluation deadline once hanging."""
+    return Service(
+        "hanging",
+        (DummyPrefix(ipv4_example_network),),
+        (DummyHealthcheck("dummy"),),
+        evaluation_deadline=0.01,
+        keep_result_cycles=2,
+    )
+
+
+async def _hang(*args, **kwargs) -> bool:
+    await asyncio.sleep(60)
+    return True
+
+
+async def test_exceeded_deadline_keeps_last_result_for_cycles(
+    mocker: MockerFixture, hanging_service
+):
+    """The last result is kept for a number of evaluations exceeding the deadline."""
+    hanging_service._healthy = True
+    mocker.patch.object(hanging_service, "all_checks_healthy", side_effect=_hang)
+
+    results = [await hanging_service._evaluate_checks() for _ in range(3)]
+
+    assert results == [True, True, False]
+
+
+async def test_exceeded_deadline_count_resets_on_completed_evaluation(
+    mocker: MockerFixture, hanging_service
+):
+    """Completed evaluations reset the number of exceeded deadlines."""
+    hanging_service._healthy = True
+    mock_all_checks_healthy = mocker.patch.object(
+        hanging_service, "all_checks_healthy", side_effect=_hang
+    )
+    await hanging_service._evaluate_checks()
+    await hanging_service._evaluate_checks()
+    mock_all_checks_healthy.side_effect = None
+    mock_all_checks_healthy.return_value = True
+    await hanging_service._evaluate_checks()
+    mock_all_checks_healthy.side_effect = _hang
+
+    assert await hanging_service._evaluate_checks() is True
+
+
+async def test_exceeded_deadline_is_unhealthy_without_keeping_results(
+    mocker: MockerFixture, hanging_service
+):
+    """Without keeping results, exceeding the deadline is treated as unhealthy."""
+    hanging_service._healthy = True
+    hanging_service.keep_result_cycles = 0
+    mocker.patch.object(hanging_service, "all_checks_healthy", side_effect=_hang)
+
+    with capture_logs() as logs:
+        assert await hanging_service._evaluate_checks() is False
+
+    assert logs[0]["log_level"] == "warning"
+
+
+def test_next_evaluation_within_deadline_once_exceeded(ipv4_example_network):
+    """After exceeding the deadline, checks are evaluated again within it."""
+    check = DummyObservableHealthcheck("scheduled", next_due=time.monotonic() + 1)
+    service = Service(
+        "scheduled",
+        (DummyPrefix(ipv4_example_network),),
+        (check,),
+        evaluation_deadline=0.01,
+    )
+    service._scheduler = HealthcheckScheduler()
+    service._scheduler.schedule(check)
+    assert service._seconds_until_next_evaluation() is None
+
+    service._deadlines_exceeded = 1
+
+    assert service._seconds_until_next_evaluation() == 0.01  # noqa: PLR2004
+
+
+async def test_run_evaluates_again_after_exceeding_deadline(
+    mocker: MockerFixture, ipv4_example_network
+):
+    """
+    A service whose scheduled checks exceeded the deadline evaluates them again
+    instead of waiting for a change that checks in flight never signal.
+    """
+    check = DummyObservableHealthcheck("scheduled", next_due=time.monotonic() + 1)
+    service = Service(
+        "scheduled",
+        (DummyPrefix(ipv4_example_network),),
+        (check,),
+        evaluation_deadline=0.01,
+    )
+    evaluations = 0
+
+    async def _hang_once() -> bool:
+        nonlocal evaluations
+        evaluations += 1
+        return await _hang() if evaluations == 1 else True
+
+    mocker.patch.object(service, "all_checks_healthy", side_effect=_hang_once)
+
+    run_task = asyncio.create_task(service.run(scheduler=HealthcheckScheduler()))
+    await asyncio.sleep(0.2)
+
+    assert service.healthy is True
+    run_task.cancel()
+    await asyncio.gather(run_task, return_exceptions=True)
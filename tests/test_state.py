@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+from structlog.testing import capture_logs
+
+from anycastd.core import Service
+from anycastd.core._state import (
+    HeldState,
+    ServiceState,
+    read_held_state,
+    write_held_state,
+)
+from tests.dummy import DummyHealthcheck, DummyPrefix
+
+
+@pytest.fixture
+def example_service(ipv4_example_network, ipv6_example_network) -> Service:
+    return Service(
+        name="Example Service",
+        prefixes=(DummyPrefix(ipv4_example_network), DummyPrefix(ipv6_example_network)),
+        health_checks=(DummyHealthcheck("dummy"),),
+    )
+
+
+def test_held_state_captures_services(example_service):
+    """The state of each service is captured by its name."""
+    example_service.healthy = True
+
+    state = HeldState.from_services([example_service])
+
+    assert state.services == {
+        example_service.name: ServiceState(
+            healthy=True,
+            prefixes=tuple(str(prefix.prefix) for prefix in example_service.prefixes),
+        )
+    }
+
+
+def test_held_state_round_trip(tmp_path, example_service):
+    """A written state is read back unchanged."""
+    path = tmp_path / "state.json"
+    state = HeldState.from_services([example_service])
+
+    write_held_state(path, state)
+
+    assert read_held_state(path) == state
+
+
+def test_missing_held_state_is_none(tmp_path):
+    """Reading a state file that does not exist returns None."""
+    assert read_held_state(tmp_path / "state.json") is None
+
+
+def test_invalid_held_state_is_logged_and_ignored(tmp_path):
+    """An invalid state file is ignored with a warning."""
+    path = tmp_path / "state.json"
+    path.write_text('{"services": {}}')
+
+    with capture_logs() as logs:
+        assert read_held_state(path) is None
+
+    assert logs[0]["log_level"] == "warning"
+
+
+def test_held_state_remaining_grace_period():
+    """The remaining grace period is counted from the time of capture."""
+    state = HeldState(
+        timestamp=datetime.datetime.now(tz=datetime.UTC)
+        - datetime.timedelta(seconds=10),
+        services={},
+    )
+
+    remaining = state.remaining(datetime.timedelta(seconds=30))
+
+    assert datetime.timedelta(seconds=19) < remaining <= datetime.timedelta(seconds=20)
+
+
+def test_service_state_matches_same_prefixes(example_service):
+    """A service state only matches services with the same prefixes."""
+    state = ServiceState.from_service(example_service)
+
+    assert state.matches(example_service)
+    assert not ServiceState(healthy=True, prefixes=state.prefixes[:1]).matches(
+        example_service
+    )